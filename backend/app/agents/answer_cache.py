@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+from pydantic import BaseModel
+
+_CONTACT_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+|\+?\d[\d\s().-]{6,}\d")
+_REFERENTIAL_PATTERN = re.compile(
+    r"\b(it|its|that|this|those|these|they|them|their|he|she|above|earlier|"
+    r"previous|before|again|yes|no|ok|okay|first|second|third|last|one)\b",
+    re.IGNORECASE,
+)
+
+
+def is_cacheable_question(history: list[dict[str, Any]], state: dict[str, Any]) -> bool:
+    """Return True when the latest user turn can be answered from the shared cache.
+
+    Eligible turns are either the first user message of a session or messages
+    that do not lean on earlier conversation. Turns carrying contact details,
+    or sessions that already hold lead/meeting data, are never eligible.
+    """
+    if not history or history[-1].get("role") != "user":
+        return False
+    if state.get("lead_info") or state.get("meeting_details"):
+        return False
+    text = history[-1].get("content", "")
+    if not text.strip() or _CONTACT_PATTERN.search(text):
+        return False
+    user_turns = sum(1 for message in history if message.get("role") == "user")
+    if user_turns == 1:
+        return True
+    return not _REFERENTIAL_PATTERN.search(text)
+
+
+def is_cacheable_payload(payload: BaseModel) -> bool:
+    """Replies that capture leads, schedule meetings or trigger actions are never shared."""
+    return (
+        not getattr(payload, "lead", None)
+        and not getattr(payload, "meeting", None)
+        and getattr(payload, "next_action", "none") == "none"
+    )
+
+
+@dataclass
+class _CachedAnswer:
+    query: str
+    vector: np.ndarray
+    payload: BaseModel
+    stored_at: float
+
+
+@dataclass
+class AnswerCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+class SemanticAnswerCache:
+    """Similarity-keyed cache of structured replies for near-duplicate questions.
+
+    Query embeddings are compared by cosine similarity against previously
+    answered questions; a match above ``threshold`` returns the stored payload.
+    Entries expire after ``ttl_seconds``, the least recently used entry is
+    evicted past ``max_entries`` and the whole cache is dropped when
+    ``index_version`` reports a re-ingested knowledge base.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        *,
+        threshold: float = 0.92,
+        ttl_seconds: float = 60 * 60,
+        max_entries: int = 512,
+        index_version: Callable[[], str] | None = None,
+    ) -> None:
+        self._embeddings = embeddings
+        self._threshold = threshold
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._index_version = index_version
+        self._version: str | None = index_version() if index_version else None
+        self._entries: OrderedDict[int, _CachedAnswer] = OrderedDict()
+        self._matrix: np.ndarray | None = None
+        self._matrix_keys: list[int] = []
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self.stats = AnswerCacheStats()
+
+    async def embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(await self._embeddings.aembed_query(query), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def lookup(self, vector: np.ndarray) -> BaseModel | None:
+        with self._lock:
+            self._check_version()
+            self._evict_expired()
+            if not self._entries:
+                self.stats.misses += 1
+                return None
+            matrix = self._ensure_matrix()
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if float(scores[best]) < self._threshold:
+                self.stats.misses += 1
+                return None
+            key = self._matrix_keys[best]
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            entry = self._entries[key]
+            logger.debug(
+                "Answer cache hit (score={:.3f}) for query: {}", float(scores[best]), entry.query
+            )
+            return entry.payload.model_copy(deep=True)
+
+    def store(self, vector: np.ndarray, query: str, payload: BaseModel) -> bool:
+        if not is_cacheable_payload(payload):
+            return False
+        with self._lock:
+            self._check_version()
+            self._entries[self._next_key] = _CachedAnswer(
+                query=query,
+                vector=vector,
+                payload=payload.model_copy(deep=True),
+                stored_at=time.monotonic(),
+            )
+            self._next_key += 1
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+            self.stats.stores += 1
+        return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _clear(self) -> None:
+        if self._entries:
+            self.stats.invalidations += 1
+        self._entries.clear()
+        self._matrix = None
+
+    def _check_version(self) -> None:
+        if not self._index_version:
+            return
+        version = self._index_version()
+        if version != self._version:
+            logger.info("Knowledge base re-ingested; clearing semantic answer cache.")
+            self._version = version
+            self._clear()
+
+    def _evict_expired(self) -> None:
+        if not self._ttl_seconds:
+            return
+        cutoff = time.monotonic() - self._ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry.stored_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _ensure_matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries)
+            self._matrix = np.vstack([self._entries[key].vector for key in self._matrix_keys])
+        return self._matrix
@@ -0,0 +1,442 @@
+"""SQLite checkpoint saver for the conversation graph."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+
+@dataclass
+class CheckpointStats:
+    checkpoints: int = 0
+    writes: int = 0
+    compacted: int = 0
+    blobs_reclaimed: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "checkpoints": self.checkpoints,
+            "writes": self.writes,
+            "compacted": self.compacted,
+            "blobs_reclaimed": self.blobs_reclaimed,
+        }
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[int]):
+    """LangGraph checkpoints in SQLite (WAL mode), compacted as they are written.
+
+    Channel values are stored once per channel version, so a checkpoint
+    only serializes the channels that changed since its parent. After every
+    ``put`` the thread is compacted down to its ``keep`` newest checkpoints:
+    older checkpoints, their pending writes and channel blobs no kept
+    checkpoint refers to are deleted in the same transaction. Threads idle
+    for longer than ``ttl_seconds`` are purged when the saver opens and, at
+    most every ``purge_interval_seconds``, after a ``put``. The async methods
+    run the SQLite work in a worker thread so lock waits never block the loop.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        keep: int = 2,
+        ttl_seconds: float = 0,
+        purge_interval_seconds: float = 300,
+        serde: SerializerProtocol | None = None,
+    ) -> None:
+        super().__init__(serde=serde)
+        if str(path) in ("", ":memory:"):
+            target = ":memory:"
+        else:
+            self._path = Path(path).expanduser()
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            target = str(self._path)
+        self._keep = max(1, keep)
+        self._ttl_seconds = ttl_seconds
+        self._purge_interval = purge_interval_seconds
+        self._purged_at = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            target, check_same_thread=False, timeout=10.0, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,"
+            " parent_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL,"
+            " metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, versions TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_blobs ("
+            " thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL,"
+            " version TEXT NOT NULL, type TEXT NOT NULL, blob BLOB,"
+            " PRIMARY KEY (thread_id, checkpoint_ns, channel, version))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_writes ("
+            " thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,"
+            " task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL,"
+            " type TEXT NOT NULL, blob BLOB, task_path TEXT NOT NULL DEFAULT '',"
+            " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS checkpoints_updated_at ON checkpoints (updated_at)"
+        )
+        self.stats = CheckpointStats()
+        self.purge_expired()
+
+    def has_thread(self, thread_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM checkpoints WHERE thread_id = ? LIMIT 1", (thread_id,)
+            ).fetchone()
+        return row is not None
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        query = (
+            "SELECT checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata"
+            " FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        with self._lock:
+            if checkpoint_id:
+                row = self._conn.execute(
+                    query + " AND checkpoint_id = ?", (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    query + " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns)
+                ).fetchone()
+            if row is None:
+                return None
+            return self._tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint,"
+                f" metadata_type, metadata FROM checkpoints{where}"
+                " ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            with self._lock:
+                found = self._tuple(thread_id, checkpoint_ns, row)
+            if limit is not None:
+                limit -= 1
+            yield found
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values: dict[str, Any] = stored.pop("channel_values")  # type: ignore[misc]
+        blobs = [
+            (
+                thread_id,
+                checkpoint_ns,
+                channel,
+                str(version),
+                *(
+                    self.serde.dumps_typed(values[channel])
+                    if channel in values
+                    else ("empty", None)
+                ),
+            )
+            for channel, version in new_versions.items()
+        ]
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(stored)
+        metadata_type, metadata_blob = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        versions = json.dumps(
+            {channel: str(version) for channel, version in checkpoint["channel_versions"].items()}
+        )
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint_blobs"
+                " (thread_id, checkpoint_ns, channel, version, type, blob)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                blobs,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id,"
+                " parent_id, type, checkpoint, metadata_type, metadata, versions, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    checkpoint_type,
+                    checkpoint_blob,
+                    metadata_type,
+                    metadata_blob,
+                    versions,
+                    time.time(),
+                ),
+            )
+            self.stats.checkpoints += 1
+            self._compact(thread_id, checkpoint_ns)
+        if time.monotonic() - self._purged_at >= self._purge_interval:
+            self.purge_expired()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = [
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+                task_path,
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        columns = (
+            " INTO checkpoint_writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx,"
+            " channel, type, blob, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        with self._lock, self._transaction():
+            for row in rows:
+                # Regular writes are idempotent per task; special writes (errors,
+                # interrupts) replace the previous one.
+                verb = "INSERT OR IGNORE" if row[4] >= 0 else "INSERT OR REPLACE"
+                self._conn.execute(verb + columns, row)
+            self.stats.writes += len(rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self._transaction():
+            for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def purge_expired(self) -> int:
+        """Delete threads whose newest checkpoint is older than ``ttl_seconds``."""
+        self._purged_at = time.monotonic()
+        if not self._ttl_seconds:
+            return 0
+        cutoff = time.time() - self._ttl_seconds
+        with self._lock:
+            stale = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id"
+                    " HAVING MAX(updated_at) < ?",
+                    (cutoff,),
+                )
+            ]
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        return len(stale)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _compact(self, thread_id: str, checkpoint_ns: str) -> None:
+        key = (thread_id, checkpoint_ns)
+        stale = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+                " ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                (*key, self._keep),
+            )
+        ]
+        if not stale:
+            return
+        for table in ("checkpoints", "checkpoint_writes"):
+            self._conn.executemany(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ?"
+                " AND checkpoint_id = ?",
+                [(*key, checkpoint_id) for checkpoint_id in stale],
+            )
+        referenced = {
+            (channel, version)
+            for (versions,) in self._conn.execute(
+                "SELECT versions FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?", key
+            )
+            for channel, version in json.loads(versions).items()
+        }
+        orphaned = [
+            (*key, channel, version)
+            for channel, version in self._conn.execute(
+                "SELECT channel, version FROM checkpoint_blobs"
+                " WHERE thread_id = ? AND checkpoint_ns = ?",
+                key,
+            )
+            if (channel, version) not in referenced
+        ]
+        self._conn.executemany(
+            "DELETE FROM checkpoint_blobs WHERE thread_id = ? AND checkpoint_ns = ?"
+            " AND channel = ? AND version = ?",
+            orphaned,
+        )
+        self.stats.compacted += len(stale)
+        self.stats.blobs_reclaimed += len(orphaned)
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        checkpoint_id, parent_id, checkpoint_type, checkpoint_blob, metadata_type, metadata = row
+        checkpoint: Checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+        values: dict[str, Any] = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self._conn.execute(
+                "SELECT type, blob FROM checkpoint_blobs WHERE thread_id = ?"
+                " AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob is not None and blob[0] != "empty":
+                values[channel] = self.serde.loads_typed(blob)
+        writes = self._conn.execute(
+            "SELECT task_id, idx, channel, type, blob, task_path FROM checkpoint_writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        writes.sort(key=lambda write: writes_sort_key(write[5], write[0], write[1]))
+        return CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": values},
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=_config(thread_id, checkpoint_ns, parent_id) if parent_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, blob)))
+                for task_id, _, channel, value_type, blob, _ in writes
+            ],
+        )
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str | None) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
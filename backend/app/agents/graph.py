@@ -1,22 +1,51 @@
 from __future__ import annotations
 
+import asyncio
+import sqlite3
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from typing import Any, Literal
 
+import httpx
+import openai
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, StateGraph
 from loguru import logger
 from pydantic import BaseModel, Field
 
+from app.agents.answer_cache import SemanticAnswerCache, is_cacheable_question
+from app.agents.checkpoint import SQLiteCheckpointSaver
+from app.agents.hedging import HedgedInvoker
+from app.agents.history import ConversationHistory
+from app.agents.router import SLOT_INTRO, IntentRouter
 from app.agents.state import AgentState
+from app.agents.streaming import ReplyStreamExtractor
 from app.config.settings import get_settings
-from app.models.chat import AgentResponse, ChatMessage, LeadCapture, MeetingProposal
+from app.models.chat import (
+    AgentResponse,
+    AgentStreamSummary,
+    BatchTurnResult,
+    ChatMessage,
+    ChatTurn,
+    ConversationSummary,
+    LeadCapture,
+    MeetingProposal,
+)
+from app.retrieval.chunking import count_tokens
+from app.retrieval.embeddings import EMBEDDING_ERRORS
 from app.retrieval.service import RetrievalService
+from app.services import metrics
+from app.services.admission import AdmissionController, AdmissionRejected, SessionLocks
 from app.services.discord import DiscordNotifier
-from app.services.session_memory import SessionMemory
+from app.services.lead_tracker import LeadRecord, LeadStore
+from app.services.outbox import OutboxNotifier, get_outbox_worker
 from app.services.scheduling import SchedulingService
+from app.services.session_memory import SessionStore, create_session_store
+from app.services.warmup import timed_step
 
-import time
 
 class DecisionPayload(BaseModel):
     """Structured output returned from the LLM for each turn."""
@@ -27,6 +56,30 @@ class DecisionPayload(BaseModel):
     meeting: MeetingProposal | None = None
 
 
+BUDGET_EXHAUSTED_REPLY = (
+    "Sorry, this is taking longer than usual on my side. Could you send that again in a "
+    "moment? If you share your email, we can also follow up directly."
+)
+LLM_ERROR_REPLY = (
+    "Sorry, something went wrong on my side and I couldn't answer that. Please try again "
+    "in a moment, or share your email and we'll follow up directly."
+)
+# Failures a single turn can hit: bad input, store I/O and the model provider.
+TURN_ERRORS = (ValueError, sqlite3.Error, OSError, openai.OpenAIError, httpx.HTTPError)
+_CACHE_ERRORS = (*EMBEDDING_ERRORS, ValueError)
+
+
+def _meeting_update(state: AgentState, meeting_details: dict[str, Any]) -> AgentState:
+    """State update for new meeting details; a newly confirmed slot can be booked again."""
+    update: AgentState = {"meeting_details": meeting_details}
+    confirmed_time = meeting_details.get("confirmed_time")
+    if confirmed_time and confirmed_time != (state.get("meeting_details") or {}).get(
+        "confirmed_time"
+    ):
+        update["meeting_scheduled"] = False
+    return update
+
+
 class AgentOrchestrator:
     """Encapsulates the LangGraph agent and supporting services."""
 
@@ -34,32 +87,156 @@ class AgentOrchestrator:
         self,
         retrieval: RetrievalService | None = None,
         scheduling: SchedulingService | None = None,
-        notifier: DiscordNotifier | None = None,
-        session_memory: SessionMemory | None = None,
+        notifier: DiscordNotifier | OutboxNotifier | None = None,
+        session_memory: SessionStore | None = None,
+        llm: BaseChatModel | None = None,
+        answer_cache: SemanticAnswerCache | None = None,
+        router: IntentRouter | None = None,
+        admission: AdmissionController | None = None,
+        fallback_llm: BaseChatModel | None = None,
+        lead_store: LeadStore | None = None,
+        checkpointer: SQLiteCheckpointSaver | None = None,
     ) -> None:
         self._settings = get_settings()
-        if not self._settings.openai_api_key:
+        if llm is None and not self._settings.openai_api_key:
             raise RuntimeError("OPENAI_API_KEY must be configured.")
 
-        self._llm = ChatOpenAI(
-            temperature=0.2,
-            model=self._settings.openai_model,
-            api_key=self._settings.openai_api_key.get_secret_value(),
+        if llm is None:
+            from langchain_openai import ChatOpenAI
+
+            llm = ChatOpenAI(
+                temperature=0.2,
+                model=self._settings.openai_model,
+                api_key=self._settings.openai_api_key.get_secret_value(),
+            )
+            if fallback_llm is None and self._settings.llm_hedge_enabled:
+                fallback_llm = ChatOpenAI(
+                    temperature=0.2,
+                    model=self._settings.llm_hedge_model or self._settings.openai_model,
+                    api_key=self._settings.openai_api_key.get_secret_value(),
+                )
+        self._llm = llm
+        self._admission = admission or AdmissionController(
+            max_concurrency=self._settings.llm_max_concurrency,
+            max_queue=self._settings.llm_max_queue,
+            queue_timeout=self._settings.llm_queue_timeout_seconds,
         )
         self._decision_llm = self._llm.with_structured_output(DecisionPayload)
+        self._decision = HedgedInvoker(
+            self._decision_llm,
+            (
+                fallback_llm.with_structured_output(DecisionPayload)
+                if fallback_llm is not None and self._settings.llm_hedge_enabled
+                else None
+            ),
+            percentile=self._settings.llm_hedge_percentile,
+            min_delay=self._settings.llm_hedge_min_delay_seconds,
+            initial_delay=self._settings.llm_hedge_initial_delay_seconds,
+            admission=self._admission,
+        )
         self._retrieval = retrieval or RetrievalService()
         self._scheduling = scheduling or SchedulingService()
-        self._notifier = notifier or DiscordNotifier()
-        self._session_memory = session_memory or SessionMemory()
+        if notifier is None:
+            notifier = (
+                OutboxNotifier(get_outbox_worker())
+                if self._settings.outbox_enabled
+                else DiscordNotifier()
+            )
+        self._notifier = notifier
+        self._session_memory = session_memory or create_session_store(self._settings)
+        self._leads = lead_store or LeadStore(self._settings.lead_store_path)
+        self._checkpointer = checkpointer
+        if self._checkpointer is None and self._use_checkpoints():
+            self._checkpointer = SQLiteCheckpointSaver(
+                self._settings.checkpoint_path,
+                keep=self._settings.checkpoint_keep,
+                ttl_seconds=self._settings.session_ttl_seconds,
+            )
+        self._history = ConversationHistory(
+            self._llm,
+            self._session_memory,
+            token_budget=self._settings.history_token_budget,
+            summarize_after=self._settings.history_summarize_after,
+            summary_max_tokens=self._settings.history_summary_max_tokens,
+            enabled=self._settings.history_summary_enabled,
+            admission=self._admission,
+        )
+        self._answer_cache = answer_cache
+        if self._answer_cache is None and self._settings.answer_cache_enabled:
+            self._answer_cache = SemanticAnswerCache(
+                self._retrieval.embeddings(),
+                threshold=self._settings.answer_cache_similarity_threshold,
+                ttl_seconds=self._settings.answer_cache_ttl_seconds,
+                max_entries=self._settings.answer_cache_max_entries,
+                index_version=self._retrieval.index_version,
+            )
+        self._router = router
+        if self._router is None and self._settings.intent_router_enabled:
+            self._router = IntentRouter(
+                min_confidence=self._settings.intent_router_min_confidence,
+                max_words=self._settings.intent_router_max_words,
+            )
+        self._session_locks = SessionLocks(
+            max_pending=self._settings.session_max_pending_turns
+        )
+        self._llm_latency = metrics.LLM_LATENCY.labels("decision")
+        self._register_stats()
         self._graph = self._build_graph()
 
+    def _use_checkpoints(self) -> bool:
+        """Checkpoints live in a host-local SQLite file, so Redis-backed sessions skip them."""
+        if not self._settings.checkpoint_enabled:
+            return False
+        if self._settings.session_store_backend.lower() == "redis":
+            logger.info(
+                "Checkpoints are local to this host; keeping conversation history in the "
+                "Redis session store instead."
+            )
+            return False
+        return True
+
+    def _register_stats(self) -> None:
+        metrics.register_stats("admission", self._admission.stats.as_dict)
+        metrics.register_stats("leads", self._leads.stats.as_dict)
+        if self._checkpointer is not None:
+            metrics.register_stats("checkpoints", self._checkpointer.stats.as_dict)
+        if self._answer_cache is not None:
+            metrics.register_stats("answer_cache", self._answer_cache.stats.as_dict)
+        embedding_stats = getattr(self._retrieval, "embedding_cache_stats", None)
+        if embedding_stats is not None:
+            metrics.register_stats("embedding_cache", embedding_stats)
+
+    @staticmethod
+    def _timed(name: str, node):
+        latency = metrics.NODE_LATENCY.labels(name)
+        errors = metrics.NODE_ERRORS.labels(name)
+
+        async def timed_node(state: AgentState) -> AgentState:
+            with metrics.observe(latency, errors):
+                return await node(state)
+
+        return timed_node
+
     def _build_graph(self):
         builder = StateGraph(AgentState)
-        builder.add_node("respond", self._respond)
-        builder.add_node("capture_lead", self._capture_lead)
-        builder.add_node("schedule_meeting", self._schedule_meeting)
+        builder.add_node("route", self._timed("route", self._route))
+        builder.add_node("respond", self._timed("respond", self._respond))
+        builder.add_node("capture_lead", self._timed("capture_lead", self._capture_lead))
+        builder.add_node(
+            "schedule_meeting", self._timed("schedule_meeting", self._schedule_meeting)
+        )
 
-        builder.set_entry_point("respond")
+        builder.set_entry_point("route")
+        builder.add_conditional_edges(
+            "route",
+            self._route_from_router,
+            {
+                "respond": "respond",
+                "capture_lead": "capture_lead",
+                "schedule_meeting": "schedule_meeting",
+                "end": END,
+            },
+        )
         builder.add_conditional_edges(
             "respond",
             self._route_from_response,
@@ -71,11 +248,27 @@ class AgentOrchestrator:
         )
         builder.add_edge("capture_lead", "schedule_meeting")
         builder.add_edge("schedule_meeting", END)
-        return builder.compile()
+        return builder.compile(checkpointer=self._checkpointer)
+
+    async def _route(self, state: AgentState) -> AgentState:
+        """Answer or route trivial turns without retrieval or an LLM call."""
+        if self._router is None:
+            return {"route": "llm"}
+        decision = self._router.route(state.get("messages", []), state.get("lead_info"))
+        if decision.intent == "llm":
+            return {"route": "llm"}
+        logger.debug("Intent router handled turn as {}", decision.intent)
+        update: AgentState = {"route": decision.intent, "next_action": decision.next_action}
+        if decision.reply:
+            get_stream_writer()({"delta": decision.reply})
+            update["messages"] = [{"role": "assistant", "content": decision.reply}]
+        if decision.lead_info:
+            update["lead_info"] = {**state.get("lead_info", {}), **decision.lead_info}
+        if decision.meeting_details:
+            update.update(_meeting_update(state, decision.meeting_details))
+        return update
 
     async def _respond(self, state: AgentState) -> AgentState:
-        start_time = time.time()
-        
         """Call the LLM with retrieval context to craft the next reply."""
         history = state.get("messages", [])
         if not history:
@@ -84,9 +277,22 @@ class AgentOrchestrator:
         last_message = history[-1]
         query_text = last_message["content"]
 
+        cache_vector = None
+        if self._answer_cache is not None and is_cacheable_question(history, state):
+            cached = None
+            try:
+                cache_vector = await self._answer_cache.embed(query_text)
+                cached = self._answer_cache.lookup(cache_vector)
+            except _CACHE_ERRORS as exc:  # pragma: no cover - cache failures must not fail turns
+                logger.warning("Answer cache lookup failed: {}", exc)
+                cache_vector = None
+            if cached is not None:
+                get_stream_writer()({"delta": cached.reply})
+                return self._apply_decision(state, cached)
+
         try:
-            context_docs = self._retrieval.get_context(query_text)
-            context_text = self._retrieval.format_context(context_docs)
+            context_docs = await self._retrieval.aget_context(query_text)
+            context_text = self._retrieval.format_context(context_docs, query=query_text)
         except Exception as exc:  # pragma: no cover - retrieval failures
             logger.warning("Retrieval failed: {}", exc)
             context_text = ""
@@ -104,7 +310,8 @@ class AgentOrchestrator:
             HumanMessage(
                 content=(
                     "Conversation so far:\n"
-                    f"{self._format_history(history)}\n\n"
+                    f"{self._format_history(history, state.get('summary'))}\n\n"
+                    f"Known contact details: {self._format_lead(state.get('lead_info'))}\n\n"
                     f"Reference context:\n{context_text or 'None'}\n\n"
                     "Generate the next reply. "
                     "Decide on the next action based on conversation progress. "
@@ -113,83 +320,137 @@ class AgentOrchestrator:
                 )
             ),
         ]
-        building_request_end_time = time.time()
-        print("Query time: {}", building_request_end_time - start_time)
-        decision = await self._decision_llm.ainvoke(structured_request)
-        
-        post_process_start_time = time.time()
-        logger.debug("Decision payload: {}", decision.dict())
-
-        state["messages"] = history + [
-            {"role": "assistant", "content": decision.reply},
-        ]
+        async with self._admission.slot():
+            with metrics.observe(self._llm_latency):
+                result = await self._decision.ainvoke(
+                    structured_request, timeout=self._remaining_budget(state)
+                )
+        metrics.LLM_DECISIONS.labels(result.outcome).inc()
+        if result.outcome == "error":
+            logger.opt(exception=result.error).error("Every decision LLM attempt failed")
+            get_stream_writer()({"delta": LLM_ERROR_REPLY})
+            return self._apply_decision(state, DecisionPayload(reply=LLM_ERROR_REPLY))
+        if result.value is None:
+            logger.warning("No decision within the turn budget ({})", result.outcome)
+            get_stream_writer()({"delta": BUDGET_EXHAUSTED_REPLY})
+            return self._apply_decision(state, DecisionPayload(reply=BUDGET_EXHAUSTED_REPLY))
+        decision = result.value
+
+        logger.debug("Decision payload: {}", decision.model_dump())
+        if cache_vector is not None:
+            self._answer_cache.store(cache_vector, query_text, decision)
+
+        return self._apply_decision(state, decision)
+
+    @staticmethod
+    def _remaining_budget(state: AgentState) -> float | None:
+        deadline = state.get("deadline")
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic(), 0.001)
+
+    @staticmethod
+    def _apply_decision(state: AgentState, decision: DecisionPayload) -> AgentState:
+        update: AgentState = {
+            "messages": [{"role": "assistant", "content": decision.reply}],
+            "next_action": decision.next_action,
+        }
         if decision.lead:
-            state["lead_info"] = {
-                key: value
-                for key, value in decision.lead.dict().items()
-                if value
+            update["lead_info"] = {
+                **state.get("lead_info", {}),
+                **{key: value for key, value in decision.lead.model_dump().items() if value},
             }
         if decision.meeting:
-            state["meeting_details"] = decision.meeting.dict()
-        state["next_action"] = decision.next_action
-        
-        post_process_end_time = time.time()
-        print("Post-process time: {}", post_process_end_time - post_process_start_time)
-        return state
+            update.update(_meeting_update(state, decision.meeting.model_dump()))
+        return update
 
     async def _capture_lead(self, state: AgentState) -> AgentState:
-        """Send captured lead details to Discord and mark the state."""
+        """Store captured lead details and notify Discord the first time a lead has an email."""
+        record = await self._record_lead(state)
+        if record is None:
+            return {}
+        # The merged record may hold another session's details; keep it server-side.
+        return {"lead_captured": record.notified}
+
+    async def _record_lead(self, state: AgentState) -> LeadRecord | None:
         lead_info = state.get("lead_info")
-        if lead_info and lead_info.get("email") and not state.get("lead_captured"):
-            await self._notifier.send_embed(
-                title="New Website Lead",
-                description="Captured contact information from web chat.",
-                fields=lead_info,
-            )
-            state["lead_captured"] = True
-        return state
+        if not lead_info:
+            return None
+        update = await asyncio.to_thread(self._leads.upsert, state.get("session_id"), lead_info)
+        if update.notify:
+            try:
+                await self._notifier.send_embed(
+                    title="New Website Lead",
+                    description="Captured contact information from web chat.",
+                    fields=update.lead.fields,
+                )
+            except Exception:
+                await asyncio.to_thread(self._leads.release_notification, update.lead.lead_id)
+                raise
+        return update.lead
 
     async def _schedule_meeting(self, state: AgentState) -> AgentState:
         """Handle meeting scheduling intent if requested."""
         meeting_details = state.get("meeting_details") or {}
+        update: AgentState = {"next_action": "none"}
         if not meeting_details:
             if state.get("next_action") == "schedule":
                 # Suggest slots if none provided yet by the LLM
-                slots = await self._scheduling.suggest_time_slots()
-                state["meeting_details"] = {"proposed_times": slots}
-                state.setdefault("messages", []).append(
+                slots = await self._scheduling.suggest_time_slots(
+                    timezone=state.get("timezone")
+                )
+                update["meeting_details"] = {"proposed_times": slots}
+                update["messages"] = [
                     {
                         "role": "assistant",
                         "content": (
-                            "Here are a few time slots that could work:\n"
+                            f"{SLOT_INTRO}\n"
                             + "\n".join(f"- {slot}" for slot in slots)
                             + "\nLet me know which one you prefer."
                         ),
                     }
-                )
+                ]
         else:
             confirmed_time = meeting_details.get("confirmed_time")
             if confirmed_time and not state.get("meeting_scheduled"):
                 lead = state.get("lead_info", {})
                 if not lead.get("email"):
                     logger.warning("Cannot schedule meeting without lead email.")
-                    return state
-                invite_url = await self._scheduling.schedule_meeting(
-                    attendee=lead,
-                    slot=confirmed_time,
+                    return {}
+                record = await self._record_lead(state)
+                update["lead_captured"] = record.notified
+                previous = await asyncio.to_thread(
+                    self._leads.claim_meeting, record.lead_id, confirmed_time
                 )
+                if previous is None:
+                    update["messages"] = [
+                        {
+                            "role": "assistant",
+                            "content": f"You're already booked for {confirmed_time}.",
+                        }
+                    ]
+                    update["meeting_scheduled"] = True
+                    return update
+                try:
+                    invite_url = await self._scheduling.schedule_meeting(
+                        attendee=lead,
+                        slot=confirmed_time,
+                    )
+                except Exception:
+                    await asyncio.to_thread(self._leads.release_meeting, record.lead_id, previous)
+                    raise
                 note = (
                     f"Great! I've scheduled the meeting for {confirmed_time}."
                     if invite_url is None
                     else f"Great! I've scheduled the meeting for {confirmed_time}. Here is the invite: {invite_url}"
                 )
-                state.setdefault("messages", []).append(
+                update["messages"] = [
                     {
                         "role": "assistant",
                         "content": note,
                     }
-                )
-                state["meeting_scheduled"] = True
+                ]
+                update["meeting_scheduled"] = True
                 await self._notifier.send_embed(
                     title="Meeting Scheduled",
                     description="A visitor booked a meeting via the web chat.",
@@ -198,8 +459,12 @@ class AgentOrchestrator:
                         "invite_url": invite_url or "manual follow-up required",
                     },
                 )
-        state["next_action"] = "none"
-        return state
+        return update
+
+    def _route_from_router(self, state: AgentState) -> str:
+        if state.get("route", "llm") == "llm":
+            return "respond"
+        return self._route_from_response(state)
 
     def _route_from_response(self, state: AgentState) -> str:
         """Determine the next node to execute."""
@@ -210,44 +475,285 @@ class AgentOrchestrator:
             return "schedule_meeting"
         return "end"
 
-    async def run(self, session_id: str, messages: list[ChatMessage]) -> AgentResponse:
-        """Execute the graph for a conversation turn."""
-        existing_history = self._session_memory.get_history(session_id)
-        combined_messages = [
-            *(message.dict() for message in existing_history),
-            *(message.dict() for message in messages),
-        ]
+    async def warm_up(self) -> dict[str, float]:
+        """Pay one-off initialisation costs before the first turn; returns step timings."""
+        steps: dict[str, float] = {}
+        with timed_step(steps, "tokenizer"):
+            count_tokens("warm up")
+        retrieval_warm_up = getattr(self._retrieval, "awarm_up", None)
+        if retrieval_warm_up is not None:
+            steps.update(await retrieval_warm_up())
+        return steps
+
+    def check_admission(self, session_id: str) -> None:
+        """Raise ``AdmissionRejected`` if a new turn for ``session_id`` would be refused."""
+        self._session_locks.check(session_id)
+        self._admission.check()
 
-        state: AgentState = {
-            "session_id": session_id,
-            "messages": combined_messages,
-            "lead_captured": False,
-            "meeting_scheduled": False,
+    async def run(
+        self, session_id: str, messages: list[ChatMessage], *, timezone: str | None = None
+    ) -> AgentResponse:
+        """Execute the graph for a conversation turn.
+
+        Turns of the same session run one at a time, in arrival order.
+        """
+        async with self._session_locks.hold(session_id):
+            state = await self._initial_state(session_id, messages, timezone)
+            usage = metrics.TokenUsageHandler()
+            with metrics.observe(
+                metrics.TURN_LATENCY.labels("run"),
+                metrics.TURN_ERRORS.labels("run"),
+                metrics.TURNS_IN_FLIGHT,
+            ):
+                result_state = await self._graph.ainvoke(
+                    state, config=self._turn_config(session_id, usage), durability="exit"
+                )
+            metrics.TURN_TOKENS.observe(usage.total_tokens)
+            return await self._finalize(session_id, result_state)
+
+    async def astream(
+        self, session_id: str, messages: list[ChatMessage], *, timezone: str | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Execute the graph for a turn, yielding reply tokens as they are generated.
+
+        Yields ``{"event": "token", "delta": str}`` items while the ``respond``
+        node streams its structured output (or emits a precomputed reply via the
+        graph stream writer), followed by a single
+        ``{"event": "final", "data": AgentStreamSummary}`` item once the graph
+        completes. Conversation state is only committed when the stream finishes,
+        and turns of the same session run one at a time, in arrival order.
+        """
+        async with (
+            self._session_locks.hold(session_id),
+            aclosing(self._stream_turn(session_id, messages, timezone)) as events,
+        ):
+            async for event in events:
+                yield event
+
+    async def _stream_turn(
+        self, session_id: str, messages: list[ChatMessage], timezone: str | None
+    ) -> AsyncIterator[dict[str, Any]]:
+        state = await self._initial_state(session_id, messages, timezone)
+        extractor = ReplyStreamExtractor()
+        streaming_run: str | None = None
+        result_state: AgentState = state
+        usage = metrics.TokenUsageHandler()
+        with metrics.observe(
+            metrics.TURN_LATENCY.labels("stream"),
+            metrics.TURN_ERRORS.labels("stream"),
+            metrics.TURNS_IN_FLIGHT,
+        ):
+            async for mode, payload in self._graph.astream(
+                state,
+                config=self._turn_config(session_id, usage),
+                stream_mode=["messages", "custom", "values"],
+                durability="exit",
+            ):
+                if mode == "values":
+                    result_state = payload
+                    continue
+                if mode == "custom":
+                    if payload.get("delta"):
+                        yield {"event": "token", "delta": payload["delta"]}
+                    continue
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") != "respond":
+                    continue
+                # A hedged decision may race two models; only stream the one that spoke first.
+                streaming_run = streaming_run or chunk.id
+                if chunk.id != streaming_run:
+                    continue
+                delta = extractor.feed(chunk)
+                if delta:
+                    yield {"event": "token", "delta": delta}
+        metrics.TURN_TOKENS.observe(usage.total_tokens)
+
+        response = await self._finalize(session_id, result_state)
+        lead_info = result_state.get("lead_info")
+        meeting_details = result_state.get("meeting_details")
+        yield {
+            "event": "final",
+            "data": AgentStreamSummary(
+                **response.model_dump(),
+                next_action=result_state.get("next_action", "none"),
+                lead=LeadCapture(**lead_info) if lead_info else None,
+                meeting=MeetingProposal(**meeting_details) if meeting_details else None,
+            ),
         }
-        result_state = await self._graph.ainvoke(state)
-        response_messages = [
-            ChatMessage(**message) for message in result_state["messages"]
-        ]
 
-        self._session_memory.set_history(session_id, response_messages)
+    async def run_batch(
+        self, turns: list[ChatTurn], *, concurrency: int | None = None
+    ) -> AsyncIterator[BatchTurnResult]:
+        """Replay many turns concurrently, yielding results in completion order.
+
+        Turns sharing a ``session_id`` run one after another in list order;
+        different sessions run in parallel, at most ``concurrency`` at a time
+        (capped by ``batch_max_concurrency``). Query embeddings for the whole
+        batch are requested up front in large chunks so retrieval and the
+        answer cache read them from the embedding cache. A failing turn yields
+        a result with ``error`` set instead of aborting the batch.
+        """
+        limit = self._settings.batch_max_concurrency
+        parallelism = max(1, min(concurrency or limit, limit))
+        await self._prime_batch_embeddings(turns)
+
+        sessions: dict[str, list[int]] = {}
+        for index, turn in enumerate(turns):
+            sessions.setdefault(turn.session_id, []).append(index)
+
+        results: asyncio.Queue[BatchTurnResult] = asyncio.Queue()
+        slots = asyncio.Semaphore(parallelism)
 
+        async def replay(indices: list[int]) -> None:
+            async with slots:
+                for index in indices:
+                    results.put_nowait(await self._run_batch_turn(index, turns[index]))
+
+        tasks = [asyncio.create_task(replay(indices)) for indices in sessions.values()]
+        try:
+            for _ in range(len(turns)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _prime_batch_embeddings(self, turns: list[ChatTurn]) -> None:
+        prime = getattr(self._retrieval, "aprime_embeddings", None)
+        if prime is None:
+            return
+        queries = [turn.message.content for turn in turns if turn.message.content]
+        size = max(1, self._settings.batch_embedding_chunk_size)
+        try:
+            await asyncio.gather(
+                *(prime(queries[start : start + size]) for start in range(0, len(queries), size))
+            )
+        except EMBEDDING_ERRORS as exc:  # pragma: no cover - turns embed on their own instead
+            logger.warning("Batch embedding prefetch failed: {}", exc)
+
+    async def _run_batch_turn(self, index: int, turn: ChatTurn) -> BatchTurnResult:
+        result = BatchTurnResult(index=index, session_id=turn.session_id)
+        if not turn.message.content:
+            result.error = "Message content required."
+            return result
+        attempts = max(1, self._settings.batch_admission_retries + 1)
+        for attempt in range(attempts):
+            try:
+                result.response = await self.run(
+                    turn.session_id, [turn.message], timezone=turn.timezone
+                )
+                return result
+            except AdmissionRejected as exc:
+                if attempt + 1 == attempts:
+                    result.error = exc.reason
+                    return result
+                await asyncio.sleep(exc.retry_after)
+            except TURN_ERRORS as exc:
+                logger.exception("Batch turn {} failed: {}", index, exc)
+                result.error = f"{type(exc).__name__}: {exc}"
+                return result
+        return result
+
+    async def aclose(self) -> None:
+        """Finish in-flight summary updates, then close the session, lead and checkpoint stores."""
+        await self._history.drain()
+        await asyncio.to_thread(self._close_stores)
+
+    def _close_stores(self) -> None:
+        if self._checkpointer is not None:
+            self._checkpointer.close()
+        self._leads.close()
+        self._session_memory.close()
+
+    def get_history(self, session_id: str) -> list[ChatMessage]:
+        """Stored conversation for ``session_id``."""
+        if self._checkpointer is not None and self._checkpointer.has_thread(session_id):
+            snapshot = self._graph.get_state(self._thread_config(session_id))
+            return [ChatMessage(**message) for message in snapshot.values.get("messages", [])]
+        return self._session_memory.get_history(session_id)
+
+    @staticmethod
+    def _thread_config(session_id: str) -> dict[str, Any]:
+        return {"configurable": {"thread_id": session_id}}
+
+    def _turn_config(self, session_id: str, usage: metrics.TokenUsageHandler) -> dict[str, Any]:
+        config: dict[str, Any] = {"callbacks": [usage]}
+        if self._checkpointer is not None:
+            config.update(self._thread_config(session_id))
+        return config
+
+    async def _initial_state(
+        self, session_id: str, messages: list[ChatMessage], timezone: str | None = None
+    ) -> AgentState:
+        """Graph input for one turn.
+
+        With checkpoints, only the new messages and per-turn fields are sent;
+        the reducers merge them into the session's saved state (including
+        ``lead_info``, ``meeting_details`` and ``meeting_scheduled``). The
+        session store and lead store only seed a session's first checkpoint.
+        """
+        new_messages = [message.model_dump() for message in messages]
+        state: AgentState = {"session_id": session_id}
+        if self._checkpointer is None or not await asyncio.to_thread(
+            self._checkpointer.has_thread, session_id
+        ):
+            state["meeting_scheduled"] = False
+            existing_history = await self._session_memory.aget_history(session_id)
+            new_messages = [*(message.model_dump() for message in existing_history), *new_messages]
+            state["lead_captured"] = False
+            lead_info, lead = await asyncio.to_thread(self._session_lead, session_id)
+            if lead_info:
+                state["lead_info"] = lead_info
+            if lead is not None:
+                state["lead_captured"] = lead.notified
+        state["messages"] = new_messages
+        if timezone:
+            state["timezone"] = timezone
+        if self._settings.turn_latency_budget_seconds > 0:
+            state["deadline"] = time.monotonic() + self._settings.turn_latency_budget_seconds
+        summary = await self._session_memory.aget_summary(session_id)
+        if summary is not None:
+            state["summary"] = summary.model_dump()
+        return state
+
+    def _session_lead(self, session_id: str) -> tuple[dict[str, str], LeadRecord | None]:
+        return self._leads.session_fields(session_id), self._leads.find(session_id=session_id)
+
+    async def _finalize(self, session_id: str, result_state: AgentState) -> AgentResponse:
+        history = result_state["messages"]
+        if self._checkpointer is None:
+            await self._session_memory.aset_history(
+                session_id, [ChatMessage(**message) for message in history]
+            )
+        lead_info = result_state.get("lead_info")
+        if lead_info:
+            # Keep partial details (e.g. a name before the email) for later turns.
+            await asyncio.to_thread(
+                self._leads.upsert, session_id, lead_info, claim_notification=False
+            )
+        self._history.schedule_refresh(session_id, history)
+
+        meeting_details = result_state.get("meeting_details") or {}
         return AgentResponse(
             session_id=session_id,
-            messages=[response_messages[-1]],
+            messages=[ChatMessage(**history[-1])],
             lead_captured=result_state.get("lead_captured", False),
             meeting_scheduled=result_state.get("meeting_scheduled", False),
             suggested_slots=(
-                result_state.get("meeting_details", {}).get("proposed_times")
-                if result_state.get("meeting_details")
+                # Proposed slots stay in the session state until one is confirmed.
+                meeting_details.get("proposed_times")
+                if not meeting_details.get("confirmed_time")
                 else None
             ),
         )
 
     @staticmethod
-    def _format_history(history: list[dict[str, Any]]) -> str:
-        lines = []
-        for message in history[-10:]:
-            role = message["role"]
-            content = message["content"]
-            lines.append(f"{role.title()}: {content}")
-        return "\n".join(lines)
+    def _format_lead(lead_info: dict[str, Any] | None) -> str:
+        if not lead_info:
+            return "None"
+        return ", ".join(f"{key}: {value}" for key, value in lead_info.items() if value)
+
+    def _format_history(
+        self, history: list[dict[str, Any]], summary: dict[str, str] | None = None
+    ) -> str:
+        return self._history.render(history, ConversationSummary(**summary) if summary else None)
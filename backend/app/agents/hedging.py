@@ -0,0 +1,194 @@
+"""Deadline-bounded LLM calls with a hedged request to a secondary model."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks.base import BaseCallbackManager
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ensure_config
+from loguru import logger
+
+from app.services import metrics
+from app.services.admission import AdmissionController
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies with nearest-rank percentiles."""
+
+    def __init__(self, *, window: int = 200, min_samples: int = 20) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> float | None:
+        if len(self._samples) < self._min_samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class _FirstTokenHandler(BaseCallbackHandler):
+    """Calls ``on_first_token`` once, when the attempt starts streaming."""
+
+    run_inline = True
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+    ignore_custom_event = True
+
+    def __init__(self, on_first_token: Callable[[], None]) -> None:
+        self._on_first_token: Callable[[], None] | None = on_first_token
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if self._on_first_token is not None:
+            callback, self._on_first_token = self._on_first_token, None
+            callback()
+
+
+def _attempt_config(handler: BaseCallbackHandler, name: str) -> RunnableConfig:
+    """The caller's config (callbacks included) plus ``handler`` and an attempt tag."""
+    config = ensure_config()
+    callbacks = config.get("callbacks")
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.copy()
+        callbacks.add_handler(handler, inherit=True)
+    else:
+        callbacks = [*(callbacks or []), handler]
+    return {**config, "callbacks": callbacks, "tags": [*config.get("tags", []), f"attempt:{name}"]}
+
+
+@dataclass
+class HedgeResult:
+    value: Any
+    outcome: str
+    error: BaseException | None = None
+
+
+class HedgedInvoker:
+    """Invoke a primary runnable, hedging to a secondary one when it runs slow.
+
+    The hedge fires once the primary has been running longer than the
+    ``percentile`` of its recent latencies (``initial_delay`` until enough
+    samples exist, never below ``min_delay``). A primary failure sends the
+    secondary request at once. The first attempt to return wins and the
+    other is cancelled; when a model starts streaming tokens it is committed
+    to and the other attempt is cancelled, so streamed replies never mix.
+    ``outcome`` is ``primary``, ``hedge``, ``fallback``, ``budget_exhausted``
+    (``timeout`` elapsed, ``value`` is None) or ``error`` (every attempt failed).
+
+    The caller holds one ``admission`` slot for the primary, which a fallback
+    reuses once the primary has failed. A hedge runs next to the primary, so
+    it needs a second slot: it is only sent when one is free, and skipped
+    otherwise, so hedging never pushes concurrency past the limit.
+    """
+
+    def __init__(
+        self,
+        primary: Runnable,
+        secondary: Runnable | None = None,
+        *,
+        percentile: float = 95.0,
+        min_delay: float = 1.0,
+        initial_delay: float = 4.0,
+        tracker: LatencyTracker | None = None,
+        admission: AdmissionController | None = None,
+    ) -> None:
+        self._primary = primary
+        self._secondary = secondary
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._initial_delay = initial_delay
+        self.tracker = tracker or LatencyTracker()
+        self._admission = admission
+
+    def hedge_delay(self) -> float:
+        observed = self.tracker.percentile(self._percentile)
+        return max(self._initial_delay if observed is None else observed, self._min_delay)
+
+    async def ainvoke(self, request: Any, *, timeout: float | None = None) -> HedgeResult:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + timeout if timeout else None
+        attempts: dict[asyncio.Future, str] = {}
+        committed: list[str] = []
+
+        def launch(name: str, runnable: Runnable, *, extra_slot: bool = False) -> None:
+            def commit() -> None:
+                if committed:
+                    return
+                committed.append(name)
+                for task, other in attempts.items():
+                    if other != name:
+                        task.cancel()
+
+            config = _attempt_config(_FirstTokenHandler(commit), name)
+            call = (
+                self._invoke_in_slot(runnable, request, config)
+                if extra_slot and self._admission is not None
+                else runnable.ainvoke(request, config=config)
+            )
+            attempts[asyncio.ensure_future(call)] = name
+
+        launch("primary", self._primary)
+        hedge_at = started + self.hedge_delay() if self._secondary is not None else None
+        last_error: BaseException | None = None
+        try:
+            while attempts:
+                wakeups = [moment for moment in (deadline, hedge_at) if moment is not None]
+                wait = max(min(wakeups) - loop.time(), 0.0) if wakeups else None
+                done, _ = await asyncio.wait(
+                    set(attempts), timeout=wait, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    name = attempts.pop(task)
+                    if task.cancelled():
+                        continue
+                    error = task.exception()
+                    if error is None:
+                        if name == "primary":
+                            # Only completed calls are samples; failures and cancellations
+                            # would skew the hedge delay.
+                            self.tracker.record(loop.time() - started)
+                        return HedgeResult(task.result(), name)
+                    last_error = error
+                    logger.warning("Decision LLM attempt {} failed: {}", name, error)
+                    if name == "primary" and hedge_at is not None:
+                        hedge_at = None
+                        metrics.LLM_HEDGES.labels("fallback").inc()
+                        launch("fallback", self._secondary)
+
+                now = loop.time()
+                if deadline is not None and now >= deadline:
+                    return HedgeResult(None, "budget_exhausted")
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if committed:
+                        continue
+                    if self._admission is not None and self._admission.saturated:
+                        metrics.LLM_HEDGES.labels("skipped").inc()
+                        continue
+                    metrics.LLM_HEDGES.labels("hedge").inc()
+                    launch("hedge", self._secondary, extra_slot=True)
+            return HedgeResult(None, "error", last_error)
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    async def _invoke_in_slot(
+        self, runnable: Runnable, request: Any, config: RunnableConfig
+    ) -> Any:
+        async with self._admission.slot(wait=False):
+            return await runnable.ainvoke(request, config=config)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any
+
+import httpx
+import openai
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from loguru import logger
+
+from app.models.chat import ConversationSummary
+from app.retrieval.chunking import count_tokens
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.session_memory import SessionStore
+
+_FINGERPRINT_WINDOW = 3
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a website chat between a visitor and our "
+    "onboarding assistant. Merge the new messages into the existing summary. Keep "
+    "facts the assistant needs later: the visitor's name, company, contact details, "
+    "needs, questions already answered, and any meeting times discussed. "
+    "Write at most {max_tokens} tokens of plain prose."
+)
+
+
+def fingerprint(messages: list[dict[str, Any]]) -> str:
+    """Identify a position in the history by the last few messages up to it."""
+    digest = hashlib.sha1()
+    for message in messages[-_FINGERPRINT_WINDOW:]:
+        digest.update(f"{message['role']}\x00{message['content']}\x01".encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=8192)
+def _line_tokens(line: str) -> int:
+    return count_tokens(line) + 1
+
+
+def _format_line(message: dict[str, Any]) -> str:
+    return f"{message['role'].title()}: {message['content']}"
+
+
+class ConversationHistory:
+    """Token-budgeted prompt history with an incrementally updated summary.
+
+    The newest messages are rendered verbatim until ``token_budget`` is used;
+    everything older is represented by a rolling summary kept with the
+    session. The summary is refreshed in the background once at least
+    ``summarize_after`` older messages are not yet folded into it, so the
+    prompt size stays roughly constant however long the conversation gets.
+    Older messages the summary does not cover yet stay in the prompt
+    verbatim until a refresh folds them in.
+
+    Summary calls take an ``admission`` slot only when one is free, so they
+    never queue ahead of visitors' turns; a refresh that finds every slot
+    busy is left to a later turn.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        store: SessionStore,
+        *,
+        token_budget: int = 1200,
+        summarize_after: int = 4,
+        summary_max_tokens: int = 300,
+        enabled: bool = True,
+        admission: AdmissionController | None = None,
+    ) -> None:
+        self._llm = llm
+        self._store = store
+        self._token_budget = token_budget
+        self._summarize_after = summarize_after
+        self._summary_max_tokens = summary_max_tokens
+        self._enabled = enabled
+        self._admission = admission
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def split(
+        self, history: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Return ``(older, recent)`` where ``recent`` fits the token budget."""
+        used = 0
+        start = len(history)
+        while start > 0:
+            cost = _line_tokens(_format_line(history[start - 1]))
+            if start < len(history) and used + cost > self._token_budget:
+                break
+            used += cost
+            start -= 1
+        return history[:start], history[start:]
+
+    def render(
+        self, history: list[dict[str, Any]], summary: ConversationSummary | None = None
+    ) -> str:
+        older, recent = self.split(history)
+        pending = self.unsummarized(history, summary)
+        lines = [_format_line(message) for message in [*pending, *recent]]
+        if summary is not None and summary.text and len(pending) < len(older):
+            return f"Summary of earlier conversation: {summary.text}\n" + "\n".join(lines)
+        return "\n".join(lines)
+
+    def unsummarized(
+        self, history: list[dict[str, Any]], summary: ConversationSummary | None
+    ) -> list[dict[str, Any]]:
+        """Older-than-budget messages that are not folded into ``summary`` yet."""
+        older, _ = self.split(history)
+        if summary is None:
+            return older
+        for end in range(len(older), 0, -1):
+            if fingerprint(older[:end]) == summary.through:
+                return older[end:]
+        # The folded messages have been trimmed from the stored history.
+        return older
+
+    def schedule_refresh(
+        self, session_id: str, history: list[dict[str, Any]] | None = None
+    ) -> None:
+        """Fold aged-out messages into the session summary without blocking the turn.
+
+        ``history`` is the session's current conversation; without it the
+        history is read back from the session store.
+        """
+        if not self._enabled:
+            return
+        running = self._tasks.get(session_id)
+        if running is not None and not running.done():
+            return
+        task = asyncio.create_task(self.refresh(session_id, history))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(session_id, None))
+
+    async def refresh(
+        self, session_id: str, history: list[dict[str, Any]] | None = None
+    ) -> ConversationSummary | None:
+        if history is None:
+            stored = await self._store.aget_history(session_id)
+            history = [message.model_dump() for message in stored]
+        summary = await self._store.aget_summary(session_id)
+        pending = self.unsummarized(history, summary)
+        if len(pending) < self._summarize_after:
+            return summary
+        older, _ = self.split(history)
+        slot = self._admission.slot(wait=False) if self._admission else nullcontext()
+        try:
+            async with slot:
+                response = await self._llm.ainvoke(
+                    [
+                        SystemMessage(
+                            content=SUMMARY_PROMPT.format(max_tokens=self._summary_max_tokens)
+                        ),
+                        HumanMessage(
+                            content=(
+                                f"Existing summary:\n{summary.text if summary else 'None'}\n\n"
+                                "New messages:\n"
+                                + "\n".join(_format_line(message) for message in pending)
+                            )
+                        ),
+                    ]
+                )
+        except AdmissionRejected:
+            logger.debug("No free LLM slot; deferring summary update for {}", session_id)
+            return summary
+        except (openai.OpenAIError, httpx.HTTPError) as exc:
+            logger.warning("Conversation summary update failed for {}: {}", session_id, exc)
+            return summary
+        updated = ConversationSummary(
+            text=str(response.content).strip(), through=fingerprint(older)
+        )
+        await self._store.aset_summary(session_id, updated)
+        logger.debug("Updated conversation summary for {} ({} messages)", session_id, len(pending))
+        return updated
+
+    async def drain(self) -> None:
+        """Wait for in-flight summary updates (used on shutdown and in tests)."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
@@ -0,0 +1,314 @@
+"""Cheap pre-LLM routing for turns that do not need retrieval or generation."""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from app.services.metrics import ROUTER_DECISIONS
+
+SLOT_INTRO = "Here are a few time slots that could work:"
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{6,}\d")
+_WORD = re.compile(r"[a-z0-9']+")
+
+_CONTACT_FILLER = frozenset(
+    [
+        "my", "email", "e", "mail", "address", "is", "its", "it's", "it", "im", "i'm", "i", "am",
+        "phone", "number", "mobile", "cell", "you", "can", "reach", "me", "at", "here", "and", "or",
+        "on", "sure", "ok", "okay", "yes", "the", "contact", "call", "text", "please", "use",
+        "thanks", "thank",
+    ]
+)
+_ORDINALS = {
+    "first": 0, "1st": 0, "1": 0,
+    "second": 1, "2nd": 1, "2": 1,
+    "third": 2, "3rd": 2, "3": 2,
+}
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+# A slot pick is only booked without the LLM when it is phrased as a clear acceptance.
+_AFFIRMATIVE = frozenset(
+    [
+        "yes", "yeah", "yep", "yup", "sure", "ok", "okay", "works", "work", "good", "great", "fine",
+        "perfect", "please", "book", "take", "pick", "choose", "go", "sounds", "suits", "confirm",
+    ]
+)
+_NEGATION = frozenset(
+    [
+        "no", "not", "none", "nope", "never", "neither", "nor", "cannot", "cant", "dont", "doesnt",
+        "wont", "isnt", "arent", "wouldnt", "couldnt", "unable", "sorry", "unfortunately",
+        "instead", "rather",
+    ]
+)
+_PICK_WORDS = frozenset(
+    ["the", "one", "slot", "option", "time", "on", "at", "last", *_ORDINALS, *_WEEKDAYS]
+)
+
+CANNED_REPLIES = {
+    "greeting": "Hi there! How can I help you today?",
+    "thanks": "You're welcome! Is there anything else I can help you with?",
+    "goodbye": "Thanks for stopping by. Have a great day!",
+}
+
+_SEED_UTTERANCES = {
+    "greeting": [
+        "hi", "hello", "hey", "hey there", "hi there", "hello there", "hiya", "howdy",
+        "good morning", "good afternoon", "good evening", "greetings", "yo", "hi again",
+    ],
+    "thanks": [
+        "thanks", "thank you", "thanks a lot", "thank you so much", "thx", "ty",
+        "much appreciated", "appreciate it", "great thanks", "perfect thank you",
+        "awesome thanks", "cheers", "thanks for the help", "ok thanks", "got it thanks",
+    ],
+    "goodbye": [
+        "bye", "goodbye", "see you", "see ya", "talk later", "talk to you later",
+        "have a nice day", "that's all", "that is all for now", "bye for now", "cya",
+    ],
+    "other": [
+        "what services do you offer", "how much does it cost", "can you build a website",
+        "i need help with seo", "do you do ecommerce", "what is your pricing",
+        "i want to schedule a meeting", "tell me more about your company", "yes", "no",
+        "ok", "sure", "my name is", "can we talk tomorrow", "i need a new website",
+        "what are your prices", "can you also tell me about pricing",
+        "how long does a project take", "who are you", "what can you do", "is there a discount", "do you have examples of your work",
+    ],
+}
+# Words never seen in the seeds count as evidence that the turn needs the LLM.
+_UNKNOWN = "<unk>"
+_UNKNOWN_WEIGHT = 6
+
+
+def _words(text: str) -> list[str]:
+    return [word.replace("'", "") for word in _WORD.findall(text.lower())]
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes over seed utterances with additive smoothing."""
+
+    def __init__(
+        self, seeds: dict[str, list[str]] = _SEED_UTTERANCES, *, alpha: float = 0.1
+    ) -> None:
+        self._alpha = alpha
+        self._counts: dict[str, Counter] = {}
+        for label, utterances in seeds.items():
+            self._counts[label] = Counter(word for text in utterances for word in _words(text))
+        self._counts.setdefault("other", Counter())[_UNKNOWN] += _UNKNOWN_WEIGHT
+        self._vocabulary = set().union(*self._counts.values())
+        total = sum(len(utterances) for utterances in seeds.values())
+        self._log_prior = {
+            label: math.log(len(seeds.get(label, [])) / total) if seeds.get(label) else 0.0
+            for label in self._counts
+        }
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """Return the most likely label and its posterior probability."""
+        words = [word if word in self._vocabulary else _UNKNOWN for word in _words(text)]
+        if not words:
+            return "other", 1.0
+        vocabulary_size = len(self._vocabulary)
+        scores = {}
+        for label, counts in self._counts.items():
+            denominator = sum(counts.values()) + self._alpha * vocabulary_size
+            scores[label] = self._log_prior[label] + sum(
+                math.log((counts[word] + self._alpha) / denominator) for word in words
+            )
+        best = max(scores, key=scores.__getitem__)
+        normaliser = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normaliser
+
+    def covers(self, label: str, text: str) -> bool:
+        """True when every word of ``text`` occurs in the seeds for ``label``."""
+        counts = self._counts.get(label, Counter())
+        return all(counts[word] for word in _words(text))
+
+
+@dataclass
+class RouteDecision:
+    """Outcome of routing one turn; ``intent == "llm"`` means the full path."""
+
+    intent: str
+    reply: str | None = None
+    lead_info: dict[str, Any] = field(default_factory=dict)
+    meeting_details: dict[str, Any] = field(default_factory=dict)
+    next_action: str = "none"
+
+
+@dataclass
+class RouterStats:
+    decisions: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict[str, int]:
+        return dict(self.decisions)
+
+
+def extract_contact(text: str) -> dict[str, str]:
+    contact: dict[str, str] = {}
+    email = EMAIL_PATTERN.search(text)
+    if email:
+        contact["email"] = email.group(0).rstrip(".")
+    phone = PHONE_PATTERN.search(EMAIL_PATTERN.sub(" ", text))
+    if phone and sum(ch.isdigit() for ch in phone.group(0)) >= 7:
+        contact["phone"] = phone.group(0).strip()
+    return contact
+
+
+def offered_slots(history: list[dict[str, Any]]) -> list[str]:
+    """Slots listed in the latest assistant message, if it was a slot proposal."""
+    for message in reversed(history[:-1]):
+        if message.get("role") != "assistant":
+            continue
+        content = message.get("content", "")
+        if SLOT_INTRO not in content:
+            return []
+        return [
+            line[2:].strip()
+            for line in content.split(SLOT_INTRO, 1)[1].splitlines()
+            if line.startswith("- ")
+        ]
+    return []
+
+
+def match_slot(text: str, slots: list[str]) -> str | None:
+    """The offered slot ``text`` accepts, or None when the LLM should decide.
+
+    Any negation ("not Tuesday", "none of those work") rejects the match.
+    The pick must come with an affirmative word ("yes", "works", "please")
+    unless the message is nothing but the pick itself ("the last one").
+    """
+    words = _words(text)
+    if _NEGATION.intersection(words):
+        return None
+    slot = _picked_slot(text, words, slots)
+    if slot is None:
+        return None
+    rest = _words(text.lower().replace(slot.lower(), " "))
+    if _AFFIRMATIVE.intersection(words) or all(word in _PICK_WORDS for word in rest):
+        return slot
+    return None
+
+
+def _picked_slot(text: str, words: list[str], slots: list[str]) -> str | None:
+    lowered = text.lower()
+    for slot in slots:
+        if slot.lower() in lowered:
+            return slot
+    if "last" in words and slots:
+        return slots[-1]
+    ordinals = {_ORDINALS[word] for word in words if word in _ORDINALS}
+    if len(ordinals) == 1:
+        (index,) = ordinals
+        if index < len(slots):
+            return slots[index]
+    weekdays = [day for day in _WEEKDAYS if day in words]
+    if len(weekdays) == 1:
+        matches = []
+        for slot in slots:
+            try:
+                when = datetime.fromisoformat(slot)
+            except ValueError:
+                continue
+            if _WEEKDAYS[when.weekday()] == weekdays[0]:
+                matches.append(slot)
+        if len(matches) == 1:
+            return matches[0]
+    return None
+
+
+class IntentRouter:
+    """Rules plus a tiny local classifier that short-circuit trivial turns.
+
+    Greetings, thanks and goodbyes get a canned reply; messages that carry
+    only an email address or phone number fill ``lead_info`` directly; and
+    a pick from the slots offered in the previous assistant message books
+    the meeting when an email is already known. Anything else, including
+    every question, is routed to the full retrieval + LLM path.
+    """
+
+    def __init__(self, *, min_confidence: float = 0.8, max_words: int = 8) -> None:
+        self._classifier = IntentClassifier()
+        self._min_confidence = min_confidence
+        self._max_words = max_words
+        self._lock = threading.Lock()
+        self.stats = RouterStats()
+
+    def route(
+        self, history: list[dict[str, Any]], lead_info: dict[str, Any] | None = None
+    ) -> RouteDecision:
+        """Route the latest user message; ``lead_info`` holds contacts captured earlier."""
+        decision = self._decide(history, lead_info or {})
+        with self._lock:
+            self.stats.decisions[decision.intent] += 1
+        ROUTER_DECISIONS.labels(decision.intent).inc()
+        return decision
+
+    def _decide(
+        self, history: list[dict[str, Any]], lead_info: dict[str, Any]
+    ) -> RouteDecision:
+        if not history or history[-1].get("role") != "user":
+            return RouteDecision("llm")
+        text = history[-1].get("content", "").strip()
+        if not text or "?" in text:
+            return RouteDecision("llm")
+
+        slots = offered_slots(history)
+        if slots:
+            slot = match_slot(text, slots)
+            known = self._known_contact(history, lead_info)
+            if slot and known.get("email") and len(_words(text)) <= self._max_words + 4:
+                return RouteDecision(
+                    "slot_selection",
+                    lead_info=known,
+                    meeting_details={"proposed_times": slots, "confirmed_time": slot},
+                    next_action="schedule",
+                )
+
+        contact = extract_contact(text)
+        if contact:
+            leftover = EMAIL_PATTERN.sub(" ", text)
+            leftover = PHONE_PATTERN.sub(" ", leftover)
+            if all(word in _CONTACT_FILLER for word in _words(leftover)):
+                lead = {**self._known_contact(history[:-1], lead_info), **contact}
+                noted = " and ".join(
+                    f"your {label} ({contact[key]})"
+                    for key, label in (("email", "email"), ("phone", "phone number"))
+                    if key in contact
+                )
+                return RouteDecision(
+                    "contact_info",
+                    reply=(
+                        f"Thanks! I've noted {noted}. "
+                        "Would you like to book a quick call with our team?"
+                    ),
+                    lead_info=lead,
+                    next_action="capture_lead" if lead.get("email") else "none",
+                )
+            return RouteDecision("llm")
+
+        if len(_words(text)) > self._max_words:
+            return RouteDecision("llm")
+        label, confidence = self._classifier.predict(text)
+        if (
+            label in CANNED_REPLIES
+            and confidence >= self._min_confidence
+            and self._classifier.covers(label, text)
+        ):
+            return RouteDecision(label, reply=CANNED_REPLIES[label])
+        return RouteDecision("llm")
+
+    @staticmethod
+    def _known_contact(
+        history: list[dict[str, Any]], lead_info: dict[str, Any]
+    ) -> dict[str, str]:
+        known: dict[str, str] = {}
+        for message in history:
+            if message.get("role") == "user":
+                known.update(extract_contact(message.get("content", "")))
+        # Details captured on earlier turns may predate the stored history.
+        known.update({key: value for key, value in lead_info.items() if value})
+        return known
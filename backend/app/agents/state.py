@@ -1,15 +1,36 @@
-from typing import Any, Literal, TypedDict
+from typing import Annotated, Any, Literal, TypedDict
+
+from app.config.settings import get_settings
+
+
+def append_messages(
+    history: list[dict[str, Any]] | None, new: list[dict[str, Any]] | None
+) -> list[dict[str, Any]]:
+    """Reducer for ``messages``: nodes return only new messages.
+
+    The merged history is capped at ``session_max_messages``, like the
+    session store it replaces.
+    """
+    merged = [*(history or ()), *(new or ())]
+    limit = get_settings().session_max_messages
+    if limit and len(merged) > limit:
+        return merged[-limit:]
+    return merged
 
 
 class AgentState(TypedDict, total=False):
     """State tracked throughout the LangGraph conversation."""
 
     session_id: str
-    messages: list[dict[str, Any]]
+    messages: Annotated[list[dict[str, Any]], append_messages]
     lead_captured: bool
     meeting_scheduled: bool
     lead_info: dict[str, Any]
     meeting_details: dict[str, Any]
+    summary: dict[str, str]
+    route: str
+    timezone: str
+    deadline: float
     next_action: Literal[
         "greet",
         "collect_context",
@@ -18,4 +39,3 @@ class AgentState(TypedDict, total=False):
         "schedule_meeting",
         "finalize",
     ]
-
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any
+
+from langchain_core.messages import BaseMessageChunk
+from langchain_core.utils.json import parse_partial_json
+
+
+class ReplyStreamExtractor:
+    """Incrementally extract the ``reply`` field from a streamed ``DecisionPayload``.
+
+    The structured-output call streams raw JSON (as message content for the
+    ``json_schema`` method or as tool-call argument chunks for
+    ``function_calling``). Each fed chunk re-parses the partial JSON buffer and
+    returns only the newly visible part of ``reply``.
+    """
+
+    def __init__(self, field: str = "reply") -> None:
+        self._field = field
+        self._buffer = ""
+        self._emitted = ""
+
+    @property
+    def text(self) -> str:
+        return self._emitted
+
+    def feed(self, chunk: BaseMessageChunk | Any) -> str:
+        fragment = self._fragment(chunk)
+        if not fragment:
+            return ""
+        self._buffer += fragment
+        try:
+            parsed = parse_partial_json(self._buffer)
+        except ValueError:  # pragma: no cover - defensive, partial parser is lenient
+            return ""
+        if not isinstance(parsed, dict):
+            return ""
+        value = parsed.get(self._field)
+        if not isinstance(value, str) or not value.startswith(self._emitted):
+            return ""
+        delta = value[len(self._emitted) :]
+        self._emitted = value
+        return delta
+
+    @staticmethod
+    def _fragment(chunk: BaseMessageChunk | Any) -> str:
+        content = getattr(chunk, "content", None)
+        if isinstance(content, str) and content:
+            return content
+        for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+            args = tool_chunk.get("args")
+            if args:
+                return args
+        return ""
@@ -1,10 +1,20 @@
+import json
+from collections.abc import AsyncIterator
 from functools import lru_cache
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from loguru import logger
+from pydantic import ValidationError
 
-from app.agents.graph import AgentOrchestrator
-from app.models.chat import AgentResponse, ChatTurn
+from app.agents.graph import TURN_ERRORS, AgentOrchestrator
+from app.config.settings import get_settings
+from app.models.chat import AgentResponse, BatchChatRequest, ChatTurn
+from app.services.admission import AdmissionRejected
+from app.services.metrics import render_latest
+from app.services.outbox import get_outbox_worker
+from app.services.warmup import READINESS
 
 router = APIRouter()
 
@@ -14,16 +24,153 @@ def get_agent() -> AgentOrchestrator:
     return AgentOrchestrator()
 
 
+def _too_busy(exc: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=exc.reason,
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
+def _busy_event(exc: AdmissionRejected) -> dict[str, Any]:
+    return {
+        "event": "error",
+        "data": {"detail": exc.reason, "retry_after": exc.retry_after_header},
+    }
+
+
+def _encode_event(event: dict[str, Any]) -> dict[str, Any]:
+    if event["event"] == "final":
+        return {"event": "final", "data": event["data"].model_dump()}
+    return {"event": event["event"], "data": {"delta": event["delta"]}}
+
+
 @router.get("/health", response_class=JSONResponse)
+@router.get("/health/live", response_class=JSONResponse)
 async def healthcheck() -> dict[str, str]:
+    """Liveness: the process is up and serving requests."""
     return {"status": "ok"}
 
 
+@router.get("/health/ready")
+async def readiness() -> JSONResponse:
+    """Readiness: 200 once startup warm-up has finished, 503 before or if it failed."""
+    return JSONResponse(
+        status_code=200 if READINESS.ready else 503, content=READINESS.as_dict()
+    )
+
+
+@router.get("/metrics")
+async def prometheus_metrics() -> Response:
+    """Prometheus text exposition of latency, error, token and cache metrics."""
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
+
+@router.get("/outbox", response_class=JSONResponse)
+async def outbox_stats() -> dict[str, float]:
+    """Queue depth, dead letters and delivery lag of the notification outbox."""
+    return get_outbox_worker().stats().as_dict()
+
+
 @router.post("/chat", response_model=AgentResponse)
 async def chat(turn: ChatTurn) -> AgentResponse:
     if not turn.message.content:
         raise HTTPException(status_code=400, detail="Message content required.")
 
-    return await get_agent().run(session_id=turn.session_id, messages=[turn.message])
+    try:
+        return await get_agent().run(
+            session_id=turn.session_id, messages=[turn.message], timezone=turn.timezone
+        )
+    except AdmissionRejected as exc:
+        raise _too_busy(exc) from exc
+
+
+@router.post("/chat/batch")
+async def chat_batch(batch: BatchChatRequest) -> StreamingResponse:
+    """Replay independent turns concurrently, streaming NDJSON results as they finish."""
+    max_turns = get_settings().batch_max_turns
+    if len(batch.turns) > max_turns:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_turns} turns.")
+
+    agent = get_agent()
+
+    async def lines() -> AsyncIterator[str]:
+        async for result in agent.run_batch(batch.turns, concurrency=batch.concurrency):
+            yield json.dumps(result.model_dump()) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/chat/stream")
+async def chat_stream(turn: ChatTurn) -> StreamingResponse:
+    """Stream reply tokens as server-sent events, ending with a ``final`` event."""
+    if not turn.message.content:
+        raise HTTPException(status_code=400, detail="Message content required.")
+
+    agent = get_agent()
+    try:
+        agent.check_admission(turn.session_id)
+    except AdmissionRejected as exc:
+        raise _too_busy(exc) from exc
+
+    async def event_source() -> AsyncIterator[str]:
+        try:
+            async for event in agent.astream(
+                session_id=turn.session_id,
+                messages=[turn.message],
+                timezone=turn.timezone,
+            ):
+                encoded = _encode_event(event)
+                yield f"event: {encoded['event']}\ndata: {json.dumps(encoded['data'])}\n\n"
+        except AdmissionRejected as exc:
+            busy = _busy_event(exc)
+            yield f"event: error\ndata: {json.dumps(busy['data'])}\n\n"
+        except TURN_ERRORS as exc:
+            logger.exception("Streaming chat turn failed: {}", exc)
+            yield f"event: error\ndata: {json.dumps({'detail': 'Chat turn failed.'})}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
+@router.websocket("/chat/ws")
+async def chat_websocket(websocket: WebSocket) -> None:
+    """Bidirectional chat: each received ``ChatTurn`` is answered with streamed events."""
+    await websocket.accept()
+    agent = get_agent()
+    try:
+        while True:
+            try:
+                turn = ChatTurn.model_validate(await websocket.receive_json())
+            except (ValidationError, ValueError):
+                await websocket.send_json(
+                    {"event": "error", "data": {"detail": "Invalid chat turn payload."}}
+                )
+                continue
+            if not turn.message.content:
+                await websocket.send_json(
+                    {"event": "error", "data": {"detail": "Message content required."}}
+                )
+                continue
+            try:
+                async for event in agent.astream(
+                    session_id=turn.session_id,
+                    messages=[turn.message],
+                    timezone=turn.timezone,
+                ):
+                    await websocket.send_json(_encode_event(event))
+            except WebSocketDisconnect:
+                raise
+            except AdmissionRejected as exc:
+                await websocket.send_json(_busy_event(exc))
+            except TURN_ERRORS as exc:
+                logger.exception("Streaming chat turn failed: {}", exc)
+                await websocket.send_json(
+                    {"event": "error", "data": {"detail": "Chat turn failed."}}
+                )
+    except WebSocketDisconnect:
+        logger.debug("Chat websocket disconnected.")
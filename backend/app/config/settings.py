@@ -1,4 +1,5 @@
 from functools import lru_cache
+
 from pydantic import AnyHttpUrl, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -21,10 +22,50 @@ class Settings(BaseSettings):
         extra="allow"
     )
 
+    # Startup warm-up (see /api/health/ready)
+    startup_warmup_enabled: bool = Field(
+        default=True,
+        env="STARTUP_WARMUP_ENABLED",
+    )
+    startup_warmup_blocking: bool = Field(
+        default=False,
+        env="STARTUP_WARMUP_BLOCKING",
+        description="Finish warm-up before serving (for platforms without readiness probes).",
+    )
+
     # LLM configuration
     openai_api_key: SecretStr | None = Field(default=None, env="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", env="OPENAI_MODEL")
 
+    # Per-turn latency budget and hedged decision requests
+    turn_latency_budget_seconds: float = Field(
+        default=20.0,
+        env="TURN_LATENCY_BUDGET_SECONDS",
+        description="Deadline for the decision LLM within a turn; 0 disables it.",
+    )
+    llm_hedge_enabled: bool = Field(
+        default=False,
+        env="LLM_HEDGE_ENABLED",
+        description="Send a second decision request when the first runs slow or fails.",
+    )
+    llm_hedge_model: str | None = Field(
+        default=None,
+        env="LLM_HEDGE_MODEL",
+        description="Model for hedged/fallback requests; defaults to OPENAI_MODEL.",
+    )
+    llm_hedge_percentile: float = Field(
+        default=95.0,
+        env="LLM_HEDGE_PERCENTILE",
+    )
+    llm_hedge_min_delay_seconds: float = Field(
+        default=1.0,
+        env="LLM_HEDGE_MIN_DELAY_SECONDS",
+    )
+    llm_hedge_initial_delay_seconds: float = Field(
+        default=4.0,
+        env="LLM_HEDGE_INITIAL_DELAY_SECONDS",
+    )
+
     # Vector store configuration
     chroma_persist_directory: str | None = Field(
         default="./data/chroma",
@@ -34,6 +75,331 @@ class Settings(BaseSettings):
         default="business_docs",
         env="CHROMA_COLLECTION_NAME",
     )
+    vector_store_backend: str = Field(
+        default="chroma",
+        env="VECTOR_STORE_BACKEND",
+        description="chroma, or mmap for the memory-mapped brute-force index.",
+    )
+    vector_index_quantization: str = Field(
+        default="int8",
+        env="VECTOR_INDEX_QUANTIZATION",
+        description="int8, float16 or none; codes scanned by the mmap backend.",
+    )
+    vector_index_rescore_factor: int = Field(
+        default=4,
+        env="VECTOR_INDEX_RESCORE_FACTOR",
+        description="Candidates per result re-scored with float32 vectors (mmap backend).",
+    )
+
+    retrieval_timeout_seconds: float = Field(
+        default=2.0,
+        env="RETRIEVAL_TIMEOUT_SECONDS",
+    )
+    retrieval_max_workers: int = Field(
+        default=4,
+        env="RETRIEVAL_MAX_WORKERS",
+    )
+    retrieval_mode: str = Field(
+        default="hybrid",
+        env="RETRIEVAL_MODE",
+        description="hybrid (BM25 + vector with RRF), dense or lexical.",
+    )
+    retrieval_candidates: int = Field(
+        default=12,
+        env="RETRIEVAL_CANDIDATES",
+    )
+    retrieval_rrf_k: int = Field(
+        default=60,
+        env="RETRIEVAL_RRF_K",
+    )
+    retrieval_lexical_fast_path: bool = Field(
+        default=True,
+        env="RETRIEVAL_LEXICAL_FAST_PATH",
+    )
+    retrieval_lexical_confidence: float = Field(
+        default=0.85,
+        env="RETRIEVAL_LEXICAL_CONFIDENCE",
+    )
+    retrieval_top_k: int = Field(
+        default=3,
+        env="RETRIEVAL_TOP_K",
+        description="Documents passed to the prompt per turn.",
+    )
+    retrieval_rerank_enabled: bool = Field(
+        default=True,
+        env="RETRIEVAL_RERANK_ENABLED",
+    )
+    retrieval_rerank_fetch_k: int = Field(
+        default=20,
+        env="RETRIEVAL_RERANK_FETCH_K",
+        description="Candidates fetched (with their vectors) before diversity reranking.",
+    )
+    retrieval_mmr_lambda: float = Field(
+        default=0.7,
+        env="RETRIEVAL_MMR_LAMBDA",
+        description="1.0 ranks by relevance only; lower values favour diverse results.",
+    )
+    retrieval_duplicate_threshold: float = Field(
+        default=0.95,
+        env="RETRIEVAL_DUPLICATE_THRESHOLD",
+        description="Cosine similarity at which a candidate counts as a near-duplicate.",
+    )
+    retrieval_shingle_threshold: float = Field(
+        default=0.8,
+        env="RETRIEVAL_SHINGLE_THRESHOLD",
+        description="Word-shingle Jaccard similarity at which a candidate is a near-duplicate.",
+    )
+    retrieval_max_per_source: int = Field(
+        default=2,
+        env="RETRIEVAL_MAX_PER_SOURCE",
+        description="Most documents taken from one source; 0 disables the cap.",
+    )
+    context_token_budget: int = Field(
+        default=600,
+        env="CONTEXT_TOKEN_BUDGET",
+        description="Most tokens of retrieved context in the prompt; 0 keeps whole documents.",
+    )
+
+    chunk_max_tokens: int = Field(
+        default=400,
+        env="CHUNK_MAX_TOKENS",
+    )
+    chunk_overlap_tokens: int = Field(
+        default=60,
+        env="CHUNK_OVERLAP_TOKENS",
+    )
+    loader_max_workers: int | None = Field(
+        default=None,
+        env="LOADER_MAX_WORKERS",
+    )
+    ingest_batch_size: int = Field(
+        default=64,
+        env="INGEST_BATCH_SIZE",
+    )
+    ingest_concurrency: int = Field(
+        default=4,
+        env="INGEST_CONCURRENCY",
+    )
+
+    # Embeddings
+    embedding_backend: str = Field(
+        default="openai",
+        env="EMBEDDING_BACKEND",
+        description="openai, or hashing for local feature-hashed n-gram vectors.",
+    )
+    embedding_model: str = Field(
+        default="text-embedding-3-large",
+        env="EMBEDDING_MODEL",
+    )
+    embedding_dimensions: int | None = Field(
+        default=None,
+        env="EMBEDDING_DIMENSIONS",
+        description="Reduced vector size (OpenAI dimensions, or hashing projection).",
+    )
+    embedding_hash_features: int = Field(
+        default=4096,
+        env="EMBEDDING_HASH_FEATURES",
+    )
+
+    # Embedding cache configuration
+    embedding_cache_enabled: bool = Field(
+        default=True,
+        env="EMBEDDING_CACHE_ENABLED",
+    )
+    embedding_cache_max_entries: int = Field(
+        default=10_000,
+        env="EMBEDDING_CACHE_MAX_ENTRIES",
+    )
+    embedding_cache_ttl_seconds: float = Field(
+        default=24 * 60 * 60,
+        env="EMBEDDING_CACHE_TTL_SECONDS",
+    )
+    embedding_cache_persist: bool = Field(
+        default=True,
+        env="EMBEDDING_CACHE_PERSIST",
+    )
+    embedding_cache_disk_max_entries: int = Field(
+        default=100_000,
+        env="EMBEDDING_CACHE_DISK_MAX_ENTRIES",
+        description="Vectors kept on disk; the oldest are evicted beyond this (0 = unbounded).",
+    )
+    embedding_cache_disk_ttl_seconds: float = Field(
+        default=30 * 24 * 60 * 60,
+        env="EMBEDDING_CACHE_DISK_TTL_SECONDS",
+        description="Age after which on-disk vectors are ignored and purged (0 = never).",
+    )
+
+    # Semantic answer cache (opt-in)
+    answer_cache_enabled: bool = Field(
+        default=False,
+        env="ANSWER_CACHE_ENABLED",
+    )
+    answer_cache_similarity_threshold: float = Field(
+        default=0.92,
+        env="ANSWER_CACHE_SIMILARITY_THRESHOLD",
+    )
+    answer_cache_ttl_seconds: float = Field(
+        default=60 * 60,
+        env="ANSWER_CACHE_TTL_SECONDS",
+    )
+    answer_cache_max_entries: int = Field(
+        default=512,
+        env="ANSWER_CACHE_MAX_ENTRIES",
+    )
+
+    # Intent router (answers trivial turns without retrieval or the LLM)
+    intent_router_enabled: bool = Field(
+        default=True,
+        env="INTENT_ROUTER_ENABLED",
+    )
+    intent_router_min_confidence: float = Field(
+        default=0.8,
+        env="INTENT_ROUTER_MIN_CONFIDENCE",
+    )
+    intent_router_max_words: int = Field(
+        default=8,
+        env="INTENT_ROUTER_MAX_WORDS",
+    )
+
+    # Admission control and per-session turn ordering
+    llm_max_concurrency: int = Field(
+        default=8,
+        env="LLM_MAX_CONCURRENCY",
+    )
+    llm_max_queue: int = Field(
+        default=32,
+        env="LLM_MAX_QUEUE",
+    )
+    llm_queue_timeout_seconds: float = Field(
+        default=10.0,
+        env="LLM_QUEUE_TIMEOUT_SECONDS",
+    )
+    session_max_pending_turns: int = Field(
+        default=4,
+        env="SESSION_MAX_PENDING_TURNS",
+    )
+
+    # Batch replay (POST /api/chat/batch)
+    batch_max_turns: int = Field(
+        default=5000,
+        env="BATCH_MAX_TURNS",
+    )
+    batch_max_concurrency: int = Field(
+        default=8,
+        env="BATCH_MAX_CONCURRENCY",
+    )
+    batch_embedding_chunk_size: int = Field(
+        default=256,
+        env="BATCH_EMBEDDING_CHUNK_SIZE",
+    )
+    batch_admission_retries: int = Field(
+        default=3,
+        env="BATCH_ADMISSION_RETRIES",
+    )
+
+    # Session store configuration
+    session_store_backend: str = Field(
+        default="memory",
+        env="SESSION_STORE_BACKEND",
+        description="One of 'memory', 'sqlite' or 'redis'.",
+    )
+    session_max_messages: int = Field(
+        default=50,
+        env="SESSION_MAX_MESSAGES",
+    )
+    session_ttl_seconds: float = Field(
+        default=24 * 60 * 60,
+        env="SESSION_TTL_SECONDS",
+    )
+    session_max_sessions: int = Field(
+        default=10_000,
+        env="SESSION_MAX_SESSIONS",
+    )
+    session_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        env="SESSION_MAX_BYTES",
+    )
+    session_sqlite_path: str = Field(
+        default="./data/sessions.sqlite3",
+        env="SESSION_SQLITE_PATH",
+    )
+    session_redis_url: str = Field(
+        default="redis://localhost:6379/0",
+        env="SESSION_REDIS_URL",
+    )
+
+    # LangGraph checkpoints (per-session graph state)
+    checkpoint_enabled: bool = Field(
+        default=True,
+        env="CHECKPOINT_ENABLED",
+        description="Keep conversation state in graph checkpoints instead of session history.",
+    )
+    checkpoint_path: str = Field(
+        default="./data/checkpoints.sqlite3",
+        env="CHECKPOINT_PATH",
+        description="SQLite file for graph checkpoints; empty keeps them in memory.",
+    )
+    checkpoint_keep: int = Field(
+        default=2,
+        env="CHECKPOINT_KEEP",
+        description="Checkpoints retained per session; older ones are compacted away.",
+    )
+
+    # Prompt history budget and rolling summary
+    history_token_budget: int = Field(
+        default=1200,
+        env="HISTORY_TOKEN_BUDGET",
+    )
+    history_summary_enabled: bool = Field(
+        default=True,
+        env="HISTORY_SUMMARY_ENABLED",
+    )
+    history_summarize_after: int = Field(
+        default=4,
+        env="HISTORY_SUMMARIZE_AFTER",
+    )
+    history_summary_max_tokens: int = Field(
+        default=300,
+        env="HISTORY_SUMMARY_MAX_TOKENS",
+    )
+
+    # Shared outbound HTTP client
+    http_timeout_seconds: float = Field(
+        default=10.0,
+        env="HTTP_TIMEOUT_SECONDS",
+    )
+    http_max_connections: int = Field(
+        default=20,
+        env="HTTP_MAX_CONNECTIONS",
+    )
+    http_max_keepalive_connections: int = Field(
+        default=10,
+        env="HTTP_MAX_KEEPALIVE_CONNECTIONS",
+    )
+    http_keepalive_expiry_seconds: float = Field(
+        default=30.0,
+        env="HTTP_KEEPALIVE_EXPIRY_SECONDS",
+    )
+    http_enable_http2: bool = Field(
+        default=True,
+        env="HTTP_ENABLE_HTTP2",
+    )
+    http_retry_attempts: int = Field(
+        default=3,
+        env="HTTP_RETRY_ATTEMPTS",
+    )
+    http_retry_backoff_seconds: float = Field(
+        default=0.5,
+        env="HTTP_RETRY_BACKOFF_SECONDS",
+    )
+    http_retry_backoff_max_seconds: float = Field(
+        default=8.0,
+        env="HTTP_RETRY_BACKOFF_MAX_SECONDS",
+    )
+    http_retry_after_max_seconds: float = Field(
+        default=30.0,
+        env="HTTP_RETRY_AFTER_MAX_SECONDS",
+    )
 
     # Discord integration
     discord_webhook_url: AnyHttpUrl | None = Field(
@@ -41,6 +407,43 @@ class Settings(BaseSettings):
         env="DISCORD_WEBHOOK_URL",
     )
 
+    # Lead store
+    lead_store_path: str = Field(
+        default="./data/leads.sqlite3",
+        env="LEAD_STORE_PATH",
+        description="SQLite file for captured leads; empty keeps them in memory.",
+    )
+
+    # Notification outbox
+    outbox_enabled: bool = Field(
+        default=True,
+        env="OUTBOX_ENABLED",
+    )
+    outbox_path: str = Field(
+        default="./data/outbox.sqlite3",
+        env="OUTBOX_PATH",
+    )
+    outbox_batch_size: int = Field(
+        default=20,
+        env="OUTBOX_BATCH_SIZE",
+    )
+    outbox_poll_interval_seconds: float = Field(
+        default=1.0,
+        env="OUTBOX_POLL_INTERVAL_SECONDS",
+    )
+    outbox_max_attempts: int = Field(
+        default=8,
+        env="OUTBOX_MAX_ATTEMPTS",
+    )
+    outbox_retry_backoff_seconds: float = Field(
+        default=2.0,
+        env="OUTBOX_RETRY_BACKOFF_SECONDS",
+    )
+    outbox_retry_backoff_max_seconds: float = Field(
+        default=300.0,
+        env="OUTBOX_RETRY_BACKOFF_MAX_SECONDS",
+    )
+
     # Scheduling integration
     calendly_api_token: SecretStr | None = Field(
         default=None,
@@ -55,6 +458,46 @@ class Settings(BaseSettings):
         env="FALLBACK_MEETING_LINK",
     )
 
+    # Meeting availability (slot suggestions)
+    business_timezone: str = Field(
+        default="UTC",
+        env="BUSINESS_TIMEZONE",
+    )
+    business_days: list[int] = Field(
+        default=[0, 1, 2, 3, 4],
+        env="BUSINESS_DAYS",
+        description="Weekdays with bookable hours (0 = Monday).",
+    )
+    business_hours_start: int = Field(
+        default=9,
+        env="BUSINESS_HOURS_START",
+    )
+    business_hours_end: int = Field(
+        default=17,
+        env="BUSINESS_HOURS_END",
+    )
+    meeting_duration_minutes: int = Field(
+        default=30,
+        env="MEETING_DURATION_MINUTES",
+    )
+    availability_min_notice_minutes: int = Field(
+        default=240,
+        env="AVAILABILITY_MIN_NOTICE_MINUTES",
+    )
+    availability_horizon_days: int = Field(
+        default=14,
+        env="AVAILABILITY_HORIZON_DAYS",
+    )
+    availability_cache_ttl_seconds: float = Field(
+        default=300.0,
+        env="AVAILABILITY_CACHE_TTL_SECONDS",
+    )
+    availability_ics_path: str | None = Field(
+        default=None,
+        env="AVAILABILITY_ICS_PATH",
+        description="Local iCalendar file whose events count as busy time.",
+    )
+
     # LangSmith tracing configuration
     langsmith_tracing: bool = Field(
         default=False,
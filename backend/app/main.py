@@ -1,17 +1,69 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.agents.graph import AgentOrchestrator
+from app.api import routes
 from app.api.routes import router as api_router
 from app.config.settings import get_settings
-
-from dotenv import load_dotenv
+from app.services.availability import get_availability_engine
+from app.services.http_client import close_http_client, open_http_client
+from app.services.outbox import get_outbox_worker
+from app.services.warmup import READINESS, build_agent, warm_up
 
 load_dotenv()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    await open_http_client()
+    outbox = get_outbox_worker() if settings.outbox_enabled else None
+    if outbox is not None:
+        outbox.start()
+    availability = get_availability_engine()
+    availability.start()
+    READINESS.reset()
+    warmup: asyncio.Task | None = None
+    agent = None
+    if not settings.startup_warmup_enabled:
+        READINESS.mark_ready()
+    else:
+        # Built here, before serving, so no request races the cached factory.
+        agent = build_agent(routes.get_agent)
+        if agent is not None and settings.startup_warmup_blocking:
+            await warm_up(agent)
+        elif agent is not None:
+            warmup = asyncio.create_task(warm_up(agent), name="warm-up")
+    try:
+        yield
+    finally:
+        if warmup is not None and not warmup.done():
+            warmup.cancel()
+        agent = agent or _built_agent()
+        if agent is not None:
+            await agent.aclose()
+        await availability.stop()
+        if outbox is not None:
+            await outbox.stop()
+        await close_http_client()
+
+
+def _built_agent() -> AgentOrchestrator | None:
+    """The cached agent if a request already built it; never builds one."""
+    cache_info = getattr(routes.get_agent, "cache_info", None)
+    if cache_info is not None and cache_info().currsize:
+        return routes.get_agent()
+    return None
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title=settings.app_name, debug=settings.debug)
+    app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -1,5 +1,4 @@
-from datetime import datetime
-from typing import Any, Literal, Optional
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -12,11 +11,21 @@ class ChatMessage(BaseModel):
     # timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ConversationSummary(BaseModel):
+    """Rolling summary of the turns that no longer fit the prompt verbatim."""
+
+    text: str
+    through: str = Field(description="Fingerprint of the last messages folded into the summary.")
+
+
 class ChatTurn(BaseModel):
     """Incoming chat payload from the widget."""
 
     session_id: str
     message: ChatMessage
+    timezone: str | None = Field(
+        default=None, description="Visitor's IANA time zone, e.g. 'Europe/Berlin'."
+    )
     # history: list[ChatMessage] = Field(default_factory=list)
     # metadata: dict[str, Any] = Field(default_factory=dict)
 
@@ -28,7 +37,7 @@ class AgentResponse(BaseModel):
     messages: list[ChatMessage]
     lead_captured: bool = False
     meeting_scheduled: bool = False
-    suggested_slots: Optional[list[str]] = None
+    suggested_slots: list[str] | None = None
 
 
 class LeadCapture(BaseModel):
@@ -47,3 +56,29 @@ class MeetingProposal(BaseModel):
     proposed_times: list[str] = Field(default_factory=list)
     confirmed_time: str | None = None
     calendly_invite_url: str | None = None
+
+
+class BatchChatRequest(BaseModel):
+    """Independent chat turns to replay in bulk (e.g. offline evaluation)."""
+
+    turns: list[ChatTurn] = Field(min_length=1)
+    concurrency: int | None = Field(
+        default=None, ge=1, description="Sessions replayed at once; capped by the server."
+    )
+
+
+class BatchTurnResult(BaseModel):
+    """One line of a batch reply; ``index`` points into ``BatchChatRequest.turns``."""
+
+    index: int
+    session_id: str
+    response: AgentResponse | None = None
+    error: str | None = None
+
+
+class AgentStreamSummary(AgentResponse):
+    """Final event of a streamed turn carrying the decision metadata."""
+
+    next_action: str = "none"
+    lead: LeadCapture | None = None
+    meeting: MeetingProposal | None = None
@@ -0,0 +1,95 @@
+"""Token-bounded, overlapping text chunking with character offsets."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+
+_SEPARATORS = (
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?])\s+"),
+    re.compile(r"\s+"),
+)
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except (ImportError, OSError, ValueError):  # pragma: no cover - offline or missing files
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the embedding model's tokenizer, approximating if unavailable."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(_APPROX_TOKEN.findall(text))
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    text: str
+    start: int
+    end: int
+    tokens: int
+
+
+def _units(
+    text: str, start: int, end: int, level: int, max_tokens: int, count: Callable[[str], int]
+) -> Iterator[tuple[int, int, int]]:
+    """Yield ``(start, end, tokens)`` spans no larger than ``max_tokens`` where possible."""
+    tokens = count(text[start:end])
+    if tokens <= max_tokens or level >= len(_SEPARATORS):
+        yield start, end, tokens
+        return
+    cursor = start
+    for match in _SEPARATORS[level].finditer(text, start, end):
+        if match.start() > cursor:
+            yield from _units(text, cursor, match.start(), level + 1, max_tokens, count)
+        cursor = match.end()
+    if cursor < end:
+        yield from _units(text, cursor, end, level + 1, max_tokens, count)
+
+
+def split_text(
+    text: str,
+    *,
+    max_tokens: int = 400,
+    overlap_tokens: int = 60,
+    count: Callable[[str], int] = count_tokens,
+) -> list[TextChunk]:
+    """Split ``text`` into chunks of at most ``max_tokens`` that overlap by ``overlap_tokens``.
+
+    Text is broken at paragraph, line, sentence and finally word boundaries,
+    then packed greedily. Each chunk keeps its character span in ``text``.
+    """
+    if not text.strip():
+        return []
+    units = [unit for unit in _units(text, 0, len(text), 0, max_tokens, count) if unit[2]]
+    chunks: list[TextChunk] = []
+    first = 0
+    while first < len(units):
+        last = first
+        total = units[first][2]
+        while last + 1 < len(units) and total + units[last + 1][2] <= max_tokens:
+            last += 1
+            total += units[last][2]
+        start, end = units[first][0], units[last][1]
+        chunks.append(TextChunk(text[start:end], start, end, total))
+        if last + 1 >= len(units):
+            break
+        next_first = last + 1
+        carried = 0
+        while next_first - 1 > first and carried + units[next_first - 1][2] <= overlap_tokens:
+            next_first -= 1
+            carried += units[next_first][2]
+        first = next_first
+    return chunks
@@ -1,21 +1,110 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable
 
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_core.documents import Document
+from loguru import logger
+
+from app.config.settings import get_settings
+from app.retrieval.chunking import split_text
+from app.retrieval.parsers import extract_text
 
 
-def load_documents(data_dir: Path) -> Iterable[Document]:
-    """Load documents from a directory using basic text loader fallback."""
+def iter_source_files(data_dir: Path) -> Iterator[Path]:
+    """Yield ingestible files under ``data_dir`` in a stable order."""
 
     if not data_dir.exists():
         raise FileNotFoundError(f"Document directory not found: {data_dir}")
 
-    loader = DirectoryLoader(
-        str(data_dir),
-        glob="**/*",
-        show_progress=True,
-        loader_cls=TextLoader,
-    )
-    return loader.load()
+    for path in sorted(data_dir.rglob("*")):
+        if path.is_file() and not path.name.startswith("."):
+            yield path
+
+
+def load_file(
+    path: Path, *, max_tokens: int | None = None, overlap_tokens: int | None = None
+) -> list[Document]:
+    """Parse a single file and split it into token-bounded, overlapping chunks."""
+
+    settings = get_settings()
+    max_tokens = max_tokens or settings.chunk_max_tokens
+    overlap_tokens = settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+    extracted = extract_text(path)
+    if extracted is None:
+        return []
+    file_format, text = extracted
+    chunks = split_text(text, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+    return [
+        Document(
+            page_content=chunk.text,
+            metadata={
+                "source": str(path),
+                "format": file_format,
+                "chunk_index": index,
+                "start_index": chunk.start,
+                "end_index": chunk.end,
+                "tokens": chunk.tokens,
+            },
+        )
+        for index, chunk in enumerate(chunks)
+    ]
+
+
+def _load_path(path: str, max_tokens: int, overlap_tokens: int) -> list[Document] | None:
+    try:
+        return load_file(Path(path), max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+    except (OSError, ValueError) as exc:
+        logger.warning("Failed to load {}: {}", path, exc)
+        return None
+
+
+def iter_loaded_files(
+    paths: Iterable[Path], *, max_workers: int | None = None
+) -> Iterator[tuple[Path, list[Document] | None]]:
+    """Parse and chunk files in a process pool, yielding results in input order.
+
+    At most ``2 * max_workers`` files are in flight at once, so memory stays
+    bounded by the largest few files rather than the corpus size. Use
+    ``max_workers=0`` to load in-process. Files that fail to parse yield
+    ``None`` instead of a (possibly empty) list of chunks.
+    """
+    settings = get_settings()
+    if max_workers is None:
+        max_workers = settings.loader_max_workers or os.cpu_count() or 1
+    args = (settings.chunk_max_tokens, settings.chunk_overlap_tokens)
+
+    if max_workers <= 0:
+        for path in paths:
+            yield path, _load_path(str(path), *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: deque[tuple[Path, Future]] = deque()
+        for path in paths:
+            in_flight.append((path, executor.submit(_load_path, str(path), *args)))
+            if len(in_flight) >= 2 * max_workers:
+                done_path, future = in_flight.popleft()
+                yield done_path, future.result()
+        while in_flight:
+            done_path, future = in_flight.popleft()
+            yield done_path, future.result()
+
+
+def iter_document_batches(
+    data_dir: Path, *, batch_size: int = 64, max_workers: int | None = None
+) -> Iterator[list[Document]]:
+    """Stream chunked documents under ``data_dir`` in batches of ``batch_size``."""
 
+    batch: list[Document] = []
+    for _, documents in iter_loaded_files(iter_source_files(data_dir), max_workers=max_workers):
+        for doc in documents or ():
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def cache_key(model: str, text: str) -> str:
+    digest = hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+class _MemoryTier:
+    """Thread-safe LRU with per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, vector = entry
+            if self._ttl_seconds and time.monotonic() - stored_at > self._ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: list[float]) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _DiskTier:
+    """SQLite-backed vector store that survives process restarts.
+
+    Rows older than ``ttl_seconds`` are ignored and purged; past
+    ``max_entries`` rows the oldest are evicted after each write.
+    """
+
+    def __init__(self, path: Path, *, max_entries: int = 100_000, ttl_seconds: float = 0) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at)"
+        )
+        self._conn.commit()
+        with self._lock:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._evict()
+
+    def _cutoff(self) -> float:
+        return time.time() - self._ttl_seconds if self._ttl_seconds else 0.0
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+        found: dict[str, list[float]] = {}
+        cutoff = self._cutoff()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})"
+                    " AND created_at >= ?",
+                    [*batch, cutoff],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: dict[str, list[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (key, model, array("f", vector).tobytes(), now)
+                    for key, vector in items.items()
+                ],
+            )
+            # Replaced keys do not grow the table; an upper bound is enough to trigger eviction.
+            self._count += len(items)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired rows, then the oldest rows beyond ``max_entries``; commits."""
+        if self._ttl_seconds:
+            self._count -= self._conn.execute(
+                "DELETE FROM embeddings WHERE created_at < ?", (self._cutoff(),)
+            ).rowcount
+        if self._max_entries > 0 and self._count > self._max_entries:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            overflow = self._count - self._max_entries
+            if overflow > 0:
+                self._count -= self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN"
+                    " (SELECT key FROM embeddings ORDER BY created_at LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with an in-process LRU and an optional on-disk tier.
+
+    Entries are keyed by a hash of the model name and the normalized text, so
+    repeated queries and unchanged document chunks never reach the underlying
+    embeddings provider twice. Disk vectors are stored as float32, expire
+    after ``disk_ttl_seconds`` and are capped at ``disk_max_entries``; the
+    async methods read and write them in a worker thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        *,
+        model: str,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 24 * 60 * 60,
+        persist_path: Path | None = None,
+        disk_max_entries: int = 100_000,
+        disk_ttl_seconds: float = 30 * 24 * 60 * 60,
+    ) -> None:
+        self._underlying = underlying
+        self._model = model
+        self._memory = _MemoryTier(max_entries, ttl_seconds)
+        self._disk = (
+            _DiskTier(persist_path, max_entries=disk_max_entries, ttl_seconds=disk_ttl_seconds)
+            if persist_path
+            else None
+        )
+        self.stats = EmbeddingCacheStats()
+        if persist_path:
+            logger.debug("Embedding cache persisted at {}", persist_path)
+
+    @property
+    def underlying(self) -> Embeddings:
+        return self._underlying
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def _memory_lookup(
+        self, texts: list[str]
+    ) -> tuple[list[str], dict[str, list[float]], list[str]]:
+        keys = [cache_key(self._model, text) for text in texts]
+        found: dict[str, list[float]] = {}
+        pending: list[str] = []
+        for key in keys:
+            if key in found:
+                continue
+            vector = self._memory.get(key)
+            if vector is not None:
+                self.stats.memory_hits += 1
+                found[key] = vector
+            else:
+                pending.append(key)
+        return keys, found, pending
+
+    def _disk_lookup(self, pending: list[str], found: dict[str, list[float]]) -> None:
+        from_disk = self._disk.get_many(list(dict.fromkeys(pending)))
+        for key, vector in from_disk.items():
+            self._memory.put(key, vector)
+            found[key] = vector
+        self.stats.disk_hits += sum(1 for key in pending if key in from_disk)
+
+    def _lookup(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]]]:
+        keys, found, pending = self._memory_lookup(texts)
+        if pending and self._disk is not None:
+            self._disk_lookup(pending, found)
+        return keys, found
+
+    async def _alookup(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]]]:
+        keys, found, pending = self._memory_lookup(texts)
+        if pending and self._disk is not None:
+            await asyncio.to_thread(self._disk_lookup, pending, found)
+        return keys, found
+
+    def _missing(
+        self, texts: list[str], keys: list[str], found: dict[str, list[float]]
+    ) -> dict[str, str]:
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        self.stats.misses += len(missing)
+        return missing
+
+    def _remember(
+        self,
+        missing_keys: list[str],
+        vectors: list[list[float]],
+        found: dict[str, list[float]],
+    ) -> dict[str, list[float]]:
+        computed = dict(zip(missing_keys, vectors))
+        for key, vector in computed.items():
+            self._memory.put(key, vector)
+            found[key] = vector
+        return computed
+
+    def _store(
+        self,
+        missing_keys: list[str],
+        vectors: list[list[float]],
+        found: dict[str, list[float]],
+    ) -> None:
+        computed = self._remember(missing_keys, vectors, found)
+        if self._disk is not None:
+            self._disk.put_many(self._model, computed)
+
+    async def _astore(
+        self,
+        missing_keys: list[str],
+        vectors: list[list[float]],
+        found: dict[str, list[float]],
+    ) -> None:
+        computed = self._remember(missing_keys, vectors, found)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put_many, self._model, computed)
+
+    def cached(self, texts: list[str]) -> list[list[float] | None]:
+        """Vectors in the memory tier (``None`` for the rest).
+
+        Never calls the provider or touches the disk tier, so it is safe to
+        call on the event loop.
+        """
+        keys, found, _ = self._memory_lookup(texts)
+        return [found.get(key) for key in keys]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, found = self._lookup(texts)
+        missing = self._missing(texts, keys, found)
+        if missing:
+            vectors = self._underlying.embed_documents(list(missing.values()))
+            self._store(list(missing), vectors, found)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        keys, found = self._lookup([text])
+        if not found:
+            self._missing([text], keys, found)
+            self._store(keys, [self._underlying.embed_query(text)], found)
+        return found[keys[0]]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, found = await self._alookup(texts)
+        missing = self._missing(texts, keys, found)
+        if missing:
+            vectors = await self._underlying.aembed_documents(list(missing.values()))
+            await self._astore(list(missing), vectors, found)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        keys, found = await self._alookup([text])
+        if not found:
+            self._missing([text], keys, found)
+            await self._astore(keys, [await self._underlying.aembed_query(text)], found)
+        return found[keys[0]]
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
@@ -0,0 +1,206 @@
+"""Embedding backends selectable through ``Settings.embedding_backend``."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import sqlite3
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any
+
+import httpx
+import numpy as np
+import openai
+from langchain_core.embeddings import Embeddings
+
+if TYPE_CHECKING:
+    from app.config.settings import Settings
+
+HASHING_MODEL = "hashing-ngram-v1"
+# What an embedding call can raise: provider failures and the on-disk cache tier.
+EMBEDDING_ERRORS = (openai.OpenAIError, httpx.HTTPError, sqlite3.Error, OSError)
+# Embedding a query inline is cheaper than a thread hop below this many characters.
+_INLINE_QUERY_CHARS = 2048
+# Above this many projected values a dense matrix product is cheaper than a gather.
+_SPARSE_PROJECTION_LIMIT = 1 << 18
+
+_WORD = re.compile(r"\w+")
+
+
+class EmbeddingConfigMismatch(RuntimeError):
+    """The persisted index was built with a different embedding configuration."""
+
+
+class HashingEmbeddings(Embeddings):
+    """CPU-only embeddings from signed feature hashing of word and character n-grams.
+
+    Each text contributes its words, adjacent word pairs and character
+    trigrams of every word (with boundary markers) to ``features`` hash
+    buckets; the sign bit of the hash spreads collisions out. With
+    ``dimensions`` set, the sparse counts are reduced by a fixed Gaussian
+    random projection (seeded, so every process builds the same matrix).
+    Batches are assembled into one count matrix and projected with a single
+    matrix product; small batches such as a query only gather the projection
+    rows of the buckets they hit. No weights are downloaded and no network
+    is involved.
+    """
+
+    def __init__(
+        self, *, features: int = 4096, dimensions: int | None = None, seed: int = 0
+    ) -> None:
+        self.features = features
+        self.dimensions = dimensions if dimensions and dimensions < features else None
+        self.seed = seed
+        self._projection: np.ndarray | None = None
+        if self.dimensions:
+            rng = np.random.default_rng(seed)
+            self._projection = (
+                rng.standard_normal((features, self.dimensions)) / np.sqrt(self.dimensions)
+            ).astype(np.float32)
+
+    @property
+    def size(self) -> int:
+        return self.dimensions or self.features
+
+    @staticmethod
+    def ngrams(text: str) -> list[str]:
+        words = _WORD.findall(text.lower())
+        grams = list(words)
+        grams.extend(f"{a} {b}" for a, b in pairwise(words))
+        for word in words:
+            marked = f"<{word}>"
+            grams.extend(f"#{marked[i : i + 3]}" for i in range(len(marked) - 2))
+        return grams
+
+    def embed_matrix(self, texts: list[str]) -> np.ndarray:
+        """Unit-normalized ``(len(texts), size)`` float32 matrix."""
+        rows: list[int] = []
+        hashes: list[int] = []
+        for row, text in enumerate(texts):
+            grams = self.ngrams(text)
+            rows.extend([row] * len(grams))
+            hashes.extend(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+        digests = np.asarray(hashes, dtype=np.uint32)
+        signs = np.where(digests >> 31, 1.0, -1.0)
+        flat = np.asarray(rows, dtype=np.int64) * self.features + digests % self.features
+        keys, inverse = np.unique(flat, return_inverse=True)
+        weights = np.bincount(inverse, weights=signs, minlength=len(keys)).astype(np.float32)
+        if self._projection is not None and len(keys) * self.size <= _SPARSE_PROJECTION_LIMIT:
+            # Few distinct n-grams (e.g. a query): project only the buckets that occur.
+            contributions = weights[:, None] * self._projection[keys % self.features]
+            present, starts = np.unique(keys // self.features, return_index=True)
+            matrix = np.zeros((len(texts), self.size), dtype=np.float32)
+            if len(keys):
+                matrix[present] = np.add.reduceat(contributions, starts, axis=0)
+        else:
+            matrix = np.zeros(len(texts) * self.features, dtype=np.float32)
+            matrix[keys] = weights
+            matrix = matrix.reshape(len(texts), self.features)
+            if self._projection is not None:
+                matrix = matrix @ self._projection
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_matrix(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_matrix([text])[0].tolist()
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        if len(text) <= _INLINE_QUERY_CHARS:
+            return self.embed_query(text)
+        return await asyncio.to_thread(self.embed_query, text)
+
+
+@dataclass(frozen=True)
+class EmbeddingBackend:
+    """How to build one embeddings implementation and describe its output space.
+
+    ``remote`` backends are wrapped in ``CachedEmbeddings``; ``describe``
+    returns the settings that determine the vectors, which are recorded next
+    to the index so a mismatched configuration is caught before searching.
+    """
+
+    factory: Callable[[Settings], Embeddings]
+    describe: Callable[[Settings], dict[str, Any]]
+    remote: bool = False
+
+
+EMBEDDING_BACKENDS: dict[str, EmbeddingBackend] = {}
+
+
+def register_embedding_backend(name: str, backend: EmbeddingBackend) -> None:
+    EMBEDDING_BACKENDS[name.lower()] = backend
+
+
+def get_embedding_backend(settings: Settings) -> EmbeddingBackend:
+    backend = EMBEDDING_BACKENDS.get(settings.embedding_backend.lower())
+    if backend is None:
+        raise ValueError(
+            f"Unknown embedding backend: {settings.embedding_backend} "
+            f"(available: {', '.join(sorted(EMBEDDING_BACKENDS))})"
+        )
+    return backend
+
+
+def embedding_config(settings: Settings) -> dict[str, Any]:
+    """The configuration that determines the vectors produced for ``settings``."""
+    return {
+        "backend": settings.embedding_backend.lower(),
+        **get_embedding_backend(settings).describe(settings),
+    }
+
+
+def _openai_embeddings(settings: Settings) -> Embeddings:
+    if not settings.openai_api_key:
+        raise RuntimeError("OpenAI API key must be configured for embeddings.")
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        api_key=settings.openai_api_key.get_secret_value(),
+        model=settings.embedding_model,
+        dimensions=settings.embedding_dimensions,
+    )
+
+
+def _hashing_embeddings(settings: Settings) -> Embeddings:
+    return HashingEmbeddings(
+        features=settings.embedding_hash_features, dimensions=settings.embedding_dimensions
+    )
+
+
+def _hashing_dimensions(settings: Settings) -> int:
+    dimensions = settings.embedding_dimensions
+    features = settings.embedding_hash_features
+    return dimensions if dimensions and dimensions < features else features
+
+
+register_embedding_backend(
+    "openai",
+    EmbeddingBackend(
+        factory=_openai_embeddings,
+        describe=lambda settings: {
+            "model": settings.embedding_model,
+            "dimensions": settings.embedding_dimensions,
+        },
+        remote=True,
+    ),
+)
+register_embedding_backend(
+    "hashing",
+    EmbeddingBackend(
+        factory=_hashing_embeddings,
+        describe=lambda settings: {
+            "model": HASHING_MODEL,
+            "features": settings.embedding_hash_features,
+            "dimensions": _hashing_dimensions(settings),
+        },
+    ),
+)
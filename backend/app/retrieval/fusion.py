@@ -0,0 +1,36 @@
+"""Combining ranked result lists from different retrievers."""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+
+from langchain_core.documents import Document
+
+
+def document_key(doc: Document) -> str:
+    """Identity used to match the same chunk across retrievers."""
+    metadata = doc.metadata or {}
+    if metadata.get("chunk_id"):
+        return str(metadata["chunk_id"])
+    digest = hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+    return f"{metadata.get('source', '')}\x00{digest}"
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Document]], *, k: int = 60, top_k: int | None = None
+) -> list[Document]:
+    """Merge rankings by summing ``1 / (k + rank)`` for each document.
+
+    Only ranks are used, so BM25 and cosine scores never need to be put on a
+    common scale. Ties keep the order in which documents were first seen.
+    """
+    scores: dict[str, float] = {}
+    documents: dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = document_key(doc)
+            documents.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    ordered = sorted(scores, key=scores.__getitem__, reverse=True)
+    return [documents[key] for key in ordered[:top_k]]
@@ -0,0 +1,254 @@
+"""Incremental, content-addressed ingestion of the knowledge base.
+
+Run ``python -m app.retrieval.ingestion [DATA_DIR]`` to sync the vector store
+with the files under ``DATA_DIR``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from langchain_core.documents import Document
+from loguru import logger
+
+from app.config.settings import get_settings
+from app.retrieval.document_loader import iter_loaded_files, iter_source_files
+from app.retrieval.vector_store import VectorStoreProvider
+
+MANIFEST_FILENAME = "ingest_manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_DATA_DIR = Path("data/source_docs")
+
+
+def content_hash(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_ids(relative_path: str, documents: list[Document]) -> list[str]:
+    """Stable IDs derived from the file path and each chunk's content.
+
+    Identical chunks within one file are disambiguated by occurrence, so an
+    unchanged chunk keeps its ID (and its vector) across edits elsewhere.
+    """
+    seen: dict[str, int] = {}
+    ids = []
+    for doc in documents:
+        digest = content_hash(doc.page_content)
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(content_hash(f"{relative_path}\x00{digest}\x00{occurrence}"))
+    return ids
+
+
+@dataclass
+class FileRecord:
+    mtime_ns: int
+    size: int
+    sha256: str
+    chunk_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class IngestionReport:
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    skipped: int = 0
+    chunks_embedded: int = 0
+    chunks_deleted: int = 0
+    failed: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class IngestionManifest:
+    """JSON manifest of ingested files keyed by path relative to the data directory."""
+
+    def __init__(self, path: Path | None) -> None:
+        self._path = path
+        self.files: dict[str, FileRecord] = {}
+        if path and path.exists():
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            if raw.get("version") == MANIFEST_VERSION:
+                self.files = {
+                    name: FileRecord(**record) for name, record in raw.get("files", {}).items()
+                }
+            else:
+                logger.warning("Ignoring manifest with unknown version at {}", path)
+
+    def save(self) -> None:
+        if not self._path:
+            return
+        payload = {
+            "version": MANIFEST_VERSION,
+            "files": {name: asdict(record) for name, record in sorted(self.files.items())},
+        }
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._path)
+
+
+class IncrementalIngestor:
+    """Sync the vector store with a directory, embedding only new or changed chunks."""
+
+    def __init__(
+        self,
+        provider: VectorStoreProvider | None = None,
+        *,
+        manifest_path: Path | None = None,
+        max_workers: int | None = None,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self._provider = provider or VectorStoreProvider()
+        if manifest_path is None and self._provider.persist_directory:
+            manifest_path = self._provider.persist_directory / MANIFEST_FILENAME
+        self._manifest = IngestionManifest(manifest_path)
+        self._max_workers = max_workers
+        self._batch_size = batch_size or settings.ingest_batch_size
+        self._concurrency = concurrency or settings.ingest_concurrency
+
+    async def run(
+        self, data_dir: Path, *, full: bool = False, dry_run: bool = False
+    ) -> IngestionReport:
+        report = IngestionReport()
+        previous = dict(self._manifest.files)
+        if previous and not full and not dry_run and not len(self._provider.lexical_index()):
+            # Collections ingested before the lexical index existed.
+            self._provider.rebuild_lexical_index()
+        current: dict[str, FileRecord] = {}
+        pending: list[tuple[str, Document]] = []
+        stale_ids: list[str] = []
+
+        to_load: dict[Path, tuple[str, FileRecord | None, str, os.stat_result]] = {}
+        failed: list[str] = []
+
+        for path in iter_source_files(data_dir):
+            relative = path.relative_to(data_dir).as_posix()
+            stat = path.stat()
+            record = previous.get(relative)
+            if (
+                not full
+                and record
+                and record.mtime_ns == stat.st_mtime_ns
+                and record.size == stat.st_size
+            ):
+                current[relative] = record
+                report.skipped += 1
+                continue
+
+            digest = content_hash(path.read_bytes())
+            if not full and record and record.sha256 == digest:
+                current[relative] = FileRecord(
+                    stat.st_mtime_ns, stat.st_size, digest, record.chunk_ids
+                )
+                report.skipped += 1
+                continue
+            to_load[path] = (relative, record, digest, stat)
+
+        for path, documents in iter_loaded_files(to_load, max_workers=self._max_workers):
+            relative, record, digest, stat = to_load[path]
+            if documents is None:
+                # Keep the previous entry and its vectors; the file is retried next run.
+                failed.append(relative)
+                if record:
+                    current[relative] = record
+                continue
+            ids = chunk_ids(relative, documents)
+            known = set() if full or not record else set(record.chunk_ids)
+            for chunk_id, doc in zip(ids, documents):
+                if chunk_id not in known:
+                    doc.metadata = {**(doc.metadata or {}), "chunk_id": chunk_id}
+                    pending.append((chunk_id, doc))
+            if record:
+                stale_ids.extend(set(record.chunk_ids) - set(ids))
+                report.updated += 1
+            else:
+                report.added += 1
+            current[relative] = FileRecord(stat.st_mtime_ns, stat.st_size, digest, ids)
+
+            if len(pending) >= self._batch_size * self._concurrency:
+                report.chunks_embedded += await self._flush(pending, dry_run=dry_run)
+                pending = []
+
+        report.chunks_embedded += await self._flush(pending, dry_run=dry_run)
+        for relative in previous.keys() - current.keys():
+            stale_ids.extend(previous[relative].chunk_ids)
+            report.deleted += 1
+        report.chunks_deleted = len(stale_ids)
+        report.failed = len(failed)
+        if failed:
+            logger.warning(
+                "Failed to parse {} file(s), kept their previous index entries: {}",
+                len(failed),
+                ", ".join(failed),
+            )
+
+        if dry_run:
+            return report
+        self._provider.delete_ids(stale_ids)
+        self._manifest.files = current
+        self._manifest.save()
+        if report.changed:
+            self._provider.mark_ingested()
+        logger.info("Ingestion finished: {}", report.as_dict())
+        return report
+
+    async def _flush(self, pending: list[tuple[str, Document]], *, dry_run: bool) -> int:
+        if not pending or dry_run:
+            return len(pending)
+        embeddings = self._provider.embeddings()
+        semaphore = asyncio.Semaphore(self._concurrency)
+        batches = [
+            pending[start : start + self._batch_size]
+            for start in range(0, len(pending), self._batch_size)
+        ]
+
+        async def embed_batch(batch: list[tuple[str, Document]]) -> None:
+            async with semaphore:
+                vectors = await embeddings.aembed_documents([doc.page_content for _, doc in batch])
+            await asyncio.to_thread(
+                self._provider.upsert_embedded,
+                [chunk_id for chunk_id, _ in batch],
+                [doc for _, doc in batch],
+                vectors,
+            )
+
+        await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return len(pending)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Incrementally ingest knowledge base documents.")
+    parser.add_argument("data_dir", nargs="?", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--full", action="store_true", help="Re-embed every file.")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report changes without writing anything."
+    )
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    ingestor = IncrementalIngestor()
+    report = asyncio.run(ingestor.run(args.data_dir, full=args.full, dry_run=args.dry_run))
+    print(json.dumps(report.as_dict()))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
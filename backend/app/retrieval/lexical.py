@@ -0,0 +1,237 @@
+"""Compact BM25 inverted index kept in sync with the vector store."""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+
+INDEX_FORMAT_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    [
+        "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "could", "do", "does", "for",
+        "from", "how", "i", "if", "in", "is", "it", "its", "me", "my", "of", "on", "or", "our",
+        "so", "that", "the", "their", "them", "there", "these", "they", "this", "to", "us", "was",
+        "we", "what", "when", "where", "which", "who", "why", "will", "with", "would", "you",
+        "your",
+    ]
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric terms; SKUs like ``AB-120`` become ``ab`` + ``120``."""
+    return [term for term in _TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class _Frozen:
+    """Immutable CSR snapshot of the index; arrays may be memory-mapped."""
+
+    ids: list[str]
+    metadata: list[dict[str, Any]]
+    text_offsets: np.ndarray
+    texts: np.ndarray
+    doc_len: np.ndarray
+    terms: dict[str, int]
+    term_offsets: np.ndarray
+    post_docs: np.ndarray
+    post_tf: np.ndarray
+
+    def text(self, index: int) -> str:
+        start, end = int(self.text_offsets[index]), int(self.text_offsets[index + 1])
+        return bytes(self.texts[start:end]).decode("utf-8")
+
+
+_ARRAYS = ("text_offsets", "texts", "doc_len", "term_offsets", "post_docs", "post_tf")
+
+
+class BM25Index:
+    """Okapi BM25 over chunk IDs.
+
+    Searches run against a compressed-sparse-row snapshot (one postings
+    slice per term) that can be saved as ``.npy`` files and loaded with
+    ``mmap_mode="r"``, so serving processes share the pages via the OS
+    cache. Updates go to a mutable per-document form that is re-frozen on
+    the next search or save; they only happen at ingest time.
+    """
+
+    def __init__(self, *, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs: dict[str, tuple[str, dict[str, Any], Counter]] | None = {}
+        self._frozen: _Frozen | None = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._docs is not None:
+                return len(self._docs)
+            return len(self._frozen.ids) if self._frozen else 0
+
+    def upsert(self, ids: Iterable[str], documents: Iterable[Document]) -> None:
+        with self._lock:
+            docs = self._thaw()
+            for chunk_id, doc in zip(ids, documents):
+                docs[chunk_id] = (
+                    doc.page_content,
+                    dict(doc.metadata or {}),
+                    Counter(tokenize(doc.page_content)),
+                )
+            self._frozen = None
+
+    def delete(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            docs = self._thaw()
+            for chunk_id in ids:
+                docs.pop(chunk_id, None)
+            self._frozen = None
+
+    def search(self, query: str, k: int = 5) -> list[tuple[Document, float]]:
+        """Return up to ``k`` documents with their normalised BM25 score.
+
+        Scores are divided by the summed IDF of the query terms, so a chunk
+        of average length containing every query term once scores about 1.0
+        regardless of query length; terms missing from the corpus lower it.
+        """
+        frozen = self._snapshot()
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        n_docs = len(frozen.ids)
+        if not n_docs or not query_terms:
+            return []
+
+        avg_len = float(frozen.doc_len.mean()) or 1.0
+        norm = self.k1 * (1.0 - self.b + self.b * frozen.doc_len / avg_len)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        idf_total = 0.0
+        for term in query_terms:
+            index = frozen.terms.get(term)
+            start = end = 0
+            if index is not None:
+                start, end = int(frozen.term_offsets[index]), int(frozen.term_offsets[index + 1])
+            df = end - start
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            idf_total += idf
+            if not df:
+                continue
+            docs = frozen.post_docs[start:end]
+            tf = frozen.post_tf[start:end].astype(np.float32)
+            scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm[docs])
+
+        matched = np.flatnonzero(scores)
+        if not matched.size:
+            return []
+        if matched.size > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        return [
+            (
+                Document(page_content=frozen.text(int(i)), metadata=dict(frozen.metadata[i])),
+                float(scores[i]) / idf_total,
+            )
+            for i in ranked
+        ]
+
+    def save(self, directory: Path) -> None:
+        """Write the index atomically (build in a sibling directory, then swap)."""
+        frozen = self._snapshot()
+        directory = Path(directory)
+        staging = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for name in _ARRAYS:
+            np.save(staging / f"{name}.npy", np.asarray(getattr(frozen, name)))
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "ids": frozen.ids,
+            "metadata": frozen.metadata,
+            "terms": sorted(frozen.terms, key=frozen.terms.__getitem__),
+        }
+        (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        previous = directory.with_name(directory.name + ".old")
+        shutil.rmtree(previous, ignore_errors=True)
+        if directory.exists():
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+        shutil.rmtree(previous, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path) -> BM25Index:
+        """Load a saved index with its arrays memory-mapped read-only."""
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported lexical index version at {directory}")
+        index = cls(k1=meta["k1"], b=meta["b"])
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+        index._docs = None
+        index._frozen = _Frozen(
+            ids=meta["ids"],
+            metadata=meta["metadata"],
+            terms={term: i for i, term in enumerate(meta["terms"])},
+            **arrays,
+        )
+        return index
+
+    def _snapshot(self) -> _Frozen:
+        with self._lock:
+            if self._frozen is None:
+                self._frozen = self._freeze(self._docs or {})
+            return self._frozen
+
+    def _thaw(self) -> dict[str, tuple[str, dict[str, Any], Counter]]:
+        if self._docs is None:
+            frozen = self._frozen
+            self._docs = {}
+            if frozen is not None:
+                for i, chunk_id in enumerate(frozen.ids):
+                    text = frozen.text(i)
+                    self._docs[chunk_id] = (text, frozen.metadata[i], Counter(tokenize(text)))
+        return self._docs
+
+    @staticmethod
+    def _freeze(docs: dict[str, tuple[str, dict[str, Any], Counter]]) -> _Frozen:
+        terms: dict[str, int] = {}
+        term_idx: list[int] = []
+        doc_idx: list[int] = []
+        tfs: list[int] = []
+        doc_len = np.zeros(len(docs), dtype=np.float32)
+        encoded: list[bytes] = []
+        for i, (text, _, counts) in enumerate(docs.values()):
+            encoded.append(text.encode("utf-8"))
+            doc_len[i] = sum(counts.values())
+            for term, tf in counts.items():
+                term_idx.append(terms.setdefault(term, len(terms)))
+                doc_idx.append(i)
+                tfs.append(tf)
+
+        order = np.argsort(np.asarray(term_idx, dtype=np.int64), kind="stable")
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum(np.bincount(term_idx, minlength=len(terms)))
+        text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum([len(chunk) for chunk in encoded])
+        return _Frozen(
+            ids=list(docs),
+            metadata=[metadata for _, metadata, _ in docs.values()],
+            text_offsets=text_offsets,
+            texts=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            doc_len=doc_len,
+            terms=terms,
+            term_offsets=term_offsets,
+            post_docs=np.asarray(doc_idx, dtype=np.int32)[order],
+            post_tf=np.minimum(np.asarray(tfs, dtype=np.int64), 65535).astype(np.uint16)[order],
+        )
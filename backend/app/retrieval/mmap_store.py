@@ -0,0 +1,331 @@
+"""Brute-force vector store over a memory-mapped, quantized embedding matrix."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+INDEX_FORMAT_VERSION = 1
+QUANTIZATIONS = ("int8", "float16", "none")
+
+# Rows dequantized per block while scanning, bounding the float32 scratch memory.
+_BLOCK_ROWS = 8192
+_ARRAYS = ("vectors", "codes", "scales", "text_offsets", "texts")
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def quantize(vectors: np.ndarray, quantization: str) -> tuple[np.ndarray, np.ndarray]:
+    """Encode unit vectors as ``(codes, scales)``; ``codes * scales`` approximates them.
+
+    ``int8`` uses a symmetric per-row scale (max magnitude / 127), ``float16``
+    a plain cast with unit scales, and ``none`` keeps float32.
+    """
+    scales = np.ones(len(vectors), dtype=np.float32)
+    if quantization == "int8":
+        peak = np.abs(vectors).max(axis=1) if len(vectors) else scales
+        scales = np.where(peak == 0, 1.0, peak / 127.0).astype(np.float32)
+        codes = np.rint(vectors / scales[:, None]).clip(-127, 127).astype(np.int8)
+    elif quantization == "float16":
+        codes = vectors.astype(np.float16)
+    elif quantization == "none":
+        codes = vectors.astype(np.float32)
+    else:
+        raise ValueError(f"Unknown quantization {quantization!r}; use one of {QUANTIZATIONS}")
+    return codes, scales
+
+
+@dataclass(frozen=True)
+class _Frozen:
+    """Immutable snapshot of the store; arrays may be memory-mapped."""
+
+    ids: list[str]
+    metadata: list[dict[str, Any]]
+    vectors: np.ndarray
+    codes: np.ndarray
+    scales: np.ndarray
+    text_offsets: np.ndarray
+    texts: np.ndarray
+
+    def document(self, index: int) -> Document:
+        start, end = int(self.text_offsets[index]), int(self.text_offsets[index + 1])
+        return Document(
+            id=self.ids[index],
+            page_content=bytes(self.texts[start:end]).decode("utf-8"),
+            metadata=dict(self.metadata[index]),
+        )
+
+
+class MmapVectorStore(VectorStore):
+    """Cosine-similarity store scanned with numpy instead of an ANN index.
+
+    Unit-normalized embeddings are kept twice: as full float32 rows and as
+    quantized codes (``int8`` by default, or ``float16``). A query scans the
+    codes in blocks, takes the ``rescore_factor * k`` best approximate
+    matches and re-scores only those against the float32 rows, so results
+    match an exact search unless quantization error reorders the tail of the
+    candidate list. Saved indexes are loaded with ``mmap_mode="r"``, so every
+    worker shares one copy of the matrices through the OS page cache, and
+    the float32 pages are touched only for candidates.
+
+    Like ``BM25Index``, writes go to a mutable per-document form that is
+    re-frozen on the next search or save; they only happen at ingest time.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        *,
+        quantization: str = "int8",
+        rescore_factor: int = 4,
+    ) -> None:
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization!r}; use one of {QUANTIZATIONS}")
+        self._embedding = embedding
+        self.quantization = quantization
+        self.rescore_factor = max(rescore_factor, 1)
+        self._lock = threading.RLock()
+        self._docs: dict[str, tuple[str, dict[str, Any], np.ndarray]] | None = {}
+        self._frozen: _Frozen | None = None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._docs is not None:
+                return len(self._docs)
+            return len(self._frozen.ids) if self._frozen else 0
+
+    def add_vectors(
+        self, ids: Sequence[str], documents: Sequence[Document], vectors: Sequence[Sequence[float]]
+    ) -> list[str]:
+        """Insert or replace documents whose embeddings are already known."""
+        if not ids:
+            return []
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+        with self._lock:
+            docs = self._thaw()
+            dimension = self._dimension(docs)
+            if dimension is not None and matrix.shape[1] != dimension:
+                raise ValueError(
+                    f"Embedding dimension {matrix.shape[1]} does not match index ({dimension})"
+                )
+            for chunk_id, doc, row in zip(ids, documents, matrix):
+                docs[chunk_id] = (doc.page_content, dict(doc.metadata or {}), row)
+            self._frozen = None
+        return list(ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        documents = [
+            Document(page_content=text, metadata=meta) for text, meta in zip(texts, metadatas)
+        ]
+        return self.add_vectors(ids, documents, self._embedding.embed_documents(texts))
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        with self._lock:
+            docs = self._thaw()
+            for chunk_id in ids or []:
+                docs.pop(chunk_id, None)
+            self._frozen = None
+        return True
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> MmapVectorStore:
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    def search_by_vectors(
+        self, queries: Sequence[Sequence[float]], k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        """Top ``k`` documents with cosine similarity for each query vector.
+
+        The whole batch shares one pass over the quantized matrix.
+        """
+        frozen, hits = self._search(queries, k)
+        return [
+            [(frozen.document(int(row)), float(score)) for row, score in zip(rows, scores)]
+            for rows, scores in hits
+        ]
+
+    def search_with_vectors(
+        self, embedding: Sequence[float], k: int = 4
+    ) -> tuple[list[Document], np.ndarray]:
+        """Top ``k`` documents for one query with their unit-normalized float32 vectors."""
+        frozen, hits = self._search([embedding], k)
+        rows = hits[0][0] if hits else np.empty(0, dtype=np.int64)
+        if not len(rows):
+            return [], np.empty((0, len(embedding)), dtype=np.float32)
+        vectors = np.asarray(frozen.vectors[rows], dtype=np.float32)
+        return [frozen.document(int(row)) for row in rows], vectors
+
+    def _search(
+        self, queries: Sequence[Sequence[float]], k: int
+    ) -> tuple[_Frozen, list[tuple[np.ndarray, np.ndarray]]]:
+        frozen = self._snapshot()
+        n_docs = len(frozen.ids)
+        if not n_docs or not len(queries) or k <= 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return frozen, [empty for _ in range(len(queries))]
+        matrix = _normalize(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+        dimension = frozen.vectors.shape[1]
+        if matrix.shape[1] != dimension:
+            raise ValueError(
+                f"Query dimension {matrix.shape[1]} does not match index ({dimension})"
+            )
+
+        approximate = np.empty((len(matrix), n_docs), dtype=np.float32)
+        for start in range(0, n_docs, _BLOCK_ROWS):
+            block = np.asarray(frozen.codes[start : start + _BLOCK_ROWS], dtype=np.float32)
+            scores = block @ matrix.T
+            scores *= np.asarray(frozen.scales[start : start + _BLOCK_ROWS])[:, None]
+            approximate[:, start : start + len(block)] = scores.T
+
+        n_candidates = min(n_docs, k * self.rescore_factor if self.quantization != "none" else k)
+        hits = []
+        for query, row in zip(matrix, approximate):
+            candidates = np.argpartition(-row, n_candidates - 1)[:n_candidates]
+            candidates.sort()  # ascending row order keeps the mmap reads sequential
+            exact = np.asarray(frozen.vectors[candidates]) @ query
+            best = np.argsort(-exact, kind="stable")[:k]
+            hits.append((candidates[best], exact[best]))
+        return frozen, hits
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return [doc for doc, _ in self.search_by_vectors([embedding], k=k)[0]]
+
+    def similarity_search_by_vectors(
+        self, embeddings: Sequence[Sequence[float]], k: int = 4
+    ) -> list[list[Document]]:
+        return [[doc for doc, _ in hits] for hits in self.search_by_vectors(embeddings, k=k)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self.search_by_vectors([self._embedding.embed_query(query)], k=k)[0]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return lambda score: (score + 1.0) / 2.0
+
+    def save(self, directory: Path) -> None:
+        """Write the index atomically (build in a sibling directory, then swap)."""
+        frozen = self._snapshot()
+        directory = Path(directory)
+        staging = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for name in _ARRAYS:
+            np.save(staging / f"{name}.npy", np.asarray(getattr(frozen, name)))
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "quantization": self.quantization,
+            "ids": frozen.ids,
+            "metadata": frozen.metadata,
+        }
+        (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        previous = directory.with_name(directory.name + ".old")
+        shutil.rmtree(previous, ignore_errors=True)
+        if directory.exists():
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+        shutil.rmtree(previous, ignore_errors=True)
+
+    @classmethod
+    def load(
+        cls, directory: Path, embedding: Embeddings, *, rescore_factor: int = 4
+    ) -> MmapVectorStore:
+        """Load a saved index with its arrays memory-mapped read-only."""
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector index version at {directory}")
+        store = cls(embedding, quantization=meta["quantization"], rescore_factor=rescore_factor)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+        store._docs = None
+        store._frozen = _Frozen(ids=meta["ids"], metadata=meta["metadata"], **arrays)
+        return store
+
+    def _snapshot(self) -> _Frozen:
+        with self._lock:
+            if self._frozen is None:
+                self._frozen = self._freeze(self._docs or {})
+            return self._frozen
+
+    def _thaw(self) -> dict[str, tuple[str, dict[str, Any], np.ndarray]]:
+        if self._docs is None:
+            frozen = self._frozen
+            self._docs = {}
+            if frozen is not None:
+                for i, chunk_id in enumerate(frozen.ids):
+                    doc = frozen.document(i)
+                    self._docs[chunk_id] = (
+                        doc.page_content,
+                        doc.metadata,
+                        np.array(frozen.vectors[i], dtype=np.float32),
+                    )
+        return self._docs
+
+    def _dimension(self, docs: dict[str, tuple[str, dict[str, Any], np.ndarray]]) -> int | None:
+        for _, _, row in docs.values():
+            return len(row)
+        return None
+
+    def _freeze(self, docs: dict[str, tuple[str, dict[str, Any], np.ndarray]]) -> _Frozen:
+        dimension = self._dimension(docs) or 0
+        vectors = np.zeros((len(docs), dimension), dtype=np.float32)
+        encoded: list[bytes] = []
+        for i, (text, _, row) in enumerate(docs.values()):
+            vectors[i] = row
+            encoded.append(text.encode("utf-8"))
+        codes, scales = quantize(vectors, self.quantization)
+        text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum([len(chunk) for chunk in encoded])
+        return _Frozen(
+            ids=list(docs),
+            metadata=[metadata for _, metadata, _ in docs.values()],
+            vectors=vectors,
+            codes=codes,
+            scales=scales,
+            text_offsets=text_offsets,
+            texts=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        )
@@ -0,0 +1,147 @@
+"""Fitting retrieved documents into a prompt token budget."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.retrieval.chunking import count_tokens
+from app.retrieval.lexical import tokenize
+
+# Weight of query-sentence cosine similarity next to the lexical overlap (0..1).
+_EMBEDDING_WEIGHT = 0.5
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n\s*")
+
+VectorLookup = Callable[[list[str]], Sequence[Sequence[float] | None]]
+
+
+@dataclass(frozen=True)
+class PackedContext:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    sentences: int = 0
+    kept: int = 0
+
+    @property
+    def compressed(self) -> bool:
+        return self.tokens_after < self.tokens_before
+
+
+def split_sentences(text: str) -> list[str]:
+    return [part.strip() for part in _SENTENCE_BREAK.split(text) if part and part.strip()]
+
+
+def _source(doc: Document) -> str:
+    return (doc.metadata or {}).get("source", "unknown")
+
+
+def format_documents(documents: Iterable[Document]) -> str:
+    return "\n\n".join(f"[{_source(doc)}] {doc.page_content.strip()}" for doc in documents)
+
+
+def _similarities(
+    query: str,
+    sentences: list[tuple[int, str]],
+    documents: list[Document],
+    lookup: VectorLookup,
+) -> np.ndarray | None:
+    """Cosine similarity of each sentence (or, failing that, its document) to the query."""
+    texts = [query, *(text for _, text in sentences), *(doc.page_content for doc in documents)]
+    vectors = list(lookup(texts))
+    if vectors[0] is None:
+        return None
+    query_vector = np.asarray(vectors[0], dtype=np.float32)
+    doc_vectors = vectors[1 + len(sentences) :]
+    rows = []
+    for (doc_index, _), vector in zip(sentences, vectors[1 : 1 + len(sentences)]):
+        vector = vector if vector is not None else doc_vectors[doc_index]
+        rows.append(
+            np.zeros_like(query_vector) if vector is None else np.asarray(vector, np.float32)
+        )
+    matrix = np.stack(rows)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+    return (matrix @ query_vector) / np.where(norms == 0, 1.0, norms)
+
+
+def pack_context(
+    documents: Iterable[Document],
+    query: str,
+    *,
+    token_budget: int,
+    lookup: VectorLookup | None = None,
+    count: Callable[[str], int] = count_tokens,
+) -> PackedContext:
+    """Keep the sentences most relevant to ``query`` within ``token_budget`` tokens.
+
+    Context that already fits is returned whole. Otherwise every document is
+    split into sentences, each scored by the share of query terms it
+    contains plus, when ``lookup`` can supply vectors without an embedding
+    call, its cosine similarity to the query (falling back to the vector of
+    its document). The best sentences are taken greedily while they fit and
+    printed in their original order, grouped under their ``[source]``.
+    """
+    documents = list(documents)
+    full = format_documents(documents)
+    before = count(full)
+    if token_budget <= 0 or before <= token_budget:
+        return PackedContext(full, before, before)
+
+    sentences = [
+        (doc_index, sentence)
+        for doc_index, doc in enumerate(documents)
+        for sentence in split_sentences(doc.page_content)
+    ]
+    if not sentences:
+        return PackedContext("", before, 0)
+    terms = set(tokenize(query))
+    scores = np.array(
+        [
+            len(terms.intersection(tokenize(sentence))) / len(terms) if terms else 0.0
+            for _, sentence in sentences
+        ],
+        dtype=np.float32,
+    )
+    similarity = _similarities(query, sentences, documents, lookup) if lookup else None
+    if similarity is not None:
+        scores += _EMBEDDING_WEIGHT * np.clip(similarity, 0.0, None)
+
+    costs = [count(sentence) + 1 for _, sentence in sentences]
+    headers = [count(f"[{_source(doc)}]") + 2 for doc in documents]
+    kept: list[int] = []
+    opened: set[int] = set()
+    used = 0
+    # Highest score first; ties keep document rank and sentence order.
+    for index in np.argsort(-scores, kind="stable"):
+        doc_index = sentences[index][0]
+        cost = costs[index] + (0 if doc_index in opened else headers[doc_index])
+        if used + cost > token_budget:
+            continue
+        kept.append(int(index))
+        opened.add(doc_index)
+        used += cost
+
+    while True:
+        text = _render(documents, sentences, sorted(kept))
+        after = count(text)
+        if after <= token_budget or not kept:
+            return PackedContext(text, before, after, len(sentences), len(kept))
+        kept.pop()
+
+
+def _render(
+    documents: list[Document], sentences: list[tuple[int, str]], kept: list[int]
+) -> str:
+    grouped: dict[int, list[str]] = {}
+    for index in kept:
+        doc_index, sentence = sentences[index]
+        grouped.setdefault(doc_index, []).append(sentence)
+    return "\n\n".join(
+        f"[{_source(documents[doc_index])}] {' '.join(parts)}"
+        for doc_index, parts in grouped.items()
+    )
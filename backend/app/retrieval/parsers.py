@@ -0,0 +1,118 @@
+"""Format-specific text extraction for knowledge base files."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from html.parser import HTMLParser
+from pathlib import Path
+
+from loguru import logger
+
+_FRONT_MATTER = re.compile(r"\A---\s*\n.*?\n---\s*\n", re.DOTALL)
+_MD_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+_MD_HEADING = re.compile(r"^\s{0,3}#{1,6}\s*", re.MULTILINE)
+_MD_EMPHASIS = re.compile(r"(?<!\w)(\*\*|__|\*|_|~~|`)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+_MD_FENCE = re.compile(r"^\s*(```|~~~).*$", re.MULTILINE)
+_MD_BLOCKQUOTE = re.compile(r"^\s{0,3}>\s?", re.MULTILINE)
+_MD_HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def parse_markdown(raw: str) -> str:
+    text = _FRONT_MATTER.sub("", raw)
+    text = _MD_FENCE.sub("", text)
+    text = _MD_IMAGE.sub(r"\1", text)
+    text = _MD_LINK.sub(r"\1", text)
+    text = _MD_HEADING.sub("", text)
+    text = _MD_BLOCKQUOTE.sub("", text)
+    text = _MD_EMPHASIS.sub(r"\2", text)
+    text = _MD_HTML_TAG.sub("", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+class _HTMLTextExtractor(HTMLParser):
+    _SKIP = frozenset({"script", "style", "noscript", "template", "svg", "head"})
+    _BLOCK = frozenset({
+        "p", "div", "section", "article", "br", "li", "ul", "ol", "tr", "table",
+        "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer", "blockquote", "pre",
+    })
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag in self._BLOCK:
+            self._parts.append("\n\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self._BLOCK:
+            self._parts.append("\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._parts.append(data)
+
+    def text(self) -> str:
+        joined = "".join(self._parts)
+        lines = (" ".join(line.split()) for line in joined.splitlines())
+        return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def parse_html(raw: str) -> str:
+    extractor = _HTMLTextExtractor()
+    extractor.feed(raw)
+    extractor.close()
+    return extractor.text()
+
+
+def parse_text(raw: str) -> str:
+    # PDF-extracted text marks page breaks with form feeds.
+    return _BLANK_LINES.sub("\n\n", raw.replace("\f", "\n\n")).strip()
+
+
+def _read_pdf(path: Path) -> str | None:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        logger.warning("pypdf is not installed; skipping PDF {}", path)
+        return None
+    reader = PdfReader(str(path))
+    return "\f".join(page.extract_text() or "" for page in reader.pages)
+
+
+PARSERS: dict[str, tuple[str, Callable[[str], str]]] = {
+    ".md": ("markdown", parse_markdown),
+    ".markdown": ("markdown", parse_markdown),
+    ".mdx": ("markdown", parse_markdown),
+    ".html": ("html", parse_html),
+    ".htm": ("html", parse_html),
+    ".pdf": ("pdf", parse_text),
+}
+
+
+def extract_text(path: Path) -> tuple[str, str] | None:
+    """Return ``(format, text)`` for ``path`` or ``None`` when it cannot be read as text."""
+    suffix = path.suffix.lower()
+    file_format, parser = PARSERS.get(suffix, ("text", parse_text))
+    if suffix == ".pdf":
+        raw = _read_pdf(path)
+    else:
+        data = path.read_bytes()
+        if b"\x00" in data:
+            logger.warning("Skipping binary file {}", path)
+            return None
+        try:
+            raw = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raw = data.decode("latin-1")
+    if raw is None:
+        return None
+    return file_format, parser(raw)
@@ -0,0 +1,94 @@
+"""Diversity reranking of retrieved chunks before they reach the prompt."""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections.abc import Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3) -> frozenset[int]:
+    """Hashes of the word ``size``-grams of ``text`` (case and punctuation ignored)."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return frozenset([zlib.crc32(" ".join(words).encode("utf-8"))]) if words else frozenset()
+    return frozenset(
+        zlib.crc32(" ".join(words[i : i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    )
+
+
+def _jaccard(a: frozenset[int], b: frozenset[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_rerank(
+    documents: Sequence[Document],
+    top_k: int,
+    *,
+    query_vector: Sequence[float] | np.ndarray | None = None,
+    vectors: np.ndarray | None = None,
+    lambda_mult: float = 0.7,
+    duplicate_threshold: float = 0.95,
+    shingle_threshold: float = 0.8,
+    max_per_source: int = 0,
+) -> list[Document]:
+    """Pick ``top_k`` relevant but mutually different documents.
+
+    With vectors, selection is maximal marginal relevance: each step takes
+    the candidate maximizing ``lambda_mult * sim(query, d) - (1 - lambda_mult)
+    * max sim(d, selected)``, using one candidate-by-candidate similarity
+    matrix. Without vectors the incoming order stands in for relevance.
+    After every pick, candidates whose cosine similarity to it reaches
+    ``duplicate_threshold`` or whose word-shingle Jaccard similarity reaches
+    ``shingle_threshold`` are dropped as near-duplicates, and a source that
+    has supplied ``max_per_source`` documents (0 disables the cap) is not
+    drawn from again.
+    """
+    n = len(documents)
+    if not n or top_k <= 0:
+        return []
+    if query_vector is not None and vectors is not None and len(vectors) == n:
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(n, -1))
+        query = _normalize(np.asarray(query_vector, dtype=np.float32).ravel())
+        relevance = matrix @ query
+        similarity = matrix @ matrix.T
+    else:
+        lambda_mult = 1.0
+        relevance = np.linspace(1.0, 0.0, n, endpoint=False, dtype=np.float32)
+        similarity = None
+
+    signatures = [shingles(doc.page_content) for doc in documents]
+    sources = [(doc.metadata or {}).get("source") for doc in documents]
+    per_source: dict[object, int] = {}
+    available = np.ones(n, dtype=bool)
+    redundancy = np.zeros(n, dtype=np.float32)
+    selected: list[int] = []
+    while len(selected) < top_k and available.any():
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        pick = int(np.argmax(np.where(available, scores, -np.inf)))
+        selected.append(pick)
+        available[pick] = False
+        if similarity is not None:
+            redundancy = np.maximum(redundancy, similarity[pick])
+            available &= similarity[pick] < duplicate_threshold
+        for other in np.flatnonzero(available):
+            if _jaccard(signatures[pick], signatures[other]) >= shingle_threshold:
+                available[other] = False
+        if max_per_source and sources[pick] is not None:
+            per_source[sources[pick]] = per_source.get(sources[pick], 0) + 1
+            if per_source[sources[pick]] >= max_per_source:
+                available &= np.array([source != sources[pick] for source in sources])
+    return [documents[i] for i in selected]
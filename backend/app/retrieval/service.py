@@ -1,9 +1,37 @@
-from typing import Iterable
+import asyncio
+from collections.abc import Iterable
 
+import numpy as np
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
+from loguru import logger
 
+from app.config.settings import get_settings
+from app.retrieval.embedding_cache import CachedEmbeddings
+from app.retrieval.fusion import document_key, reciprocal_rank_fusion
+from app.retrieval.packing import format_documents, pack_context
+from app.retrieval.rerank import mmr_rerank
 from app.retrieval.vector_store import VectorStoreProvider
+from app.services import metrics
+from app.services.warmup import timed_step
+
+_LEXICAL_LATENCY = metrics.RETRIEVAL_LATENCY.labels("lexical")
+_DENSE_LATENCY = metrics.RETRIEVAL_LATENCY.labels("dense")
+_RERANK_LATENCY = metrics.RETRIEVAL_LATENCY.labels("rerank")
+
+
+def _lexical_margin(hits: list[tuple[Document, float]]) -> float:
+    """Lead of the best BM25 hit over the runner-up, as a share of the query's IDF.
+
+    A raw normalised score only says every query term appears somewhere in
+    the chunk; the margin also requires that no other chunk matches nearly
+    as well, which is when dense search is unlikely to change the answer.
+    """
+    if not hits:
+        return 0.0
+    runner_up = hits[1][1] if len(hits) > 1 else 0.0
+    return hits[0][1] - runner_up
 
 
 class RetrievalService:
@@ -11,16 +39,238 @@ class RetrievalService:
 
     def __init__(self, provider: VectorStoreProvider | None = None) -> None:
         self._provider = provider or VectorStoreProvider()
+        self._settings = get_settings()
+
+    def embeddings(self) -> Embeddings:
+        return self._provider.embeddings()
+
+    def index_version(self) -> str:
+        return self._provider.index_version()
+
+    def embedding_cache_stats(self) -> dict[str, float] | None:
+        return self._provider.embedding_cache_stats()
+
+    async def awarm_up(self) -> dict[str, float]:
+        """Load the lexical index, open the vector store and run a throwaway search."""
+        steps: dict[str, float] = {}
+        if self._mode != "dense":
+            with timed_step(steps, "lexical_index"):
+                self._provider.lexical_index()
+        if self._mode != "lexical":
+            with timed_step(steps, "vector_store"):
+                await asyncio.to_thread(self._provider.retriever)
+            with timed_step(steps, "similarity_search"):
+                await self._provider.asimilarity_search("warm up", k=1)
+        return steps
+
+    async def aprime_embeddings(self, queries: Iterable[str]) -> int:
+        """Embed many queries in one provider call so later lookups hit the cache.
+
+        Only useful when the embedding cache is active and dense search is in
+        play; returns the number of distinct queries sent.
+        """
+        embeddings = self.embeddings() if self._mode != "lexical" else None
+        if not isinstance(embeddings, CachedEmbeddings):
+            return 0
+        unique = list(dict.fromkeys(query for query in queries if query.strip()))
+        if unique:
+            await embeddings.aembed_documents(unique)
+        return len(unique)
+
+    def get_context(self, query: str, *, top_k: int | None = None) -> list[Document]:
+        top_k = top_k or self._settings.retrieval_top_k
+        fetch_k = self._fetch_k(top_k)
+        lexical, confident = self._lexical(query, fetch_k)
+        if confident or self._mode == "lexical":
+            return self._rerank(lexical, top_k)
+        k = self._candidates(fetch_k, lexical)
+        if not self._reranking:
+            retriever: VectorStore = self._provider.retriever()
+            with metrics.observe(_DENSE_LATENCY):
+                dense = retriever.similarity_search(query, k=k)
+            return self._fuse(dense, lexical, top_k)
+        with metrics.observe(_DENSE_LATENCY):
+            query_vector = self.embeddings().embed_query(query)
+            dense, vectors = self._provider.similarity_search_with_vectors(query_vector, k=k)
+        candidates = self._fuse(dense, lexical, fetch_k)
+        missing = self._unvectored(candidates, dense)
+        extra = self.embeddings().embed_documents(missing) if missing else []
+        return self._rerank(
+            candidates, top_k, query_vector, self._stack_vectors(candidates, dense, vectors, extra)
+        )
+
+    async def aget_context(
+        self, query: str, *, top_k: int | None = None, timeout: float | None = None
+    ) -> list[Document]:
+        """Non-blocking variant of ``get_context`` for use inside the async graph.
+
+        When the dense lookup exceeds ``timeout`` (defaults to
+        ``retrieval_timeout_seconds``) the lexical hits are returned on their
+        own, or an empty context when there are none. Embedding lexical-only
+        candidates for MMR shares the same deadline; if it runs out, the fused
+        candidates are reranked without vectors.
+        """
+        top_k = top_k or self._settings.retrieval_top_k
+        fetch_k = self._fetch_k(top_k)
+        lexical, confident = self._lexical(query, fetch_k)
+        if confident or self._mode == "lexical":
+            return self._rerank(lexical, top_k)
+        timeout = self._settings.retrieval_timeout_seconds if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        k = self._candidates(fetch_k, lexical)
+        try:
+            with metrics.observe(_DENSE_LATENCY):
+                if self._reranking:
+                    query_vector, dense, vectors = await asyncio.wait_for(
+                        self._provider.asimilarity_search_with_vectors(query, k=k),
+                        timeout=timeout or None,
+                    )
+                else:
+                    dense = await asyncio.wait_for(
+                        self._provider.asimilarity_search(query, k=k), timeout=timeout or None
+                    )
+        except asyncio.TimeoutError:
+            logger.warning("Retrieval timed out after {}s; continuing without context.", timeout)
+            metrics.RETRIEVAL_OUTCOMES.labels("timeout").inc()
+            return self._rerank(lexical, top_k)
+        if not self._reranking:
+            return self._fuse(dense, lexical, top_k)
+        candidates = self._fuse(dense, lexical, fetch_k)
+        missing = self._unvectored(candidates, dense)
+        try:
+            extra = (
+                await asyncio.wait_for(
+                    self.embeddings().aembed_documents(missing),
+                    timeout=max(deadline - loop.time(), 0.001) if deadline else None,
+                )
+                if missing
+                else []
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Embedding lexical candidates timed out; reranking without vectors.")
+            metrics.RETRIEVAL_OUTCOMES.labels("timeout").inc()
+            return self._rerank(candidates, top_k)
+        return self._rerank(
+            candidates, top_k, query_vector, self._stack_vectors(candidates, dense, vectors, extra)
+        )
+
+    @property
+    def _mode(self) -> str:
+        return self._settings.retrieval_mode.lower()
+
+    def _lexical(self, query: str, top_k: int) -> tuple[list[Document], bool]:
+        """BM25 candidates and whether the best one is confident enough to skip embedding."""
+        if self._mode == "dense":
+            return [], False
+        with metrics.observe(_LEXICAL_LATENCY):
+            hits = self._provider.lexical_index().search(
+                query, k=max(top_k, self._settings.retrieval_candidates)
+            )
+        margin = _lexical_margin(hits)
+        confident = (
+            self._mode == "hybrid"
+            and self._settings.retrieval_lexical_fast_path
+            and margin >= self._settings.retrieval_lexical_confidence
+        )
+        if confident:
+            logger.debug("Lexical fast path for {!r} (margin {:.2f})", query, margin)
+            metrics.RETRIEVAL_OUTCOMES.labels("lexical_fast_path").inc()
+        elif self._mode == "lexical":
+            metrics.RETRIEVAL_OUTCOMES.labels("lexical").inc()
+        return [doc for doc, _ in hits], confident
+
+    @property
+    def _reranking(self) -> bool:
+        return self._settings.retrieval_rerank_enabled
+
+    def _fetch_k(self, top_k: int) -> int:
+        if self._reranking:
+            return max(top_k, self._settings.retrieval_rerank_fetch_k)
+        return top_k
+
+    def _candidates(self, top_k: int, lexical: list[Document]) -> int:
+        return max(top_k, self._settings.retrieval_candidates) if lexical else top_k
+
+    def _fuse(self, dense: list[Document], lexical: list[Document], top_k: int) -> list[Document]:
+        if not lexical:
+            metrics.RETRIEVAL_OUTCOMES.labels("dense").inc()
+            return dense[:top_k]
+        metrics.RETRIEVAL_OUTCOMES.labels("hybrid").inc()
+        return reciprocal_rank_fusion(
+            [dense, lexical], k=self._settings.retrieval_rrf_k, top_k=top_k
+        )
+
+    def _rerank(
+        self,
+        candidates: list[Document],
+        top_k: int,
+        query_vector: list[float] | np.ndarray | None = None,
+        vectors: np.ndarray | None = None,
+    ) -> list[Document]:
+        """Diversify ``candidates`` down to ``top_k`` (MMR when vectors are known)."""
+        if not self._reranking or len(candidates) <= 1:
+            return candidates[:top_k]
+        with metrics.observe(_RERANK_LATENCY):
+            return mmr_rerank(
+                candidates,
+                top_k,
+                query_vector=query_vector,
+                vectors=vectors,
+                lambda_mult=self._settings.retrieval_mmr_lambda,
+                duplicate_threshold=self._settings.retrieval_duplicate_threshold,
+                shingle_threshold=self._settings.retrieval_shingle_threshold,
+                max_per_source=self._settings.retrieval_max_per_source,
+            )
+
+    @staticmethod
+    def _unvectored(candidates: list[Document], dense: list[Document]) -> list[str]:
+        """Texts of fused candidates (lexical-only hits) with no vector from the dense search."""
+        known = {document_key(doc) for doc in dense}
+        return [doc.page_content for doc in candidates if document_key(doc) not in known]
+
+    @staticmethod
+    def _stack_vectors(
+        candidates: list[Document],
+        dense: list[Document],
+        vectors: np.ndarray,
+        extra: list[list[float]],
+    ) -> np.ndarray | None:
+        if not candidates:
+            return None
+        known = {document_key(doc): row for doc, row in zip(dense, vectors)}
+        embedded = iter(extra)
+        return np.stack(
+            [
+                known[key] if key in known else np.asarray(next(embedded), dtype=np.float32)
+                for key in map(document_key, candidates)
+            ]
+        )
+
+    def format_context(self, documents: Iterable[Document], query: str | None = None) -> str:
+        """Render documents as ``[source] text`` blocks for the prompt.
 
-    def get_context(self, query: str, *, top_k: int = 3) -> list[Document]:
-        retriever: VectorStore = self._provider.retriever()
-        return retriever.similarity_search(query, k=top_k)
-
-    def format_context(self, documents: Iterable[Document]) -> str:
-        chunks = []
-        for doc in documents:
-            metadata = doc.metadata or {}
-            source = metadata.get("source", "unknown")
-            chunks.append(f"[{source}] {doc.page_content.strip()}")
-        return "\n\n".join(chunks)
+        Given the ``query``, the context is packed into ``context_token_budget``
+        tokens by keeping the sentences most relevant to it.
+        """
+        budget = self._settings.context_token_budget
+        if not query or budget <= 0:
+            return format_documents(documents)
+        packed = pack_context(
+            documents,
+            query,
+            token_budget=budget,
+            lookup=self._provider.cached_embeddings if self._mode != "lexical" else None,
+        )
+        if packed.compressed:
+            logger.debug(
+                "Packed prompt context from {} to {} tokens ({} of {} sentences)",
+                packed.tokens_before,
+                packed.tokens_after,
+                packed.kept,
+                packed.sentences,
+            )
+        else:
+            logger.debug("Prompt context uses {} tokens", packed.tokens_after)
+        return packed.text
 
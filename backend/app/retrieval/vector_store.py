@@ -1,25 +1,48 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any
 
-from langchain_community.vectorstores import Chroma
+import numpy as np
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
-from langchain_openai import OpenAIEmbeddings
 from loguru import logger
 
 from app.config.settings import get_settings
+from app.retrieval.embedding_cache import CachedEmbeddings
+from app.retrieval.embeddings import (
+    EmbeddingConfigMismatch,
+    embedding_config,
+    get_embedding_backend,
+)
+from app.retrieval.lexical import BM25Index
+from app.retrieval.mmap_store import MmapVectorStore
+
+EMBEDDING_CACHE_FILENAME = "embedding_cache.sqlite3"
+INDEX_VERSION_FILENAME = "index_version"
+EMBEDDING_CONFIG_FILENAME = "embedding_config.json"
+LEXICAL_INDEX_DIRNAME = "lexical_index"
+VECTOR_INDEX_DIRNAME = "vector_index"
 
 
 class VectorStoreProvider:
     """Factory/utility helper around the configured vector store."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        embeddings: Embeddings | None = None,
+        vector_store: VectorStore | None = None,
+    ) -> None:
         self._settings = get_settings()
         persist_directory = (self._settings.chroma_persist_directory or "").strip()
-        self._persist_directory: Optional[Path] = None
+        self._persist_directory: Path | None = None
         if persist_directory:
             self._persist_directory = Path(persist_directory).expanduser().resolve()
             self._persist_directory.mkdir(parents=True, exist_ok=True)
@@ -28,16 +51,170 @@ class VectorStoreProvider:
             logger.debug("Chroma configured for in-memory usage (no persistence).")
 
         self._collection_name = self._settings.chroma_collection_name
-        self._vector_store: Optional[Chroma] = None
+        self._vector_store: VectorStore | None = vector_store
+        self._embeddings: Embeddings | None = embeddings
+        # Injected embeddings are not described by the settings, so they are not stamped.
+        self._embeddings_from_settings = embeddings is None
+        self._embedding_config_checked = False
+        self._search_executor: ThreadPoolExecutor | None = None
+        self._index_version = "0"
+        self._index_version_mtime: int | None = None
+        self._lexical: BM25Index | None = None
+        self._lexical_version: str | None = None
+        self._mmap: MmapVectorStore | None = None
+        self._mmap_version: str | None = None
+
+    @property
+    def persist_directory(self) -> Path | None:
+        return self._persist_directory
 
     def embeddings(self) -> Embeddings:
         """Return embeddings implementation for the knowledge base."""
-        if not self._settings.openai_api_key:
-            raise RuntimeError("OpenAI API key must be configured for embeddings.")
-        return OpenAIEmbeddings(
-            api_key=self._settings.openai_api_key.get_secret_value(),
-            model="text-embedding-3-large",
+        if self._embeddings is not None:
+            return self._embeddings
+        backend = get_embedding_backend(self._settings)
+        embeddings = backend.factory(self._settings)
+        if backend.remote and self._settings.embedding_cache_enabled:
+            model = self._settings.embedding_model
+            if self._settings.embedding_dimensions:
+                model = f"{model}@{self._settings.embedding_dimensions}"
+            embeddings = CachedEmbeddings(
+                embeddings,
+                model=model,
+                max_entries=self._settings.embedding_cache_max_entries,
+                ttl_seconds=self._settings.embedding_cache_ttl_seconds,
+                persist_path=self._embedding_cache_path(),
+                disk_max_entries=self._settings.embedding_cache_disk_max_entries,
+                disk_ttl_seconds=self._settings.embedding_cache_disk_ttl_seconds,
+            )
+        self._embeddings = embeddings
+        return embeddings
+
+    def cached_embeddings(self, texts: list[str]) -> list[list[float] | None]:
+        """Embeddings of ``texts`` that are available without a provider request.
+
+        Remote backends only answer from the in-memory embedding cache; local
+        backends (e.g. ``hashing``) compute the vectors. Unknown texts map to
+        ``None``.
+        """
+        embeddings = self.embeddings()
+        if isinstance(embeddings, CachedEmbeddings):
+            return embeddings.cached(texts)
+        if self._embeddings_from_settings and not get_embedding_backend(self._settings).remote:
+            return embeddings.embed_documents(texts)
+        return [None] * len(texts)
+
+    def embedding_cache_stats(self) -> dict[str, float] | None:
+        """Return hit/miss counters when the embedding cache is active."""
+        if isinstance(self._embeddings, CachedEmbeddings):
+            return self._embeddings.stats.as_dict()
+        return None
+
+    def _embedding_cache_path(self) -> Path | None:
+        if not self._settings.embedding_cache_persist or not self._persist_directory:
+            return None
+        return self._persist_directory / EMBEDDING_CACHE_FILENAME
+
+    def check_embedding_config(self) -> None:
+        """Reject an index that was built with different embedding settings.
+
+        The configuration is recorded next to the index on ingestion; indexes
+        without a record (or in-memory ones) are accepted as they are.
+        """
+        if self._embedding_config_checked:
+            return
+        self._embedding_config_checked = True
+        if not self._persist_directory or not self._embeddings_from_settings:
+            return
+        path = self._persist_directory / EMBEDDING_CONFIG_FILENAME
+        if not path.exists():
+            return
+        recorded = json.loads(path.read_text(encoding="utf-8"))
+        current = embedding_config(self._settings)
+        if recorded != current:
+            self._embedding_config_checked = False
+            raise EmbeddingConfigMismatch(
+                f"Index at {self._persist_directory} was built with embeddings {recorded}, "
+                f"but the settings select {current}. Restore the original embedding settings "
+                "or re-ingest into an empty persist directory."
+            )
+
+    def _record_embedding_config(self) -> None:
+        if self._persist_directory and self._embeddings_from_settings:
+            path = self._persist_directory / EMBEDDING_CONFIG_FILENAME
+            path.write_text(json.dumps(embedding_config(self._settings)), encoding="utf-8")
+
+    def index_version(self) -> str:
+        """Return a token that changes whenever the knowledge base is re-ingested.
+
+        With a persist directory the token lives in a stamp file, so ingestion
+        runs from another process (e.g. the CLI) are observed as well.
+        """
+        if not self._persist_directory:
+            return self._index_version
+        stamp = self._persist_directory / INDEX_VERSION_FILENAME
+        try:
+            mtime = stamp.stat().st_mtime_ns
+        except FileNotFoundError:
+            return self._index_version
+        if mtime != self._index_version_mtime:
+            self._index_version = stamp.read_text(encoding="utf-8").strip() or "0"
+            self._index_version_mtime = mtime
+        return self._index_version
+
+    def mark_ingested(self) -> None:
+        """Advance the index version after the knowledge base changed."""
+        self._index_version = str(time.time_ns())
+        self._lexical_version = self._index_version
+        self._mmap_version = self._index_version
+        if self._persist_directory:
+            if self._lexical is not None:
+                self._lexical.save(self._persist_directory / LEXICAL_INDEX_DIRNAME)
+            if self._mmap is not None:
+                self._mmap.save(self._persist_directory / VECTOR_INDEX_DIRNAME)
+            self._record_embedding_config()
+            stamp = self._persist_directory / INDEX_VERSION_FILENAME
+            stamp.write_text(self._index_version, encoding="utf-8")
+            self._index_version_mtime = stamp.stat().st_mtime_ns
+
+    def lexical_index(self) -> BM25Index:
+        """Return the BM25 index, reloading it when another process re-ingested."""
+        version = self.index_version()
+        if self._lexical is not None and version == self._lexical_version:
+            return self._lexical
+        path = self._persist_directory / LEXICAL_INDEX_DIRNAME if self._persist_directory else None
+        index = None
+        if path is not None and path.exists():
+            try:
+                index = BM25Index.load(path)
+                logger.debug("Loaded lexical index with {} chunks from {}", len(index), path)
+            except (OSError, ValueError) as exc:
+                logger.warning("Could not load lexical index at {}: {}", path, exc)
+        if index is not None:
+            self._lexical = index
+        elif self._lexical is None:
+            self._lexical = BM25Index()
+        self._lexical_version = version
+        return self._lexical
+
+    def rebuild_lexical_index(self) -> int:
+        """Populate the lexical index from an existing Chroma collection."""
+        collection = getattr(self.retriever(), "_collection", None)
+        if collection is None:
+            return 0
+        records = collection.get(include=["documents", "metadatas"])
+        index = self.lexical_index()
+        index.upsert(
+            records["ids"],
+            [
+                Document(page_content=text or "", metadata=metadata or {})
+                for text, metadata in zip(records["documents"], records["metadatas"])
+            ],
         )
+        if self._persist_directory:
+            index.save(self._persist_directory / LEXICAL_INDEX_DIRNAME)
+        logger.info("Rebuilt lexical index from {} stored chunks", len(records["ids"]))
+        return len(records["ids"])
 
     def _persist_kwargs(self) -> dict[str, Any]:
         if self._persist_directory:
@@ -52,7 +229,9 @@ class VectorStoreProvider:
             return
 
         vector_store = self.retriever()
-        vector_store.add_documents(documents)
+        ids = vector_store.add_documents(documents)
+        self.lexical_index().upsert(ids, documents)
+        self.mark_ingested()
         persist = getattr(vector_store, "persist", None)
         if callable(persist) and self._persist_directory:
             persist()
@@ -60,10 +239,46 @@ class VectorStoreProvider:
                 "Persisted {} documents to Chroma at {}", len(documents), self._persist_directory
             )
 
+    def upsert_embedded(
+        self,
+        ids: list[str],
+        documents: list[Document],
+        vectors: list[list[float]],
+    ) -> None:
+        """Write documents whose embeddings were computed by the caller.
+
+        Chroma collections accept vectors directly; other stores fall back to
+        ``add_documents`` (which re-embeds through the cached embeddings).
+        """
+        vector_store = self.retriever()
+        collection = getattr(vector_store, "_collection", None)
+        if isinstance(vector_store, MmapVectorStore):
+            vector_store.add_vectors(ids, documents, vectors)
+        elif collection is not None:
+            collection.upsert(
+                ids=ids,
+                embeddings=vectors,
+                metadatas=[doc.metadata or None for doc in documents],
+                documents=[doc.page_content for doc in documents],
+            )
+        else:
+            vector_store.add_documents(documents, ids=ids)
+        self.lexical_index().upsert(ids, documents)
+
+    def delete_ids(self, ids: list[str]) -> None:
+        if ids:
+            self.retriever().delete(ids=ids)
+            self.lexical_index().delete(ids)
+
     def retriever(self) -> VectorStore:
         """Return vector store retriever."""
-        if self._vector_store:
+        if self._vector_store is not None:
             return self._vector_store
+        self.check_embedding_config()
+        if self._settings.vector_store_backend.lower() == "mmap":
+            return self.mmap_index()
+
+        from langchain_community.vectorstores import Chroma
 
         embeddings = self.embeddings()
         self._vector_store = Chroma(
@@ -73,3 +288,103 @@ class VectorStoreProvider:
         )
         return self._vector_store
 
+    def mmap_index(self) -> MmapVectorStore:
+        """Return the memory-mapped index, reloading it when another process re-ingested."""
+        version = self.index_version()
+        if self._mmap is not None and version == self._mmap_version:
+            return self._mmap
+        path = self._persist_directory / VECTOR_INDEX_DIRNAME if self._persist_directory else None
+        store = None
+        if path is not None and path.exists():
+            try:
+                store = MmapVectorStore.load(
+                    path,
+                    self.embeddings(),
+                    rescore_factor=self._settings.vector_index_rescore_factor,
+                )
+                logger.debug("Loaded vector index with {} chunks from {}", len(store), path)
+            except (OSError, ValueError) as exc:
+                logger.warning("Could not load vector index at {}: {}", path, exc)
+        if store is not None:
+            self._mmap = store
+        elif self._mmap is None:
+            self._mmap = MmapVectorStore(
+                self.embeddings(),
+                quantization=self._settings.vector_index_quantization,
+                rescore_factor=self._settings.vector_index_rescore_factor,
+            )
+        self._mmap_version = version
+        return self._mmap
+
+    async def asimilarity_search(self, query: str, *, k: int = 3) -> list[Document]:
+        """Embed the query natively async and run the vector search off the event loop.
+
+        The store's own search is synchronous (Chroma), so it is dispatched to a
+        bounded thread pool sized by ``retrieval_max_workers``.
+        """
+        vector = await self.embeddings().aembed_query(query)
+        vector_store = self.retriever()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor(), lambda: vector_store.similarity_search_by_vector(vector, k=k)
+        )
+
+    def similarity_search_with_vectors(
+        self, vector: list[float], *, k: int = 3
+    ) -> tuple[list[Document], np.ndarray]:
+        """Top ``k`` documents for an embedded query, with their stored embeddings.
+
+        Rows of the returned matrix line up with the documents. Stores that
+        cannot return embeddings have the hits re-embedded (through the
+        embedding cache when it is active).
+        """
+        vector_store = self.retriever()
+        if isinstance(vector_store, MmapVectorStore):
+            return vector_store.search_with_vectors(vector, k=k)
+        collection = getattr(vector_store, "_collection", None)
+        if collection is not None:
+            result = collection.query(
+                query_embeddings=[vector],
+                n_results=k,
+                include=["documents", "metadatas", "embeddings"],
+            )
+            documents = [
+                Document(page_content=text or "", metadata=metadata or {})
+                for text, metadata in zip(result["documents"][0], result["metadatas"][0])
+            ]
+            embeddings = result["embeddings"][0] if documents else []
+        else:
+            documents = vector_store.similarity_search_by_vector(vector, k=k)
+            embeddings = (
+                self.embeddings().embed_documents([doc.page_content for doc in documents])
+                if documents
+                else []
+            )
+        return documents, np.asarray(embeddings, dtype=np.float32).reshape(
+            len(documents), len(vector)
+        )
+
+    async def asimilarity_search_with_vectors(
+        self, query: str, *, k: int = 3
+    ) -> tuple[np.ndarray, list[Document], np.ndarray]:
+        """Async ``similarity_search_with_vectors`` that also returns the query vector."""
+        vector = await self.embeddings().aembed_query(query)
+        loop = asyncio.get_running_loop()
+        documents, vectors = await loop.run_in_executor(
+            self._executor(), lambda: self.similarity_search_with_vectors(vector, k=k)
+        )
+        return np.asarray(vector, dtype=np.float32), documents, vectors
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._search_executor is None:
+            self._search_executor = ThreadPoolExecutor(
+                max_workers=self._settings.retrieval_max_workers,
+                thread_name_prefix="vector-search",
+            )
+        return self._search_executor
+
+    def close(self) -> None:
+        """Release the search thread pool."""
+        if self._search_executor is not None:
+            self._search_executor.shutdown(wait=False, cancel_futures=True)
+            self._search_executor = None
@@ -0,0 +1,157 @@
+"""Admission control for LLM calls and in-order turn processing per session."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+
+class AdmissionRejected(Exception):
+    """Raised when a turn cannot be admitted; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+@dataclass
+class AdmissionStats:
+    in_flight: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    avg_hold_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_hold_seconds": round(self.avg_hold_seconds, 4),
+        }
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded wait queue in front of the LLM.
+
+    At most ``max_concurrency`` callers hold a slot at once and at most
+    ``max_queue`` wait for one. A caller arriving at a full queue, or waiting
+    longer than ``queue_timeout`` seconds, gets ``AdmissionRejected`` with a
+    retry hint derived from the recent average slot hold time.
+    """
+
+    _EWMA_ALPHA = 0.2
+
+    def __init__(
+        self, *, max_concurrency: int = 8, max_queue: int = 32, queue_timeout: float = 10.0
+    ) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._max_queue = max(0, max_queue)
+        self._queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self.stats = AdmissionStats()
+
+    def retry_after(self) -> float:
+        hold = self.stats.avg_hold_seconds or 1.0
+        return max(1.0, hold * (self.stats.waiting + 1) / self._max_concurrency)
+
+    @property
+    def saturated(self) -> bool:
+        """True when every slot is held, so ``slot(wait=False)`` would fail."""
+        return self._semaphore.locked()
+
+    def check(self) -> None:
+        """Reject up front when no slot is free and the wait queue is full."""
+        if self._semaphore.locked() and self.stats.waiting >= self._max_queue:
+            self.stats.rejected += 1
+            raise AdmissionRejected("LLM queue is full.", self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self, *, wait: bool = True) -> AsyncIterator[None]:
+        """Hold one LLM slot; with ``wait=False`` fail at once unless a slot is free."""
+        if not wait and self._semaphore.locked():
+            raise AdmissionRejected("No free LLM slot.", self.retry_after())
+        if wait:
+            self.check()
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            self.stats.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self._queue_timeout)
+            except asyncio.TimeoutError:
+                self.stats.timed_out += 1
+                raise AdmissionRejected(
+                    "Timed out waiting for an LLM slot.", self.retry_after()
+                ) from None
+            finally:
+                self.stats.waiting -= 1
+
+        self.stats.in_flight += 1
+        self.stats.admitted += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - started
+            previous = self.stats.avg_hold_seconds
+            self.stats.avg_hold_seconds = (
+                held if not previous else previous + self._EWMA_ALPHA * (held - previous)
+            )
+            self.stats.in_flight -= 1
+            self._semaphore.release()
+
+
+class _SessionEntry:
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class SessionLocks:
+    """One FIFO lock per session so turns read and commit history strictly in order.
+
+    Entries exist only while a session has a turn running or queued. A session
+    with ``max_pending`` turns already running or waiting rejects further turns.
+    Locks are per process; deployments running several workers against a
+    shared session store should route a session to a single worker.
+    """
+
+    def __init__(self, *, max_pending: int = 4) -> None:
+        self._max_pending = max(1, max_pending)
+        self._entries: dict[str, _SessionEntry] = {}
+
+    def pending(self, session_id: str) -> int:
+        entry = self._entries.get(session_id)
+        return entry.users if entry else 0
+
+    def check(self, session_id: str) -> None:
+        if self.pending(session_id) >= self._max_pending:
+            raise AdmissionRejected("Too many turns queued for this session.", 1.0)
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        self.check(session_id)
+        entry = self._entries.setdefault(session_id, _SessionEntry())
+        entry.users += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.users -= 1
+            if not entry.users and self._entries.get(session_id) is entry:
+                del self._entries[session_id]
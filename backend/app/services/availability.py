@@ -0,0 +1,439 @@
+"""Meeting availability: cached busy intervals and precomputed free slots."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Protocol
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import httpx
+from loguru import logger
+
+from app.config.settings import get_settings
+from app.services import metrics
+from app.services.http_client import request_with_retries
+from app.services.metrics import register_stats
+
+Interval = tuple[datetime, datetime]
+
+# Slots outside this local window are only offered when nothing else is free.
+VISITOR_DAY_START_HOUR = 8
+VISITOR_DAY_END_HOUR = 20
+
+CALENDLY_BUSY_TIMES_URL = "https://api.calendly.com/user_busy_times"
+_CALENDLY_MAX_RANGE = timedelta(days=7)
+# A calendar that cannot be reached or parsed is skipped until its next refresh.
+_FETCH_ERRORS = (httpx.HTTPError, OSError, KeyError, ValueError)
+
+_LATENCY = metrics.INTEGRATION_LATENCY.labels("calendly", "busy_times")
+_ERRORS = metrics.INTEGRATION_ERRORS.labels("calendly", "busy_times")
+_IN_FLIGHT = metrics.INTEGRATION_IN_FLIGHT.labels("calendly")
+
+
+def resolve_timezone(name: str | None, default: ZoneInfo | timezone = timezone.utc):
+    if not name:
+        return default
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.debug("Unknown time zone {!r}; using {}", name, default)
+        return default
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp (``Z`` suffix allowed) into an aware UTC datetime."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    merged: list[Interval] = []
+    for start, end in sorted(interval for interval in intervals if interval[1] > interval[0]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class IntervalIndex:
+    """Sorted, non-overlapping busy intervals with ``O(log n)`` overlap checks."""
+
+    def __init__(self, intervals: Iterable[Interval] = ()) -> None:
+        merged = merge_intervals(intervals)
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        # Intervals are disjoint and sorted, so the last one starting before
+        # ``end`` also has the latest end among them.
+        position = bisect_left(self._starts, end)
+        return position > 0 and self._ends[position - 1] > start
+
+    def intervals(self) -> list[Interval]:
+        return list(zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+
+class BusySource(Protocol):
+    async def fetch(self, start: datetime, end: datetime) -> list[Interval]: ...
+
+
+class CalendlyBusySource:
+    """Busy intervals of one Calendly user (``/user_busy_times``, 7 days per request)."""
+
+    def __init__(
+        self, token: str, user_uri: str, client: httpx.AsyncClient | None = None
+    ) -> None:
+        self._headers = {"Authorization": f"Bearer {token}"}
+        self._user_uri = user_uri
+        self._client = client
+
+    async def fetch(self, start: datetime, end: datetime) -> list[Interval]:
+        intervals: list[Interval] = []
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + _CALENDLY_MAX_RANGE, end)
+            with metrics.observe(_LATENCY, _ERRORS, _IN_FLIGHT):
+                response = await request_with_retries(
+                    "GET",
+                    CALENDLY_BUSY_TIMES_URL,
+                    client=self._client,
+                    headers=self._headers,
+                    params={
+                        "user": self._user_uri,
+                        "start_time": window_start.astimezone(timezone.utc).isoformat(),
+                        "end_time": window_end.astimezone(timezone.utc).isoformat(),
+                    },
+                )
+                response.raise_for_status()
+            for item in response.json().get("collection", []):
+                intervals.append(
+                    (parse_timestamp(item["start_time"]), parse_timestamp(item["end_time"]))
+                )
+            window_start = window_end
+        return intervals
+
+
+def _ics_datetime(name: str, value: str, default_tz) -> tuple[datetime, bool]:
+    """Return ``(aware datetime, is_all_day)`` for a DTSTART/DTEND property."""
+    params = dict(part.split("=", 1) for part in name.split(";")[1:] if "=" in part)
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        day = datetime.strptime(value[:8], "%Y%m%d")
+        return day.replace(tzinfo=default_tz), True
+    if value.endswith("Z"):
+        return datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc), False
+    tz = resolve_timezone(params.get("TZID"), default_tz)
+    return datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=tz), False
+
+
+def parse_ics(text: str, default_tz=timezone.utc) -> list[Interval]:
+    """Busy intervals from the VEVENTs of an iCalendar document.
+
+    Handles UTC, ``TZID`` and floating times and all-day events; transparent
+    and cancelled events are skipped. Recurrence rules are not expanded, so
+    export the calendar with recurring events already materialized.
+    """
+    unfolded = text.replace("\r\n", "\n").replace("\n ", "").replace("\n\t", "")
+    intervals: list[Interval] = []
+    event: dict[str, tuple[str, str]] | None = None
+    for line in unfolded.split("\n"):
+        line = line.rstrip()
+        if line == "BEGIN:VEVENT":
+            event = {}
+        elif line == "END:VEVENT" and event is not None:
+            if (
+                "DTSTART" in event
+                and event.get("TRANSP", ("", ""))[1] != "TRANSPARENT"
+                and event.get("STATUS", ("", ""))[1] != "CANCELLED"
+            ):
+                start, all_day = _ics_datetime(*event["DTSTART"], default_tz)
+                if "DTEND" in event:
+                    end, _ = _ics_datetime(*event["DTEND"], default_tz)
+                else:
+                    end = start + timedelta(days=1) if all_day else start
+                intervals.append((start.astimezone(timezone.utc), end.astimezone(timezone.utc)))
+            event = None
+        elif event is not None and ":" in line:
+            name, value = line.split(":", 1)
+            event[name.split(";", 1)[0].upper()] = (name, value.strip())
+    return intervals
+
+
+class ICSBusySource:
+    """Busy intervals from a local ``.ics`` file (a stand-in for a live calendar)."""
+
+    def __init__(self, path: str | Path, default_tz=timezone.utc) -> None:
+        self._path = Path(path).expanduser()
+        self._default_tz = default_tz
+
+    async def fetch(self, start: datetime, end: datetime) -> list[Interval]:
+        text = await asyncio.to_thread(self._path.read_text, encoding="utf-8")
+        return [
+            (busy_start, busy_end)
+            for busy_start, busy_end in parse_ics(text, self._default_tz)
+            if busy_end > start and busy_start < end
+        ]
+
+
+@dataclass
+class AvailabilityStats:
+    refreshes: int = 0
+    refresh_errors: int = 0
+    busy_intervals: int = 0
+    candidates: int = 0
+    last_refresh_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "busy_intervals": self.busy_intervals,
+            "candidates": self.candidates,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 4),
+        }
+
+
+@dataclass
+class _CalendarCache:
+    intervals: list[Interval]
+    fetched_at: float
+
+
+class AvailabilityEngine:
+    """Free meeting slots computed from cached busy intervals of several calendars.
+
+    Each calendar's busy intervals are cached for ``ttl_seconds``. On refresh the
+    union is indexed and every free slot in the next ``horizon_days`` of business
+    hours is precomputed, so ``suggest`` only filters an in-memory list. A
+    background task started with ``start`` refreshes ahead of expiry; a stale
+    read schedules a refresh and answers from the previous candidates.
+    """
+
+    def __init__(
+        self,
+        calendars: dict[str, BusySource] | None = None,
+        *,
+        timezone_name: str = "UTC",
+        workdays: Iterable[int] = (0, 1, 2, 3, 4),
+        day_start_hour: int = 9,
+        day_end_hour: int = 17,
+        slot_minutes: int = 30,
+        min_notice_minutes: int = 240,
+        horizon_days: int = 14,
+        ttl_seconds: float = 300.0,
+    ) -> None:
+        self._calendars = dict(calendars or {})
+        self._tz = resolve_timezone(timezone_name)
+        self._workdays = frozenset(workdays)
+        self._day_start_hour = day_start_hour
+        self._day_end_hour = day_end_hour
+        self._slot = timedelta(minutes=slot_minutes)
+        self._min_notice = timedelta(minutes=min_notice_minutes)
+        self._horizon = timedelta(days=horizon_days)
+        self._ttl_seconds = ttl_seconds
+        self._cache: dict[str, _CalendarCache] = {}
+        self._booked: list[Interval] = []
+        self._busy = IntervalIndex()
+        self._candidates: list[datetime] = []
+        self._generated_at: float | None = None
+        self._suggestions: dict[tuple[str, int, int], list[str]] = {}
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self._task: asyncio.Task | None = None
+        self.stats = AvailabilityStats()
+
+    @property
+    def slot_duration(self) -> timedelta:
+        return self._slot
+
+    def is_free(self, start: datetime) -> bool:
+        return not self._busy.overlaps(start, start + self._slot)
+
+    def mark_busy(
+        self, start: datetime, end: datetime | None = None, *, now: datetime | None = None
+    ) -> None:
+        """Record a booking made through us so it is not offered again before the next fetch."""
+        end = end or start + self._slot
+        self._booked.append((start.astimezone(timezone.utc), end.astimezone(timezone.utc)))
+        self._rebuild(now or datetime.now(timezone.utc))
+
+    async def refresh(self, *, force: bool = False, now: datetime | None = None) -> None:
+        """Refetch calendars whose cache expired (all when ``force``) and regenerate slots."""
+        async with self._refresh_lock:
+            started = time.perf_counter()
+            now = now or datetime.now(timezone.utc)
+            window_end = now + self._horizon + timedelta(days=1)
+            for name, source in self._calendars.items():
+                cached = self._cache.get(name)
+                fresh = cached and time.monotonic() - cached.fetched_at < self._ttl_seconds
+                if fresh and not force:
+                    continue
+                try:
+                    intervals = await source.fetch(now, window_end)
+                except _FETCH_ERRORS as exc:
+                    self.stats.refresh_errors += 1
+                    logger.warning("Busy times for calendar {} unavailable: {}", name, exc)
+                    continue
+                self._cache[name] = _CalendarCache(intervals, time.monotonic())
+            self._rebuild(now)
+            self.stats.refreshes += 1
+            self.stats.last_refresh_seconds = time.perf_counter() - started
+
+    def suggest(
+        self, timezone_name: str | None = None, count: int = 3, *, now: datetime | None = None
+    ) -> list[str]:
+        """Up to ``count`` free slots, preferably on different days, in the visitor's zone."""
+        if self._is_stale():
+            self._schedule_refresh()
+        now = now or datetime.now(timezone.utc)
+        first = bisect_left(self._candidates, now + self._min_notice)
+        key = (timezone_name or "", first, count)
+        cached = self._suggestions.get(key)
+        if cached is None:
+            cached = self._pick(resolve_timezone(timezone_name, self._tz), first, count)
+            self._suggestions[key] = cached
+        return list(cached)
+
+    async def asuggest(
+        self, timezone_name: str | None = None, count: int = 3, *, now: datetime | None = None
+    ) -> list[str]:
+        if self._generated_at is None:
+            await self.refresh(now=now)
+        return self.suggest(timezone_name, count, now=now)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="availability-refresh")
+
+    async def stop(self) -> None:
+        for task in (self._task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._refresh_task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except (ValueError, OverflowError) as exc:  # pragma: no cover - keep refreshing
+                logger.exception("Availability refresh failed: {}", exc)
+            await asyncio.sleep(max(self._ttl_seconds * 0.8, 1.0))
+
+    def _is_stale(self) -> bool:
+        return (
+            self._generated_at is None
+            or time.monotonic() - self._generated_at >= self._ttl_seconds
+        )
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._refresh_task = loop.create_task(self.refresh())
+
+    def _rebuild(self, now: datetime) -> None:
+        busy = [interval for cache in self._cache.values() for interval in cache.intervals]
+        self._booked = [(start, end) for start, end in self._booked if end > now]
+        self._busy = IntervalIndex(busy + self._booked)
+        self._candidates = [
+            start
+            for start in self._working_slots(now)
+            if not self._busy.overlaps(start, start + self._slot)
+        ]
+        self._suggestions = {}
+        self._generated_at = time.monotonic()
+        self.stats.busy_intervals = len(self._busy)
+        self.stats.candidates = len(self._candidates)
+
+    def _working_slots(self, now: datetime) -> list[datetime]:
+        slots: list[datetime] = []
+        local_today = now.astimezone(self._tz).date()
+        for offset in range(self._horizon.days + 1):
+            day = local_today + timedelta(days=offset)
+            if day.weekday() not in self._workdays:
+                continue
+            slots.extend(self._day_slots(day))
+        return slots
+
+    def _day_slots(self, day: date) -> list[datetime]:
+        opening = datetime(day.year, day.month, day.day, self._day_start_hour, tzinfo=self._tz)
+        closing = datetime(day.year, day.month, day.day, self._day_end_hour, tzinfo=self._tz)
+        slots = []
+        start = opening
+        while start + self._slot <= closing:
+            slots.append(start.astimezone(timezone.utc))
+            start += self._slot
+        return slots
+
+    def _pick(self, tz, first: int, count: int) -> list[str]:
+        pool = [start.astimezone(tz) for start in self._candidates[first:]]
+        preferred = [slot for slot in pool if self._visitor_friendly(slot)] or pool
+        picked: list[datetime] = []
+        days: set[date] = set()
+        for slot in preferred:
+            if slot.date() not in days:
+                picked.append(slot)
+                days.add(slot.date())
+                if len(picked) == count:
+                    break
+        for slot in preferred:
+            if len(picked) >= count:
+                break
+            if slot not in picked:
+                picked.append(slot)
+        return [slot.isoformat() for slot in sorted(picked)]
+
+    def _visitor_friendly(self, slot: datetime) -> bool:
+        end = slot + self._slot
+        return (
+            slot.hour >= VISITOR_DAY_START_HOUR
+            and (end.hour, end.minute) <= (VISITOR_DAY_END_HOUR, 0)
+            and end.date() == slot.date()
+        )
+
+
+@lru_cache
+def get_availability_engine() -> AvailabilityEngine:
+    settings = get_settings()
+    business_tz = resolve_timezone(settings.business_timezone)
+    calendars: dict[str, BusySource] = {}
+    if settings.calendly_api_token and settings.calendly_user_uri:
+        calendars["calendly"] = CalendlyBusySource(
+            settings.calendly_api_token.get_secret_value(), str(settings.calendly_user_uri)
+        )
+    if settings.availability_ics_path:
+        calendars["ics"] = ICSBusySource(settings.availability_ics_path, business_tz)
+    engine = AvailabilityEngine(
+        calendars,
+        timezone_name=settings.business_timezone,
+        workdays=settings.business_days,
+        day_start_hour=settings.business_hours_start,
+        day_end_hour=settings.business_hours_end,
+        slot_minutes=settings.meeting_duration_minutes,
+        min_notice_minutes=settings.availability_min_notice_minutes,
+        horizon_days=settings.availability_horizon_days,
+        ttl_seconds=settings.availability_cache_ttl_seconds,
+    )
+    register_stats("availability", engine.stats.as_dict)
+    return engine
@@ -4,13 +4,20 @@ import httpx
 from loguru import logger
 
 from app.config.settings import get_settings
+from app.services import metrics
+from app.services.http_client import request_with_retries
+
+_LATENCY = metrics.INTEGRATION_LATENCY.labels("discord", "send_embed")
+_ERRORS = metrics.INTEGRATION_ERRORS.labels("discord", "send_embed")
+_IN_FLIGHT = metrics.INTEGRATION_IN_FLIGHT.labels("discord")
 
 
 class DiscordNotifier:
     """Sends lead and meeting notifications to a Discord channel."""
 
-    def __init__(self) -> None:
+    def __init__(self, client: httpx.AsyncClient | None = None) -> None:
         self._settings = get_settings()
+        self._client = client
 
     async def send_embed(self, title: str, description: str, fields: dict[str, Any]) -> None:
         if not self._settings.discord_webhook_url:
@@ -30,11 +37,13 @@ class DiscordNotifier:
             ]
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
+        with metrics.observe(_LATENCY, _ERRORS, _IN_FLIGHT):
+            response = await request_with_retries(
+                "POST",
                 str(self._settings.discord_webhook_url),
+                client=self._client,
                 json=payload,
             )
             response.raise_for_status()
-            logger.info("Sent Discord notification: {}", title)
+        logger.info("Sent Discord notification: {}", title)
 
@@ -0,0 +1,167 @@
+"""Application-lifetime pooled HTTP client shared by outbound integrations."""
+
+from __future__ import annotations
+
+import importlib.util
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+from loguru import logger
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from app.config.settings import get_settings
+
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# The server may already have acted on a non-idempotent request that timed out
+# or failed with a 5xx; only errors raised before the request left are safe.
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    http2 = settings.http_enable_http2 and _http2_available()
+    if settings.http_enable_http2 and not http2:
+        logger.debug("h2 is not installed; shared HTTP client will use HTTP/1.1.")
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.http_timeout_seconds),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        http2=http2,
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called from the FastAPI lifespan)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        logger.debug("Opened shared HTTP client.")
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Delay requested by the server via ``Retry-After`` or Discord's ``retry_after`` body."""
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return max(float(header), 0.0)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(header)
+            except (TypeError, ValueError):
+                when = None
+            if when is not None:
+                return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    if response.status_code == 429:
+        try:
+            body = response.json()
+        except ValueError:
+            return None
+        if isinstance(body, dict) and isinstance(body.get("retry_after"), (int, float)):
+            return max(float(body["retry_after"]), 0.0)
+    return None
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    return response.status_code in RETRY_STATUSES
+
+
+def _should_retry_unsafe(response: httpx.Response) -> bool:
+    return response.status_code == 429
+
+
+async def request_with_retries(
+    method: str,
+    url: str,
+    *,
+    client: httpx.AsyncClient | None = None,
+    attempts: int | None = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request, retrying transport errors and retryable statuses.
+
+    Only idempotent methods are retried after a timeout or 5xx; other
+    methods (e.g. the Calendly and Discord POSTs) are retried only when the
+    connection could not be made or the server answered 429, so a request
+    the server already committed is never repeated.
+    Backoff is exponential with full jitter, except that a server-provided
+    ``Retry-After`` (capped at ``http_retry_after_max_seconds``) takes
+    precedence. The final response is returned even if it is still an error.
+    """
+    settings = get_settings()
+    client = client or get_http_client()
+    jitter = wait_random_exponential(
+        multiplier=settings.http_retry_backoff_seconds,
+        max=settings.http_retry_backoff_max_seconds,
+    )
+
+    def wait(retry_state: RetryCallState) -> float:
+        outcome = retry_state.outcome
+        if outcome is not None and not outcome.failed:
+            delay = retry_after_seconds(outcome.result())
+            if delay is not None:
+                return min(delay, settings.http_retry_after_max_seconds)
+        return jitter(retry_state)
+
+    def before_sleep(retry_state: RetryCallState) -> None:
+        outcome = retry_state.outcome
+        reason = (
+            repr(outcome.exception())
+            if outcome is not None and outcome.failed
+            else f"HTTP {outcome.result().status_code}" if outcome is not None else "unknown"
+        )
+        logger.warning(
+            "{} {} failed ({}); retrying in {:.2f}s",
+            method,
+            url,
+            reason,
+            retry_state.next_action.sleep if retry_state.next_action else 0.0,
+        )
+
+    if method.upper() in IDEMPOTENT_METHODS:
+        retry = retry_if_exception_type(httpx.TransportError) | retry_if_result(_should_retry)
+    else:
+        retry = retry_if_exception_type(_UNSENT_ERRORS) | retry_if_result(_should_retry_unsafe)
+    retrying = AsyncRetrying(
+        stop=stop_after_attempt(attempts or settings.http_retry_attempts),
+        wait=wait,
+        retry=retry,
+        before_sleep=before_sleep,
+        retry_error_callback=lambda retry_state: retry_state.outcome.result(),
+        reraise=True,
+    )
+    return await retrying(client.request, method, url, **kwargs)
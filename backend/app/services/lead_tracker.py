@@ -1,24 +1,435 @@
-from typing import Optional
+"""Persistent lead store keyed by email, phone and chat session.
 
-from app.models.chat import LeadCapture, MeetingProposal
+Run ``python -m app.services.lead_tracker export --format csv`` to dump every
+lead as CSV (or ``ndjson``) to stdout or ``--output``.
+"""
 
+from __future__ import annotations
 
-class LeadTracker:
-    """In-memory placeholder for session lead details (replace with persistent store)."""
+import argparse
+import csv
+import io
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
 
-    def __init__(self) -> None:
-        self._lead: Optional[LeadCapture] = None
-        self._meeting: Optional[MeetingProposal] = None
+from loguru import logger
 
-    def set_lead(self, lead: LeadCapture) -> None:
-        self._lead = lead
+LEAD_FIELDS = ("name", "email", "company", "phone", "notes")
+EXPORT_COLUMNS = (
+    "lead_id",
+    *LEAD_FIELDS,
+    "sessions",
+    "created_at",
+    "updated_at",
+    "notified_at",
+    "meeting_time",
+)
+EXPORT_FORMATS = ("csv", "ndjson")
+_EXPORT_PAGE = 500
 
-    def get_lead(self) -> Optional[LeadCapture]:
-        return self._lead
+_PHONE_NOISE = re.compile(r"[^\d+]")
 
-    def set_meeting(self, meeting: MeetingProposal) -> None:
-        self._meeting = meeting
 
-    def get_meeting(self) -> Optional[MeetingProposal]:
-        return self._meeting
+def lead_keys(session_id: str | None, fields: dict[str, Any]) -> list[str]:
+    """Index keys for a lead, strongest identity first (email, phone, session)."""
+    keys = []
+    email = str(fields.get("email") or "").strip().lower()
+    if email:
+        keys.append(f"email:{email}")
+    phone = _PHONE_NOISE.sub("", str(fields.get("phone") or ""))
+    if len(phone.lstrip("+")) >= 6:
+        keys.append(f"phone:{phone}")
+    if session_id:
+        keys.append(f"session:{session_id}")
+    return keys
 
+
+@dataclass
+class LeadRecord:
+    lead_id: int
+    fields: dict[str, str]
+    created_at: float
+    updated_at: float
+    notified_at: float | None = None
+    meeting_time: str | None = None
+
+    @property
+    def notified(self) -> bool:
+        return self.notified_at is not None
+
+
+@dataclass
+class LeadUpdate:
+    """Result of ``LeadStore.upsert``; ``notify`` is True for exactly one caller per lead."""
+
+    lead: LeadRecord
+    created: bool = False
+    notify: bool = False
+
+
+@dataclass
+class LeadStoreStats:
+    leads: int = 0
+    index_hits: int = 0
+    index_misses: int = 0
+    notifications: int = 0
+    duplicates_suppressed: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "leads": self.leads,
+            "index_hits": self.index_hits,
+            "index_misses": self.index_misses,
+            "notifications": self.notifications,
+            "duplicates_suppressed": self.duplicates_suppressed,
+        }
+
+
+class LeadStore:
+    """SQLite (WAL mode) lead records with an in-memory key index.
+
+    Every lead is reachable from its email, phone number and the chat
+    sessions it appeared in, so a returning visitor is recognized with one
+    dictionary lookup. Index misses fall back to the ``lead_keys`` table,
+    which picks up leads written by other workers. Writes run in
+    ``BEGIN IMMEDIATE`` transactions that re-read the row first, so partial
+    fields from different turns (or workers) merge instead of overwriting,
+    and the notification for a lead is claimed exactly once.
+
+    Merged records are server-side only: a visitor who types an email that
+    belongs to an existing lead must not see that lead's other details, so
+    the fields each session supplied itself are kept apart in
+    ``lead_sessions`` and returned by ``session_fields``.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        if str(path) in ("", ":memory:"):
+            target = ":memory:"
+        else:
+            self._path = Path(path).expanduser()
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            target = str(self._path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            target, check_same_thread=False, timeout=10.0, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leads ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, fields TEXT NOT NULL,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+            " notified_at REAL, meeting_time TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lead_keys ("
+            " key TEXT PRIMARY KEY, lead_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS lead_keys_lead ON lead_keys (lead_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lead_sessions ("
+            " session_id TEXT PRIMARY KEY, fields TEXT NOT NULL)"
+        )
+        self._index: dict[str, int] = dict(
+            self._conn.execute("SELECT key, lead_id FROM lead_keys").fetchall()
+        )
+        self._records: dict[int, LeadRecord] = {}
+        self._sessions: dict[str, dict[str, str]] = {}
+        self.stats = LeadStoreStats(
+            leads=self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+        )
+
+    def find(
+        self,
+        *,
+        session_id: str | None = None,
+        email: str | None = None,
+        phone: str | None = None,
+    ) -> LeadRecord | None:
+        """Return the lead matching the strongest of the given identifiers."""
+        keys = lead_keys(session_id, {"email": email, "phone": phone})
+        with self._lock:
+            for key in keys:
+                lead_id = self._lookup(key)
+                if lead_id is not None:
+                    return self._record(lead_id)
+        return None
+
+    def session_fields(self, session_id: str) -> dict[str, str]:
+        """Lead fields supplied by ``session_id`` itself, without merged details."""
+        with self._lock:
+            return dict(self._session(session_id))
+
+    def upsert(
+        self, session_id: str | None, fields: dict[str, Any], *, claim_notification: bool = True
+    ) -> LeadUpdate:
+        """Merge ``fields`` into the visitor's lead, creating it if needed.
+
+        Non-empty values win over stored ones; empty values never erase.
+        With ``claim_notification``, ``notify`` is set when the lead has an
+        email and nobody has claimed its notification yet; the claim is
+        recorded in the same transaction. The returned record holds the
+        merged fields of every session and must not be shown to the visitor.
+        """
+        incoming = {
+            key: str(value).strip()
+            for key, value in fields.items()
+            if key in LEAD_FIELDS and value and str(value).strip()
+        }
+        keys = lead_keys(session_id, incoming)
+        with self._lock:
+            own = self._session(session_id) if session_id else {}
+            known = [self._index.get(key) for key in keys]
+            record = self._records.get(known[0]) if known and known[0] is not None else None
+            if (
+                record is not None
+                and all(lead_id == record.lead_id for lead_id in known)
+                and {**record.fields, **incoming} == record.fields
+                and {**own, **incoming} == own
+                and (record.notified or not claim_notification or not record.fields.get("email"))
+            ):
+                # Nothing new for an already known lead: skip the write transaction.
+                self.stats.index_hits += 1
+                if incoming.get("email"):
+                    self.stats.duplicates_suppressed += 1
+                return LeadUpdate(record)
+        now = time.time()
+        with self._lock, self._transaction():
+            lead_id = next(
+                (found for found in map(self._lookup_sql, keys) if found is not None), None
+            )
+            created = lead_id is None
+            if created:
+                record = LeadRecord(0, incoming, created_at=now, updated_at=now)
+                cursor = self._conn.execute(
+                    "INSERT INTO leads (fields, created_at, updated_at) VALUES (?, ?, ?)",
+                    (json.dumps(record.fields), now, now),
+                )
+                record.lead_id = int(cursor.lastrowid)
+                self.stats.leads += 1
+            else:
+                record = self._load(lead_id)
+                merged = {**record.fields, **incoming}
+                if merged != record.fields:
+                    record.fields = merged
+                    record.updated_at = now
+                    self._conn.execute(
+                        "UPDATE leads SET fields = ?, updated_at = ? WHERE id = ?",
+                        (json.dumps(merged), now, record.lead_id),
+                    )
+            new_keys = [key for key in keys if self._index.get(key) != record.lead_id]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lead_keys (key, lead_id) VALUES (?, ?)",
+                [(key, record.lead_id) for key in new_keys],
+            )
+            stored = self._load_session(session_id) if session_id else {}
+            own = {**stored, **incoming}
+            if session_id and own != stored:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO lead_sessions (session_id, fields) VALUES (?, ?)",
+                    (session_id, json.dumps(own)),
+                )
+
+            notify = False
+            if claim_notification and record.fields.get("email"):
+                if record.notified_at is None:
+                    record.notified_at = now
+                    self._conn.execute(
+                        "UPDATE leads SET notified_at = ? WHERE id = ?", (now, record.lead_id)
+                    )
+                    notify = True
+                    self.stats.notifications += 1
+                elif incoming.get("email"):
+                    self.stats.duplicates_suppressed += 1
+        for key in new_keys:
+            self._index[key] = record.lead_id
+        self._records[record.lead_id] = record
+        if session_id:
+            self._sessions[session_id] = own
+        return LeadUpdate(record, created=created, notify=notify)
+
+    def release_notification(self, lead_id: int) -> None:
+        """Undo a notification claim whose delivery failed, so a later turn retries."""
+        with self._lock, self._transaction():
+            self._conn.execute("UPDATE leads SET notified_at = NULL WHERE id = ?", (lead_id,))
+            if lead_id in self._records:
+                self._records[lead_id].notified_at = None
+            self.stats.notifications -= 1
+
+    def claim_meeting(self, lead_id: int, slot: str) -> str | None:
+        """Record ``slot`` as the lead's meeting.
+
+        Returns the previously booked slot (or ``""`` when there was none);
+        ``None`` means ``slot`` was already booked and nothing should be sent.
+        """
+        with self._lock, self._transaction():
+            record = self._load(lead_id)
+            previous = record.meeting_time
+            if previous == slot:
+                self.stats.duplicates_suppressed += 1
+                return None
+            self._conn.execute("UPDATE leads SET meeting_time = ? WHERE id = ?", (slot, lead_id))
+            record.meeting_time = slot
+        self._records[lead_id] = record
+        return previous or ""
+
+    def release_meeting(self, lead_id: int, previous: str) -> None:
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "UPDATE leads SET meeting_time = ? WHERE id = ?", (previous or None, lead_id)
+            )
+            if lead_id in self._records:
+                self._records[lead_id].meeting_time = previous or None
+
+    def iter_export(self, fmt: str = "csv") -> Iterator[str]:
+        """Yield every lead as CSV lines (header first) or NDJSON lines."""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}; use one of {EXPORT_FORMATS}")
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+        if fmt == "csv":
+            writer.writeheader()
+            yield self._drain(buffer)
+        last_id = 0
+        while True:
+            # Page by primary key so the lock is never held while the caller consumes rows.
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT l.id, l.fields, l.created_at, l.updated_at, l.notified_at,"
+                    " l.meeting_time, GROUP_CONCAT(SUBSTR(k.key, 9), ' ')"
+                    " FROM leads l LEFT JOIN lead_keys k"
+                    " ON k.lead_id = l.id AND k.key LIKE 'session:%'"
+                    " WHERE l.id > ? GROUP BY l.id ORDER BY l.id LIMIT ?",
+                    (last_id, _EXPORT_PAGE),
+                ).fetchall()
+            if not rows:
+                return
+            for lead_id, fields, created, updated, notified, meeting, sessions in rows:
+                stored = json.loads(fields)
+                row = {
+                    "lead_id": lead_id,
+                    **{name: stored.get(name, "") for name in LEAD_FIELDS},
+                    "sessions": sessions or "",
+                    "created_at": _iso(created),
+                    "updated_at": _iso(updated),
+                    "notified_at": _iso(notified),
+                    "meeting_time": meeting or "",
+                }
+                if fmt == "ndjson":
+                    yield json.dumps(row) + "\n"
+                else:
+                    writer.writerow(row)
+                    yield self._drain(buffer)
+            last_id = rows[-1][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _lookup(self, key: str) -> int | None:
+        lead_id = self._index.get(key)
+        if lead_id is not None:
+            self.stats.index_hits += 1
+            return lead_id
+        self.stats.index_misses += 1
+        lead_id = self._lookup_sql(key)
+        if lead_id is not None:
+            self._index[key] = lead_id
+        return lead_id
+
+    def _lookup_sql(self, key: str) -> int | None:
+        row = self._conn.execute(
+            "SELECT lead_id FROM lead_keys WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _record(self, lead_id: int) -> LeadRecord:
+        record = self._records.get(lead_id)
+        if record is None:
+            record = self._records[lead_id] = self._load(lead_id)
+        return record
+
+    def _session(self, session_id: str) -> dict[str, str]:
+        fields = self._sessions.get(session_id)
+        if fields is None:
+            fields = self._sessions[session_id] = self._load_session(session_id)
+        return fields
+
+    def _load_session(self, session_id: str) -> dict[str, str]:
+        row = self._conn.execute(
+            "SELECT fields FROM lead_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _load(self, lead_id: int) -> LeadRecord:
+        fields, created, updated, notified, meeting = self._conn.execute(
+            "SELECT fields, created_at, updated_at, notified_at, meeting_time"
+            " FROM leads WHERE id = ?",
+            (lead_id,),
+        ).fetchone()
+        return LeadRecord(lead_id, json.loads(fields), created, updated, notified, meeting)
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+
+def _iso(timestamp: float | None) -> str:
+    if timestamp is None:
+        return ""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat(timespec="seconds")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export captured leads.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write every lead as CSV or NDJSON.")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    from app.config.settings import get_settings
+
+    load_dotenv()
+    store = LeadStore(get_settings().lead_store_path)
+    output = args.output.open("w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        count = 0
+        for line in store.iter_export(args.format):
+            output.write(line)
+            count += 1
+    finally:
+        if args.output:
+            output.close()
+        store.close()
+    logger.info("Exported {} leads", count - (args.format == "csv"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,225 @@
+"""Prometheus metrics for the agent graph, retrieval and outbound integrations.
+
+Everything is registered on a dedicated ``REGISTRY`` served at
+``/api/metrics``. Hot-path instrumentation is limited to histogram and counter
+updates (a lock and a few additions); cache and queue statistics are read
+lazily by ``StatsCollector`` only when the endpoint is scraped.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from loguru import logger
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    GCCollector,
+    Histogram,
+    ProcessCollector,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REGISTRY = CollectorRegistry()
+ProcessCollector(registry=REGISTRY)
+GCCollector(registry=REGISTRY)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (0, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+TURN_LATENCY = Histogram(
+    "chatbot_turn_latency_seconds",
+    "End-to-end latency of a chat turn.",
+    ["mode"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+TURNS_IN_FLIGHT = Gauge(
+    "chatbot_turns_in_flight", "Chat turns currently being processed.", registry=REGISTRY
+)
+TURN_ERRORS = Counter(
+    "chatbot_turn_errors_total", "Chat turns that raised.", ["mode"], registry=REGISTRY
+)
+NODE_LATENCY = Histogram(
+    "chatbot_node_latency_seconds",
+    "Latency of each agent graph node.",
+    ["node"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+NODE_ERRORS = Counter(
+    "chatbot_node_errors_total", "Agent graph node failures.", ["node"], registry=REGISTRY
+)
+LLM_LATENCY = Histogram(
+    "chatbot_llm_latency_seconds",
+    "Latency of LLM calls.",
+    ["call"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+LLM_TOKENS = Counter(
+    "chatbot_llm_tokens_total", "LLM tokens consumed.", ["type"], registry=REGISTRY
+)
+LLM_DECISIONS = Counter(
+    "chatbot_llm_decisions_total",
+    "Decision LLM outcomes (primary, hedge, fallback, budget_exhausted, error).",
+    ["outcome"],
+    registry=REGISTRY,
+)
+LLM_HEDGES = Counter(
+    "chatbot_llm_hedges_total",
+    "Secondary decision requests ('hedge' on a slow primary, 'fallback' on a failed one,"
+    " 'skipped' when no LLM slot was free for a hedge).",
+    ["reason"],
+    registry=REGISTRY,
+)
+TURN_TOKENS = Histogram(
+    "chatbot_turn_tokens",
+    "LLM tokens (input + output) consumed per chat turn.",
+    buckets=TOKEN_BUCKETS,
+    registry=REGISTRY,
+)
+RETRIEVAL_LATENCY = Histogram(
+    "chatbot_retrieval_latency_seconds",
+    "Latency of retrieval stages.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+RETRIEVAL_OUTCOMES = Counter(
+    "chatbot_retrieval_total",
+    "Retrieval requests by how they were answered.",
+    ["outcome"],
+    registry=REGISTRY,
+)
+INTEGRATION_LATENCY = Histogram(
+    "chatbot_integration_latency_seconds",
+    "Latency of outbound integration calls.",
+    ["integration", "operation"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+INTEGRATION_ERRORS = Counter(
+    "chatbot_integration_errors_total",
+    "Outbound integration calls that raised.",
+    ["integration", "operation"],
+    registry=REGISTRY,
+)
+INTEGRATION_IN_FLIGHT = Gauge(
+    "chatbot_integration_in_flight",
+    "Outbound integration calls in progress.",
+    ["integration"],
+    registry=REGISTRY,
+)
+ROUTER_DECISIONS = Counter(
+    "chatbot_intent_router_decisions_total",
+    "Intent router decisions by intent ('llm' means the full path).",
+    ["intent"],
+    registry=REGISTRY,
+)
+
+
+@contextmanager
+def observe(
+    latency: Any, errors: Any = None, in_flight: Any = None
+) -> Iterator[None]:
+    """Time a block into ``latency``, counting exceptions and tracking concurrency."""
+    if in_flight is not None:
+        in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if errors is not None:
+            errors.inc()
+        raise
+    finally:
+        latency.observe(time.perf_counter() - started)
+        if in_flight is not None:
+            in_flight.dec()
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Sum token usage reported by every LLM call in one graph run."""
+
+    run_inline = True
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+    ignore_custom_event = True
+
+    def __init__(self) -> None:
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        if not (input_tokens or output_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        if input_tokens:
+            LLM_TOKENS.labels("input").inc(input_tokens)
+        if output_tokens:
+            LLM_TOKENS.labels("output").inc(output_tokens)
+
+
+class StatsCollector:
+    """Expose ``as_dict()``-style statistics as gauges at scrape time."""
+
+    def __init__(self) -> None:
+        self._sources: dict[str, Callable[[], dict[str, float] | None]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, source: Callable[[], dict[str, float] | None]) -> None:
+        with self._lock:
+            self._sources[name] = source
+
+    def collect(self):
+        with self._lock:
+            sources = list(self._sources.items())
+        for name, source in sources:
+            try:
+                values = source() or {}
+            except sqlite3.Error as exc:  # pragma: no cover - a closed store must not break scrapes
+                logger.debug("Skipping {} stats: {}", name, exc)
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    yield GaugeMetricFamily(
+                        f"chatbot_{name}_{key}", f"{name} {key.replace('_', ' ')}.", value=value
+                    )
+
+
+STATS = StatsCollector()
+REGISTRY.register(STATS)
+
+
+def register_stats(name: str, source: Callable[[], dict[str, float] | None]) -> None:
+    STATS.register(name, source)
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,363 @@
+"""Durable outbox for notifications that must not block or fail a chat turn."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from app.config.settings import get_settings
+from app.services.discord import DiscordNotifier
+from app.services.http_client import RETRY_STATUSES
+from app.services.metrics import register_stats
+
+DISCORD_EMBED = "discord_embed"
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    attempts: int
+    created_at: float
+
+
+@dataclass
+class OutboxStats:
+    depth: int = 0
+    dead_letters: int = 0
+    oldest_pending_seconds: float = 0.0
+    delivered: int = 0
+    retried: int = 0
+    dead_lettered: int = 0
+    last_delivery_lag_seconds: float = 0.0
+    max_delivery_lag_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+class SQLiteOutbox:
+    """Append-and-ack message queue in SQLite (WAL mode).
+
+    ``enqueue`` is a single local insert, so callers return immediately.
+    Claimed messages are leased for ``lease_seconds``; a worker that dies
+    mid-delivery leaves them to be picked up again once the lease expires.
+    Messages that exhaust their attempts move to the dead-letter state and
+    stay in the table for inspection or ``requeue_dead``.
+    """
+
+    def __init__(self, path: str | Path, *, lease_seconds: float = 60.0) -> None:
+        if str(path) in ("", ":memory:"):
+            target = ":memory:"
+        else:
+            self._path = Path(path).expanduser()
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            target = str(self._path)
+        self._lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(target, check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL, available_at REAL NOT NULL, last_error TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, available_at)"
+        )
+        self._conn.commit()
+
+    def enqueue(self, kind: str, payload: dict[str, Any]) -> int:
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (kind, payload, created_at, available_at) VALUES (?, ?, ?, ?)",
+                (kind, json.dumps(payload), now, now),
+            )
+        return int(cursor.lastrowid)
+
+    def claim(self, limit: int) -> list[OutboxMessage]:
+        """Lease up to ``limit`` due messages, oldest first.
+
+        The read and the lease run in one ``BEGIN IMMEDIATE`` transaction, so
+        workers sharing the file (other processes) never claim the same rows.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT id, kind, payload, attempts, created_at FROM outbox"
+                " WHERE status = 'pending' AND available_at <= ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE outbox SET available_at = ? WHERE id = ?",
+                    [(now + self._lease_seconds, row[0]) for row in rows],
+                )
+        return [
+            OutboxMessage(
+                id=row[0],
+                kind=row[1],
+                payload=json.loads(row[2]),
+                attempts=row[3],
+                created_at=row[4],
+            )
+            for row in rows
+        ]
+
+    def ack(self, ids: list[int]) -> None:
+        if not ids:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, message_id: int, error: str, delay: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, available_at = ?, last_error = ?"
+                " WHERE id = ?",
+                (time.time() + delay, error, message_id),
+            )
+
+    def dead_letter(self, message_id: int, error: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'dead', attempts = attempts + 1, last_error = ?"
+                " WHERE id = ?",
+                (error, message_id),
+            )
+
+    def requeue_dead(self) -> int:
+        """Move dead-lettered messages back to the queue with a fresh attempt budget."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = 0, available_at = ?"
+                " WHERE status = 'dead'",
+                (time.time(),),
+            )
+        return cursor.rowcount
+
+    def dead_messages(self) -> list[tuple[OutboxMessage, str | None]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind, payload, attempts, created_at, last_error FROM outbox"
+                " WHERE status = 'dead' ORDER BY id"
+            ).fetchall()
+        return [
+            (OutboxMessage(row[0], row[1], json.loads(row[2]), row[3], row[4]), row[5])
+            for row in rows
+        ]
+
+    def counts(self) -> tuple[int, int, float]:
+        """Return ``(pending, dead, oldest pending created_at or 0)``."""
+        with self._lock:
+            pending, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+            (dead,) = self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'dead'"
+            ).fetchone()
+        return pending, dead, oldest or 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _PermanentFailure(Exception):
+    """Delivery failed in a way that retrying cannot fix."""
+
+
+class OutboxWorker:
+    """Drain an outbox in batches with per-message retry and dead-lettering."""
+
+    def __init__(
+        self,
+        outbox: SQLiteOutbox,
+        handlers: dict[str, Handler],
+        *,
+        batch_size: int = 20,
+        poll_interval: float = 1.0,
+        max_attempts: int = 8,
+        backoff_seconds: float = 2.0,
+        backoff_max_seconds: float = 300.0,
+    ) -> None:
+        self.outbox = outbox
+        self._handlers = handlers
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._backoff_seconds = backoff_seconds
+        self._backoff_max_seconds = backoff_max_seconds
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stats = OutboxStats()
+
+    def enqueue(self, kind: str, payload: dict[str, Any]) -> int:
+        message_id = self.outbox.enqueue(kind, payload)
+        self._wakeup.set()
+        return message_id
+
+    async def aenqueue(self, kind: str, payload: dict[str, Any]) -> int:
+        """``enqueue`` from the event loop; the SQLite write runs in a worker thread."""
+        message_id = await asyncio.to_thread(self.outbox.enqueue, kind, payload)
+        self._wakeup.set()
+        return message_id
+
+    def stats(self) -> OutboxStats:
+        pending, dead, oldest = self.outbox.counts()
+        self._stats.depth = pending
+        self._stats.dead_letters = dead
+        self._stats.oldest_pending_seconds = max(time.time() - oldest, 0.0) if oldest else 0.0
+        return OutboxStats(**self._stats.as_dict())
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="outbox-worker")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> int:
+        """Deliver one batch of due messages; return how many were claimed.
+
+        Claiming and recording results are SQLite writes, so they run in a
+        worker thread and never hold up the event loop.
+        """
+        messages = await asyncio.to_thread(self.outbox.claim, self._batch_size)
+        if not messages:
+            return 0
+        results = await asyncio.gather(
+            *(self._deliver(message) for message in messages), return_exceptions=True
+        )
+        await asyncio.to_thread(self._settle, messages, results)
+        return len(messages)
+
+    def _settle(self, messages: list[OutboxMessage], results: list[Any]) -> None:
+        delivered: list[int] = []
+        now = time.time()
+        for message, result in zip(messages, results):
+            if result is None:
+                delivered.append(message.id)
+                lag = now - message.created_at
+                self._stats.delivered += 1
+                self._stats.last_delivery_lag_seconds = lag
+                self._stats.max_delivery_lag_seconds = max(
+                    self._stats.max_delivery_lag_seconds, lag
+                )
+                continue
+            error = f"{type(result).__name__}: {result}"
+            if isinstance(result, _PermanentFailure) or message.attempts + 1 >= self._max_attempts:
+                logger.error("Outbox message {} ({}) dead-lettered: {}", message.id, message.kind, error)
+                self.outbox.dead_letter(message.id, error)
+                self._stats.dead_lettered += 1
+            else:
+                delay = self._backoff(message.attempts + 1)
+                logger.warning(
+                    "Outbox message {} ({}) failed, retrying in {:.1f}s: {}",
+                    message.id,
+                    message.kind,
+                    delay,
+                    error,
+                )
+                self.outbox.retry(message.id, error, delay)
+                self._stats.retried += 1
+        self.outbox.ack(delivered)
+
+    async def drain(self) -> None:
+        """Deliver everything that is currently due (used on shutdown and in tests)."""
+        while await self.run_once():
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.run_once()
+            except (sqlite3.Error, OSError) as exc:  # pragma: no cover - keep the worker alive
+                logger.exception("Outbox worker iteration failed: {}", exc)
+                claimed = 0
+            if claimed >= self._batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _deliver(self, message: OutboxMessage) -> None:
+        handler = self._handlers.get(message.kind)
+        if handler is None:
+            raise _PermanentFailure(f"No handler for outbox message kind {message.kind!r}")
+        try:
+            await handler(message.payload)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code not in RETRY_STATUSES:
+                raise _PermanentFailure(str(exc)) from exc
+            raise
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self._backoff_seconds * 2 ** (attempt - 1), self._backoff_max_seconds)
+        return random.uniform(0, ceiling)
+
+
+class OutboxNotifier:
+    """Drop-in for ``DiscordNotifier`` that queues embeds for background delivery."""
+
+    def __init__(self, worker: OutboxWorker) -> None:
+        self._worker = worker
+
+    async def send_embed(self, title: str, description: str, fields: dict[str, Any]) -> None:
+        message_id = await self._worker.aenqueue(
+            DISCORD_EMBED,
+            {"title": title, "description": description, "fields": fields},
+        )
+        logger.debug("Queued Discord notification {} as outbox message {}", title, message_id)
+
+
+def discord_handlers(notifier: DiscordNotifier) -> dict[str, Handler]:
+    async def send(payload: dict[str, Any]) -> None:
+        await notifier.send_embed(payload["title"], payload["description"], payload["fields"])
+
+    return {DISCORD_EMBED: send}
+
+
+@lru_cache
+def get_outbox_worker() -> OutboxWorker:
+    settings = get_settings()
+    worker = OutboxWorker(
+        SQLiteOutbox(settings.outbox_path),
+        discord_handlers(DiscordNotifier()),
+        batch_size=settings.outbox_batch_size,
+        poll_interval=settings.outbox_poll_interval_seconds,
+        max_attempts=settings.outbox_max_attempts,
+        backoff_seconds=settings.outbox_retry_backoff_seconds,
+        backoff_max_seconds=settings.outbox_retry_backoff_max_seconds,
+    )
+    register_stats("outbox", lambda: worker.stats().as_dict())
+    return worker
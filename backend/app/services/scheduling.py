@@ -1,29 +1,36 @@
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any
 
 import httpx
 from loguru import logger
 
 from app.config.settings import get_settings
+from app.services import metrics
+from app.services.availability import AvailabilityEngine, get_availability_engine
+from app.services.http_client import request_with_retries
+
+_LATENCY = metrics.INTEGRATION_LATENCY.labels("calendly", "schedule_meeting")
+_ERRORS = metrics.INTEGRATION_ERRORS.labels("calendly", "schedule_meeting")
+_IN_FLIGHT = metrics.INTEGRATION_IN_FLIGHT.labels("calendly")
 
 
 class SchedulingService:
     """Interact with Calendly (or fallback) to propose/schedule meetings."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        availability: AvailabilityEngine | None = None,
+    ) -> None:
         self._settings = get_settings()
+        self._client = client
+        self._availability = availability or get_availability_engine()
 
-    async def suggest_time_slots(self) -> list[str]:
-        """Return candidate meeting slots."""
-        # Placeholder implementation: return next three business-day slots.
-        now = datetime.utcnow()
-        slots = []
-        for i in range(1, 4):
-            slot = now + timedelta(days=i)
-            slots.append(slot.replace(hour=15, minute=0, second=0, microsecond=0).isoformat())
-        return slots
+    async def suggest_time_slots(self, timezone: str | None = None) -> list[str]:
+        """Return free meeting slots as ISO timestamps in the visitor's time zone."""
+        return await self._availability.asuggest(timezone)
 
-    async def schedule_meeting(self, attendee: dict[str, Any], slot: str) -> Optional[str]:
+    async def schedule_meeting(self, attendee: dict[str, Any], slot: str) -> str | None:
         """Confirm a meeting at the selected slot via Calendly API if available."""
         if not self._settings.calendly_api_token or not self._settings.calendly_user_uri:
             logger.info("Calendly not configured; returning fallback meeting link.")
@@ -33,6 +40,7 @@ class SchedulingService:
             "Authorization": f"Bearer {self._settings.calendly_api_token.get_secret_value()}",
             "Content-Type": "application/json",
         }
+        duration = timedelta(minutes=self._settings.meeting_duration_minutes)
         payload = {
             "invitees": [
                 {
@@ -41,24 +49,30 @@ class SchedulingService:
                 }
             ],
             "start_time": slot,
-            "end_time": (datetime.fromisoformat(slot) + timedelta(minutes=30)).isoformat(),
+            "end_time": (datetime.fromisoformat(slot) + duration).isoformat(),
             "location": {"type": "zoom"},
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
+        with metrics.observe(_LATENCY, _ERRORS, _IN_FLIGHT):
+            response = await request_with_retries(
+                "POST",
                 "https://api.calendly.com/scheduled_events",
+                client=self._client,
                 headers=headers,
                 json=payload,
             )
-            if response.is_error:
-                logger.error(
-                    "Calendly scheduling failed: {} {}",
-                    response.status_code,
-                    response.text,
-                )
-                return None
+        if response.is_error:
+            _ERRORS.inc()
+            logger.error(
+                "Calendly scheduling failed: {} {}",
+                response.status_code,
+                response.text,
+            )
+            return None
 
-            data = response.json()
-            return data.get("resource", {}).get("uri")
+        start = datetime.fromisoformat(slot)
+        if start.tzinfo is not None:
+            self._availability.mark_busy(start)
+        data = response.json()
+        return data.get("resource", {}).get("uri")
 
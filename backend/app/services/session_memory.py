@@ -1,35 +1,425 @@
 from __future__ import annotations
 
-from collections import deque
-from typing import Deque, List
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from app.models.chat import ChatMessage
+from loguru import logger
 
+from app.models.chat import ChatMessage, ConversationSummary
 
-class SessionMemory:
+if TYPE_CHECKING:
+    from app.config.settings import Settings
+
+# Rough per-message overhead of the Python objects around the text payload.
+_MESSAGE_OVERHEAD_BYTES = 120
+
+
+def _message_size(message: ChatMessage) -> int:
+    return len(message.content.encode("utf-8")) + _MESSAGE_OVERHEAD_BYTES
+
+
+class SessionStore(ABC):
+    """Conversation history keyed by session ID.
+
+    The ``a``-prefixed methods are used from the event loop; by default they
+    run the blocking methods in a worker thread.
+    """
+
+    @abstractmethod
+    def get_history(self, session_id: str) -> list[ChatMessage]: ...
+
+    @abstractmethod
+    def append_messages(self, session_id: str, messages: list[ChatMessage]) -> None: ...
+
+    @abstractmethod
+    def set_history(self, session_id: str, messages: list[ChatMessage]) -> None: ...
+
+    @abstractmethod
+    def clear(self, session_id: str) -> None: ...
+
+    @abstractmethod
+    def get_summary(self, session_id: str) -> ConversationSummary | None: ...
+
+    @abstractmethod
+    def set_summary(self, session_id: str, summary: ConversationSummary) -> None: ...
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+    async def aget_history(self, session_id: str) -> list[ChatMessage]:
+        return await asyncio.to_thread(self.get_history, session_id)
+
+    async def aset_history(self, session_id: str, messages: list[ChatMessage]) -> None:
+        await asyncio.to_thread(self.set_history, session_id, messages)
+
+    async def aget_summary(self, session_id: str) -> ConversationSummary | None:
+        return await asyncio.to_thread(self.get_summary, session_id)
+
+    async def aset_summary(self, session_id: str, summary: ConversationSummary) -> None:
+        await asyncio.to_thread(self.set_summary, session_id, summary)
+
+
+@dataclass
+class _SessionEntry:
+    messages: deque[ChatMessage]
+    touched_at: float
+    size_bytes: int = 0
+    summary: ConversationSummary | None = None
+
+
+class SessionMemory(SessionStore):
     """In-memory conversation store keyed by session ID.
 
-    Replace with a persistent cache (e.g., Redis) for production/multi-instance deployments.
+    Sessions are kept in LRU order and expire after ``ttl_seconds`` of
+    inactivity. The least recently used sessions are evicted once the store
+    holds more than ``max_sessions`` sessions or more than ``max_bytes``
+    (approximate) of message data. Use the SQLite or Redis store to share
+    history across workers and restarts.
     """
 
-    def __init__(self, *, max_messages: int = 50) -> None:
+    def __init__(
+        self,
+        *,
+        max_messages: int = 50,
+        max_sessions: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 24 * 60 * 60,
+    ) -> None:
+        self._max_messages = max_messages
+        self._max_sessions = max_sessions
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._history: OrderedDict[str, _SessionEntry] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    def get_history(self, session_id: str) -> list[ChatMessage]:
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is None:
+                return []
+            return list(entry.messages)
+
+    def append_messages(self, session_id: str, messages: list[ChatMessage]) -> None:
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is None:
+                entry = _SessionEntry(deque(maxlen=self._max_messages), time.monotonic())
+                self._history[session_id] = entry
+            for message in messages:
+                if len(entry.messages) == entry.messages.maxlen:
+                    self._resize(entry, -_message_size(entry.messages[0]))
+                entry.messages.append(message)
+                self._resize(entry, _message_size(message))
+            self._enforce_limits()
+
+    def set_history(self, session_id: str, messages: list[ChatMessage]) -> None:
+        with self._lock:
+            previous = self._history.get(session_id)
+            summary = previous.summary if previous else None
+            self._drop(session_id)
+            kept = messages[-self._max_messages :]
+            entry = _SessionEntry(deque(kept, maxlen=self._max_messages), time.monotonic())
+            self._history[session_id] = entry
+            self._resize(entry, sum(_message_size(message) for message in kept))
+            if summary is not None:
+                entry.summary = summary
+                self._resize(entry, len(summary.text.encode("utf-8")))
+            self._enforce_limits()
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._drop(session_id)
+
+    def get_summary(self, session_id: str) -> ConversationSummary | None:
+        with self._lock:
+            entry = self._touch(session_id)
+            return entry.summary if entry else None
+
+    def set_summary(self, session_id: str, summary: ConversationSummary) -> None:
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is None:
+                # Checkpointed sessions keep their history elsewhere but still need a summary.
+                entry = _SessionEntry(deque(maxlen=self._max_messages), time.monotonic())
+                self._history[session_id] = entry
+            if entry.summary is not None:
+                self._resize(entry, -len(entry.summary.text.encode("utf-8")))
+            entry.summary = summary
+            self._resize(entry, len(summary.text.encode("utf-8")))
+            self._enforce_limits()
+
+    # Everything stays in process memory, so the async methods need no thread.
+    async def aget_history(self, session_id: str) -> list[ChatMessage]:
+        return self.get_history(session_id)
+
+    async def aset_history(self, session_id: str, messages: list[ChatMessage]) -> None:
+        self.set_history(session_id, messages)
+
+    async def aget_summary(self, session_id: str) -> ConversationSummary | None:
+        return self.get_summary(session_id)
+
+    async def aset_summary(self, session_id: str, summary: ConversationSummary) -> None:
+        self.set_summary(session_id, summary)
+
+    def _touch(self, session_id: str) -> _SessionEntry | None:
+        entry = self._history.get(session_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if self._ttl_seconds and now - entry.touched_at > self._ttl_seconds:
+            self._drop(session_id)
+            return None
+        entry.touched_at = now
+        self._history.move_to_end(session_id)
+        return entry
+
+    def _resize(self, entry: _SessionEntry, delta: int) -> None:
+        entry.size_bytes += delta
+        self._total_bytes += delta
+
+    def _drop(self, session_id: str) -> None:
+        entry = self._history.pop(session_id, None)
+        if entry is not None:
+            self._total_bytes -= entry.size_bytes
+
+    def _enforce_limits(self) -> None:
+        cutoff = time.monotonic() - self._ttl_seconds if self._ttl_seconds else None
+        while self._history:
+            oldest_id, oldest = next(iter(self._history.items()))
+            expired = cutoff is not None and oldest.touched_at < cutoff
+            over_limit = (
+                len(self._history) > self._max_sessions or self._total_bytes > self._max_bytes
+            )
+            if not expired and not (over_limit and len(self._history) > 1):
+                break
+            self._drop(oldest_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite (WAL mode) session store shared by every worker on the host."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_messages: int = 50,
+        ttl_seconds: float = 24 * 60 * 60,
+    ) -> None:
+        self._path = Path(path).expanduser()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
         self._max_messages = max_messages
-        self._history: dict[str, Deque[ChatMessage]] = {}
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY, messages TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " summary TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "summary" not in columns:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)"
+        )
+        self._conn.commit()
+        self.purge_expired()
 
-    def get_history(self, session_id: str) -> List[ChatMessage]:
-        history = self._history.get(session_id)
-        if not history:
+    def get_history(self, session_id: str) -> list[ChatMessage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT messages, updated_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None or self._expired(row[1]):
             return []
-        return list(history)
+        return [ChatMessage(**item) for item in json.loads(row[0])]
+
+    def append_messages(self, session_id: str, messages: list[ChatMessage]) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT messages, updated_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            existing = [] if row is None or self._expired(row[1]) else json.loads(row[0])
+            combined = existing + [message.model_dump() for message in messages]
+            self._write(session_id, combined)
+
+    def set_history(self, session_id: str, messages: list[ChatMessage]) -> None:
+        with self._lock, self._conn:
+            self._write(session_id, [message.model_dump() for message in messages])
+
+    def clear(self, session_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def get_summary(self, session_id: str) -> ConversationSummary | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, updated_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None or not row[0] or self._expired(row[1]):
+            return None
+        return ConversationSummary.model_validate_json(row[0])
+
+    def set_summary(self, session_id: str, summary: ConversationSummary) -> None:
+        now = time.time()
+        cutoff = now - self._ttl_seconds if self._ttl_seconds else 0.0
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, messages, updated_at, summary)"
+                " VALUES (?, '[]', ?, ?)"
+                " ON CONFLICT(session_id) DO UPDATE SET"
+                " messages = CASE WHEN updated_at < ? THEN '[]' ELSE messages END,"
+                " updated_at = excluded.updated_at, summary = excluded.summary",
+                (session_id, now, summary.model_dump_json(), cutoff),
+            )
+
+    def purge_expired(self) -> int:
+        if not self._ttl_seconds:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self._ttl_seconds,)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
-    def append_messages(self, session_id: str, messages: List[ChatMessage]) -> None:
-        if session_id not in self._history:
-            self._history[session_id] = deque(maxlen=self._max_messages)
-        history = self._history[session_id]
-        history.extend(messages)
+    def _expired(self, updated_at: float) -> bool:
+        return bool(self._ttl_seconds) and time.time() - updated_at > self._ttl_seconds
 
-    def set_history(self, session_id: str, messages: List[ChatMessage]) -> None:
-        self._history[session_id] = deque(messages[-self._max_messages :], maxlen=self._max_messages)
+    def _write(self, session_id: str, payload: list[dict[str, Any]]) -> None:
+        self._conn.execute(
+            "INSERT INTO sessions (session_id, messages, updated_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(session_id) DO UPDATE SET"
+            " messages = excluded.messages, updated_at = excluded.updated_at",
+            (session_id, json.dumps(payload[-self._max_messages :]), time.time()),
+        )
+
+
+class RedisSessionStore(SessionStore):
+    """Session store for any Redis-protocol server (Redis, Valkey, KeyDB, ...).
+
+    Each session is a Redis list of JSON-encoded messages, trimmed to
+    ``max_messages`` and expiring after ``ttl_seconds`` of inactivity.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        *,
+        client: Any | None = None,
+        max_messages: int = 50,
+        ttl_seconds: float = 24 * 60 * 60,
+        key_prefix: str = "chat:session:",
+    ) -> None:
+        if client is None:
+            try:
+                import redis
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError(
+                    "The redis package is required for the Redis session store "
+                    "(pip install -e '.[redis]')."
+                ) from exc
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+        self._max_messages = max_messages
+        self._ttl_seconds = int(ttl_seconds) if ttl_seconds else 0
+        self._key_prefix = key_prefix
+
+    def _key(self, session_id: str) -> str:
+        return f"{self._key_prefix}{session_id}"
+
+    def _summary_key(self, session_id: str) -> str:
+        return f"{self._key_prefix}{session_id}:summary"
+
+    def get_history(self, session_id: str) -> list[ChatMessage]:
+        raw = self._client.lrange(self._key(session_id), 0, -1)
+        return [ChatMessage(**json.loads(item)) for item in raw]
+
+    def append_messages(self, session_id: str, messages: list[ChatMessage]) -> None:
+        if not messages:
+            return
+        key = self._key(session_id)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.rpush(key, *(message.model_dump_json() for message in messages))
+        self._finish(pipe, key)
+
+    def set_history(self, session_id: str, messages: list[ChatMessage]) -> None:
+        key = self._key(session_id)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.delete(key)
+        kept = messages[-self._max_messages :]
+        if kept:
+            pipe.rpush(key, *(message.model_dump_json() for message in kept))
+        self._finish(pipe, key)
 
     def clear(self, session_id: str) -> None:
-        self._history.pop(session_id, None)
+        self._client.delete(self._key(session_id), self._summary_key(session_id))
+
+    def get_summary(self, session_id: str) -> ConversationSummary | None:
+        raw = self._client.get(self._summary_key(session_id))
+        return ConversationSummary.model_validate_json(raw) if raw else None
+
+    def set_summary(self, session_id: str, summary: ConversationSummary) -> None:
+        self._client.set(
+            self._summary_key(session_id),
+            summary.model_dump_json(),
+            ex=self._ttl_seconds or None,
+        )
+
+    def close(self) -> None:
+        close = getattr(self._client, "close", None)
+        if callable(close):
+            close()
+
+    def _finish(self, pipe: Any, key: str) -> None:
+        pipe.ltrim(key, -self._max_messages, -1)
+        if self._ttl_seconds:
+            pipe.expire(key, self._ttl_seconds)
+            pipe.expire(f"{key}:summary", self._ttl_seconds)
+        pipe.execute()
+
+
+def create_session_store(settings: Settings) -> SessionStore:
+    """Build the session store selected by ``settings.session_store_backend``."""
+    backend = settings.session_store_backend.lower()
+    common = {
+        "max_messages": settings.session_max_messages,
+        "ttl_seconds": settings.session_ttl_seconds,
+    }
+    if backend == "memory":
+        return SessionMemory(
+            max_sessions=settings.session_max_sessions,
+            max_bytes=settings.session_max_bytes,
+            **common,
+        )
+    if backend == "sqlite":
+        logger.info("Using SQLite session store at {}", settings.session_sqlite_path)
+        return SQLiteSessionStore(settings.session_sqlite_path, **common)
+    if backend == "redis":
+        logger.info("Using Redis session store.")
+        return RedisSessionStore(settings.session_redis_url, **common)
+    raise ValueError(f"Unknown session store backend: {settings.session_store_backend}")
@@ -0,0 +1,105 @@
+"""Startup warm-up and the readiness state behind ``/api/health/ready``."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+import openai
+from loguru import logger
+
+from app.services.metrics import register_stats
+
+# Misconfiguration, an unreadable index or store, or an unreachable embedding provider.
+_STARTUP_ERRORS = (
+    RuntimeError, ValueError, OSError, sqlite3.Error, openai.OpenAIError, httpx.HTTPError
+)
+
+
+@dataclass
+class ReadinessState:
+    ready: bool = False
+    error: str | None = None
+    steps: dict[str, float] = field(default_factory=dict)
+
+    def reset(self) -> None:
+        self.ready = False
+        self.error = None
+        self.steps = {}
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.error = None
+
+    @property
+    def status(self) -> str:
+        if self.ready:
+            return "ready"
+        return "failed" if self.error else "starting"
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "steps": {name: round(seconds, 4) for name, seconds in self.steps.items()},
+        }
+
+
+READINESS = ReadinessState()
+register_stats(
+    "startup",
+    lambda: {"ready": int(READINESS.ready), "warmup_seconds": READINESS.steps.get("total", 0.0)},
+)
+
+
+@contextmanager
+def timed_step(steps: dict[str, float], name: str) -> Iterator[None]:
+    """Record how long a warm-up step took under ``steps[name]`` (seconds)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        steps[name] = time.perf_counter() - started
+
+
+def build_agent(agent_factory: Callable[[], Any], state: ReadinessState = READINESS) -> Any:
+    """Build the agent on the calling thread, before the app serves requests.
+
+    Requests share the cached agent, so building it here (rather than in a
+    worker thread racing the first request) guarantees a single instance.
+    Failures leave ``state`` in the ``failed`` status and return ``None``.
+    """
+    try:
+        with timed_step(state.steps, "build_agent"):
+            return agent_factory()
+    except _STARTUP_ERRORS as exc:
+        logger.exception("Building the agent failed: {}", exc)
+        state.error = f"{type(exc).__name__}: {exc}"
+        state.steps["total"] = state.steps["build_agent"]
+        return None
+
+
+async def warm_up(agent: Any, state: ReadinessState = READINESS) -> ReadinessState:
+    """Exercise the agent's dependencies so the first turn is not cold.
+
+    The agent's own ``warm_up`` opens the vector store and runs a throwaway
+    search. Failures leave ``state`` in the ``failed`` status with the
+    error, so readiness keeps reporting 503.
+    """
+    started = time.perf_counter()
+    try:
+        agent_warm_up = getattr(agent, "warm_up", None)
+        if agent_warm_up is not None:
+            state.steps.update(await agent_warm_up())
+        state.mark_ready()
+    except _STARTUP_ERRORS as exc:
+        logger.exception("Startup warm-up failed: {}", exc)
+        state.error = f"{type(exc).__name__}: {exc}"
+    state.steps["total"] = state.steps.get("build_agent", 0.0) + time.perf_counter() - started
+    logger.info("Startup warm-up finished ({}) in {:.2f}s", state.status, state.steps["total"])
+    return state
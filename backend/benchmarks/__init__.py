@@ -0,0 +1,7 @@
+"""Offline load and latency benchmarks for the backend.
+
+Run ``python -m benchmarks run --output results.json`` from ``backend/`` and
+``python -m benchmarks compare baseline.json results.json`` to diff two runs.
+No API keys or network access are needed: the chat model and embeddings are
+deterministic fakes with configurable latency.
+"""
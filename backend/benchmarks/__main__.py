@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+# Keep runs hermetic: in-memory Chroma/outbox, in-process sessions, no tracing.
+os.environ["CHROMA_PERSIST_DIRECTORY"] = ""
+os.environ["OUTBOX_PATH"] = ""
+os.environ["LEAD_STORE_PATH"] = ""
+os.environ["CHECKPOINT_PATH"] = ""
+os.environ["SESSION_STORE_BACKEND"] = "memory"
+os.environ["LANGSMITH_TRACING"] = "false"
+
+_LOWER_IS_BETTER = ("mean_", "p50_", "p95_", "p99_", "max_")
+_HIGHER_IS_BETTER = ("throughput_rps", "ops_per_s")
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> int:
+    from loguru import logger
+
+    from benchmarks.load import LoadConfig, run_load
+    from benchmarks.micro import run_micro
+    from benchmarks.startup import measure_imports
+    from benchmarks.vector_index import run_vector_index
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    config = LoadConfig(
+        users=args.users,
+        turns=args.turns,
+        concurrency=args.concurrency,
+        llm_latency_ms=args.llm_latency_ms,
+        llm_jitter_ms=args.llm_jitter_ms,
+        embed_latency_ms=args.embed_latency_ms,
+        corpus_size=args.corpus_size,
+    )
+    results: dict[str, Any] = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "load": asyncio.run(run_load(config)),
+    }
+    if not args.skip_micro:
+        results["micro"] = run_micro(args.iterations)
+    if not args.skip_startup:
+        results["startup"] = {"import_app": measure_imports(runs=args.import_runs)}
+    if not args.skip_vector_index:
+        results["vector_index"] = run_vector_index(documents=args.vector_documents)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+    return 0
+
+
+def _flatten(data: Any, prefix: str = "") -> Iterator[tuple[str, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key in ("meta", "config"):
+                continue
+            yield from _flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, float(data)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> tuple[list[dict], bool]:
+    """Relative change per metric; flags regressions larger than ``threshold``."""
+    before = dict(_flatten(baseline))
+    rows = []
+    regressed = False
+    for name, value in _flatten(current):
+        if name not in before:
+            continue
+        leaf = name.rsplit(".", 1)[-1]
+        if leaf.startswith(_LOWER_IS_BETTER):
+            direction = 1
+        elif leaf in _HIGHER_IS_BETTER:
+            direction = -1
+        else:
+            continue
+        old = before[name]
+        change = (value - old) / old if old else 0.0
+        worse = direction * change > threshold
+        regressed = regressed or worse
+        rows.append(
+            {"metric": name, "baseline": old, "current": value,
+             "change": round(change, 4), "regression": worse}
+        )
+    return rows, regressed
+
+
+def run_compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    rows, regressed = compare(baseline, current, args.threshold)
+    for row in rows:
+        marker = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['metric']:<55} {row['baseline']:>12.3f} -> {row['current']:>12.3f} "
+            f"({row['change']:+.1%}) {marker}"
+        )
+    return 1 if regressed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the load and micro benchmarks.")
+    run_parser.add_argument("--users", type=int, default=20)
+    run_parser.add_argument("--turns", type=int, default=5)
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    run_parser.add_argument("--llm-jitter-ms", type=float, default=20.0)
+    run_parser.add_argument("--embed-latency-ms", type=float, default=5.0)
+    run_parser.add_argument("--corpus-size", type=int, default=200)
+    run_parser.add_argument("--iterations", type=int, default=2000)
+    run_parser.add_argument("--skip-micro", action="store_true")
+    run_parser.add_argument("--import-runs", type=int, default=3)
+    run_parser.add_argument("--skip-startup", action="store_true")
+    run_parser.add_argument("--vector-documents", type=int, default=20_000)
+    run_parser.add_argument("--skip-vector-index", action="store_true")
+    run_parser.add_argument("--output", type=Path)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Diff two result files.")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Allowed relative slowdown (0.10 = 10%%)."
+    )
+    compare_parser.set_defaults(handler=run_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Deterministic stand-ins for the OpenAI chat model and embeddings."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import re
+import time
+import zlib
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_TOKEN = re.compile(r"\w+")
+
+DEFAULT_REPLIES = (
+    "We design and build fast marketing websites. Would you like a quick call?",
+    "Our SEO retainer starts at $900 per month and includes monthly reporting.",
+    "Most projects launch in four to six weeks. Can I get your email to follow up?",
+    "Yes, we handle hosting and maintenance after launch.",
+)
+
+
+def _stable_fraction(text: str) -> float:
+    return (zlib.crc32(text.encode("utf-8")) % 10_000) / 10_000
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers with a canned decision JSON after a fixed delay.
+
+    The reply and the jitter are derived from a hash of the last message, so
+    a given workload always produces the same outputs and timings.
+    """
+
+    latency_seconds: float = 0.0
+    jitter_seconds: float = 0.0
+    replies: tuple[str, ...] = DEFAULT_REPLIES
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake-chat"
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        return self | PydanticOutputParser(pydantic_object=schema)
+
+    def _respond(self, messages: list[BaseMessage]) -> tuple[float, ChatResult]:
+        prompt = str(messages[-1].content) if messages else ""
+        fraction = _stable_fraction(prompt)
+        reply = self.replies[int(fraction * len(self.replies))]
+        content = json.dumps({"reply": reply, "next_action": "none"})
+        result = ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+        return self.latency_seconds + self.jitter_seconds * fraction, result
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, result = self._respond(messages)
+        if delay:
+            time.sleep(delay)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, result = self._respond(messages)
+        if delay:
+            await asyncio.sleep(delay)
+        return result
+
+
+class FakeEmbeddings(Embeddings):
+    """Signed feature-hashing bag-of-words vectors, so related texts land close together."""
+
+    def __init__(self, *, size: int = 256, latency_seconds: float = 0.0) -> None:
+        self.size = size
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        vector = [0.0] * self.size
+        for token in _TOKEN.findall(text.lower()):
+            digest = zlib.crc32(token.encode("utf-8"))
+            vector[digest % self.size] += 1.0 if digest & 1 << 31 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class NullNotifier:
+    """Notifier that drops every message (the outbox is out of scope here)."""
+
+    async def send_embed(self, title: str, description: str, fields: dict[str, Any]) -> None:
+        return None
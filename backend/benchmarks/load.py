@@ -0,0 +1,135 @@
+"""Async load generator driving ``POST /api/chat`` in-process."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import asdict, dataclass
+
+import httpx
+from langchain_community.vectorstores import Chroma
+from langchain_core.documents import Document
+
+from app.agents.graph import AgentOrchestrator
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+from app.services.session_memory import SessionMemory
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings, NullNotifier
+from benchmarks.timing import NodeTimer, summarize, timing_nodes
+
+SERVICES = ("web design", "SEO", "hosting", "branding", "e-commerce", "copywriting")
+INDUSTRIES = ("restaurants", "law firms", "clinics", "retail", "non-profits", "startups")
+
+# One scripted conversation; each virtual user replays it in its own session.
+SCRIPT = (
+    "hi",
+    "What does your {service} package include for {industry}?",
+    "How much does {service} cost per month?",
+    "my email is user{user}@example.com",
+    "thanks",
+)
+
+
+@dataclass
+class LoadConfig:
+    users: int = 20
+    turns: int = len(SCRIPT)
+    concurrency: int = 20
+    llm_latency_ms: float = 50.0
+    llm_jitter_ms: float = 20.0
+    embed_latency_ms: float = 5.0
+    corpus_size: int = 200
+
+
+def build_corpus(size: int) -> list[Document]:
+    documents = []
+    for i in range(size):
+        service = SERVICES[i % len(SERVICES)]
+        industry = INDUSTRIES[(i // len(SERVICES)) % len(INDUSTRIES)]
+        documents.append(
+            Document(
+                page_content=(
+                    f"{service.title()} for {industry} (offer {i}). Our {service} package "
+                    f"covers discovery, delivery and reporting, starting at ${500 + 25 * i} "
+                    f"per month with a {2 + i % 6}-week onboarding."
+                ),
+                metadata={"source": f"corpus/{service.replace(' ', '-')}-{i}.md"},
+            )
+        )
+    return documents
+
+
+def build_agent(config: LoadConfig) -> AgentOrchestrator:
+    """Orchestrator wired to fakes and an in-memory Chroma corpus."""
+    embeddings = FakeEmbeddings(latency_seconds=config.embed_latency_ms / 1000)
+    store = Chroma(
+        collection_name=f"bench_{uuid.uuid4().hex[:12]}", embedding_function=embeddings
+    )
+    provider = VectorStoreProvider(embeddings=embeddings, vector_store=store)
+    provider.ingest_documents(build_corpus(config.corpus_size))
+    return AgentOrchestrator(
+        retrieval=RetrievalService(provider),
+        session_memory=SessionMemory(max_sessions=max(config.users * 2, 100)),
+        notifier=NullNotifier(),
+        llm=FakeChatModel(
+            latency_seconds=config.llm_latency_ms / 1000,
+            jitter_seconds=config.llm_jitter_ms / 1000,
+        ),
+    )
+
+
+async def run_load(config: LoadConfig, agent: AgentOrchestrator | None = None) -> dict:
+    """Replay ``SCRIPT`` for ``config.users`` sessions and summarise latencies."""
+    from app.api import routes
+    from app.main import create_app
+
+    agent = agent or build_agent(config)
+    original = routes.get_agent
+    routes.get_agent = lambda: agent
+    app = create_app()
+    semaphore = asyncio.Semaphore(config.concurrency)
+    latencies: list[float] = []
+    errors = 0
+    timer = NodeTimer()
+
+    async def user(client: httpx.AsyncClient, index: int) -> None:
+        nonlocal errors
+        session_id = f"bench-{index}"
+        service = SERVICES[index % len(SERVICES)]
+        industry = INDUSTRIES[index % len(INDUSTRIES)]
+        async with semaphore:
+            for turn in range(config.turns):
+                content = SCRIPT[turn % len(SCRIPT)].format(
+                    service=service, industry=industry, user=index
+                )
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/chat",
+                    json={"session_id": session_id, "message": {"role": "user", "content": content}},
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        with timing_nodes(timer):
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://benchmark", timeout=60.0
+            ) as client:
+                started = time.perf_counter()
+                await asyncio.gather(*(user(client, i) for i in range(config.users)))
+                elapsed = time.perf_counter() - started
+    finally:
+        routes.get_agent = original
+
+    return {
+        "config": asdict(config),
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "nodes": timer.summary(),
+    }
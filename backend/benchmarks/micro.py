@@ -0,0 +1,100 @@
+"""Micro-benchmarks for hot helpers on the per-turn path."""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+
+from langchain_core.documents import Document
+
+from app.agents.graph import AgentOrchestrator
+from app.agents.history import fingerprint
+from app.models.chat import ChatMessage, ConversationSummary
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+from app.services.session_memory import SessionMemory
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings, NullNotifier
+from benchmarks.load import build_corpus
+from benchmarks.timing import summarize
+
+
+def _measure(fn: Callable[[int], object], iterations: int) -> dict[str, float]:
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter_ns()
+        fn(i)
+        samples.append((time.perf_counter_ns() - call_started) / 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        "ops_per_s": round(iterations / elapsed, 1) if elapsed else 0.0,
+        **summarize(samples, unit="us"),
+    }
+
+
+def bench_session_memory(iterations: int, sessions: int = 1000) -> dict[str, dict[str, float]]:
+    store = SessionMemory(max_sessions=sessions * 2)
+    rng = random.Random(0)
+    turn = [
+        ChatMessage(role="user", content="How much does the SEO package cost per month?"),
+        ChatMessage(role="assistant", content="Our SEO retainer starts at $900 per month."),
+    ]
+    for index in range(sessions):
+        store.append_messages(f"s{index}", turn * 10)
+    ids = [f"s{rng.randrange(sessions)}" for _ in range(iterations)]
+    return {
+        "get_history": _measure(lambda i: store.get_history(ids[i]), iterations),
+        "append_messages": _measure(lambda i: store.append_messages(ids[i], turn), iterations),
+        "set_history": _measure(lambda i: store.set_history(ids[i], turn * 10), iterations),
+    }
+
+
+def bench_format_context(
+    iterations: int, documents: int = 5, query: str | None = None
+) -> dict[str, float]:
+    service = RetrievalService(VectorStoreProvider(embeddings=FakeEmbeddings()))
+    docs = [
+        Document(page_content=doc.page_content * 8, metadata=doc.metadata)
+        for doc in build_corpus(documents)
+    ]
+    return _measure(lambda _: service.format_context(docs, query=query), iterations)
+
+
+def bench_format_history(iterations: int, messages: int = 40) -> dict[str, float]:
+    agent = AgentOrchestrator(
+        retrieval=RetrievalService(VectorStoreProvider(embeddings=FakeEmbeddings())),
+        session_memory=SessionMemory(),
+        notifier=NullNotifier(),
+        llm=FakeChatModel(),
+    )
+    history = [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i}: tell me about web design for restaurants and pricing.",
+        }
+        for i in range(messages)
+    ]
+    older, _ = agent._history.split(history)
+    summary = ConversationSummary(
+        text="Visitor runs a restaurant, asked about web design and SEO pricing.",
+        through=fingerprint(older),
+    ).model_dump()
+    # Vary the last message so per-line token counts are not all cache hits.
+    return _measure(
+        lambda i: agent._format_history(
+            history[:-1] + [{"role": "user", "content": f"Follow-up {i}"}], summary
+        ),
+        iterations,
+    )
+
+
+def run_micro(iterations: int = 2000) -> dict:
+    return {
+        "session_memory": bench_session_memory(iterations),
+        "format_context": bench_format_context(iterations),
+        "pack_context": bench_format_context(
+            iterations, query="What does the Growth plan include for SEO?"
+        ),
+        "format_history": bench_format_history(iterations),
+    }
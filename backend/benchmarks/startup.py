@@ -0,0 +1,55 @@
+"""Cold-import cost of the application, measured in fresh interpreters."""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from benchmarks.timing import summarize
+
+_BACKEND_ROOT = Path(__file__).resolve().parent.parent
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """``(module, cumulative_us, depth)`` for every line of ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, module = match.groups()
+            rows.append((module, int(cumulative), (len(indent) - 1) // 2))
+    return rows
+
+
+def measure_imports(module: str = "app.main", runs: int = 3, top: int = 10) -> dict[str, Any]:
+    """Import ``module`` in ``runs`` fresh interpreters and summarize the wall time.
+
+    Also lists the ``top`` slowest modules up to two levels below ``module``
+    in the last run, to show where startup time goes.
+    """
+    samples: list[float] = []
+    rows: list[tuple[str, int, int]] = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=_BACKEND_ROOT,
+            check=True,
+        )
+        rows = parse_importtime(completed.stderr)
+        total = next((cumulative for name, cumulative, _ in rows if name == module), 0)
+        samples.append(total / 1000)
+    slowest = sorted(
+        (row for row in rows if row[2] <= 2 and row[0] != module),
+        key=lambda row: row[1],
+        reverse=True,
+    )[:top]
+    return {
+        **summarize(samples),
+        "slowest": [{"module": name, "ms": round(us / 1000, 1)} for name, us, _ in slowest],
+    }
@@ -0,0 +1,84 @@
+"""Latency summaries and per-graph-node timing via LangChain callbacks."""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+
+def summarize(samples: list[float], *, unit: str = "ms") -> dict[str, float]:
+    """Count, mean and tail percentiles for a list of durations in ``unit``."""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        f"mean_{unit}": round(float(values.mean()), 4),
+        f"p50_{unit}": round(float(p50), 4),
+        f"p95_{unit}": round(float(p95), 4),
+        f"p99_{unit}": round(float(p99), 4),
+        f"max_{unit}": round(float(values.max()), 4),
+    }
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Record wall-clock time spent in each LangGraph node.
+
+    A node's own run is the chain whose name equals its ``langgraph_node``
+    metadata; runnables nested inside it (the LLM, parsers) are ignored.
+    """
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: dict[UUID, tuple[str, float]] = {}
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: dict[str, Any],
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            node, at = started
+            self.samples[node].append((time.perf_counter() - at) * 1000)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {node: summarize(values) for node, values in sorted(self.samples.items())}
+
+
+_active_timer: ContextVar[NodeTimer | None] = ContextVar("benchmark_node_timer", default=None)
+register_configure_hook(_active_timer, inheritable=True)
+
+
+@contextmanager
+def timing_nodes(timer: NodeTimer) -> Iterator[NodeTimer]:
+    """Attach ``timer`` to every graph run started in this context (and its tasks)."""
+    token = _active_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _active_timer.reset(token)
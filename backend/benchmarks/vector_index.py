@@ -0,0 +1,140 @@
+"""Recall and latency of the memory-mapped vector index against Chroma."""
+
+from __future__ import annotations
+
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.retrieval.mmap_store import MmapVectorStore
+from benchmarks.fakes import FakeEmbeddings
+from benchmarks.timing import summarize
+
+
+def build_vectors(
+    documents: int, queries: int, dim: int, clusters: int = 64, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Clustered unit vectors (documents about shared topics) and nearby queries."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    corpus = centers[rng.integers(clusters, size=documents)]
+    corpus += 0.6 * rng.standard_normal((documents, dim)).astype(np.float32)
+    picks = corpus[rng.integers(documents, size=queries)]
+    probes = picks + 0.4 * rng.standard_normal((queries, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+    return corpus, probes
+
+
+def _chunk_id(doc: Document) -> str:
+    return doc.metadata["chunk_id"]
+
+
+def _recall(found: list[list[str]], truth: list[set[str]]) -> float:
+    hits = sum(len(set(ids) & expected) for ids, expected in zip(found, truth))
+    return round(hits / sum(len(expected) for expected in truth), 4)
+
+
+def _timed(search, queries: np.ndarray) -> tuple[list[list[str]], list[float]]:
+    found, samples = [], []
+    for query in queries:
+        started = time.perf_counter()
+        found.append(search(query))
+        samples.append((time.perf_counter() - started) * 1000)
+    return found, samples
+
+
+def bench_mmap(
+    corpus: np.ndarray, queries: np.ndarray, ids: list[str], documents: list[Document],
+    truth: list[set[str]], k: int, quantization: str, directory: Path,
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    store = MmapVectorStore(FakeEmbeddings(size=corpus.shape[1]), quantization=quantization)
+    store.add_vectors(ids, documents, corpus)
+    store.save(directory / quantization)
+    store = MmapVectorStore.load(directory / quantization, store.embeddings)
+    build_s = time.perf_counter() - started
+
+    found, samples = _timed(
+        lambda query: [_chunk_id(doc) for doc in store.similarity_search_by_vector(query, k=k)],
+        queries,
+    )
+    started = time.perf_counter()
+    store.search_by_vectors(queries, k=k)
+    batch_ms = (time.perf_counter() - started) * 1000
+    return {
+        "recall_at_k": _recall(found, truth),
+        "build_s": round(build_s, 3),
+        "mean_ms_per_query_batched": round(batch_ms / len(queries), 4),
+        **summarize(samples),
+    }
+
+
+def bench_chroma(
+    corpus: np.ndarray, queries: np.ndarray, ids: list[str], documents: list[Document],
+    truth: list[set[str]], k: int,
+) -> dict[str, Any]:
+    from langchain_community.vectorstores import Chroma
+
+    started = time.perf_counter()
+    store = Chroma(
+        collection_name=f"bench_{uuid.uuid4().hex[:12]}",
+        embedding_function=FakeEmbeddings(size=corpus.shape[1]),
+    )
+    collection = store._collection
+    for start in range(0, len(ids), 4096):
+        end = start + 4096
+        collection.upsert(
+            ids=ids[start:end],
+            embeddings=corpus[start:end],
+            documents=[doc.page_content for doc in documents[start:end]],
+            metadatas=[doc.metadata for doc in documents[start:end]],
+        )
+    build_s = time.perf_counter() - started
+
+    found, samples = _timed(
+        lambda query: [
+            _chunk_id(doc) for doc in store.similarity_search_by_vector(query.tolist(), k=k)
+        ],
+        queries,
+    )
+    started = time.perf_counter()
+    collection.query(query_embeddings=queries, n_results=k)
+    batch_ms = (time.perf_counter() - started) * 1000
+    store.delete_collection()
+    return {
+        "recall_at_k": _recall(found, truth),
+        "build_s": round(build_s, 3),
+        "mean_ms_per_query_batched": round(batch_ms / len(queries), 4),
+        **summarize(samples),
+    }
+
+
+def run_vector_index(
+    documents: int = 20_000, queries: int = 200, dim: int = 256, k: int = 10
+) -> dict[str, Any]:
+    """Per-query and batched search latency plus recall@k against exact search."""
+    corpus, probes = build_vectors(documents, queries, dim)
+    ids = [f"chunk-{i}" for i in range(documents)]
+    docs = [
+        Document(page_content=f"Chunk {i} of a synthetic corpus.", metadata={"chunk_id": chunk_id})
+        for i, chunk_id in enumerate(ids)
+    ]
+    exact = probes @ corpus.T
+    truth = [{ids[i] for i in np.argsort(-row)[:k]} for row in exact]
+
+    results: dict[str, Any] = {
+        "config": {"documents": documents, "queries": queries, "dim": dim, "k": k},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for quantization in ("int8", "float16", "none"):
+            results[f"mmap_{quantization}"] = bench_mmap(
+                corpus, probes, ids, docs, truth, k, quantization, Path(directory)
+            )
+    results["chroma"] = bench_chroma(corpus, probes, ids, docs, truth, k)
+    return results
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import pytest
+
+from tests.helpers import FakeDecisionModel, StaticRetrieval
+
+os.environ.setdefault("CHROMA_PERSIST_DIRECTORY", "")
+os.environ.setdefault("OUTBOX_PATH", "")
+os.environ.setdefault("LEAD_STORE_PATH", "")
+os.environ.setdefault("CHECKPOINT_PATH", "")
+os.environ.setdefault("STARTUP_WARMUP_ENABLED", "false")
+
+
+@pytest.fixture()
+def make_agent():
+    from app.agents.graph import AgentOrchestrator
+    from app.services.session_memory import SessionMemory
+
+    def factory(*replies: str, **kwargs: Any) -> AgentOrchestrator:
+        kwargs.setdefault("retrieval", StaticRetrieval())
+        kwargs.setdefault("session_memory", SessionMemory())
+        return AgentOrchestrator(
+            llm=FakeDecisionModel(messages=iter(replies)),
+            **kwargs,
+        )
+
+    return factory
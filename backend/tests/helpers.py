@@ -0,0 +1,40 @@
+"""Shared fakes for the test suite."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.output_parsers import PydanticOutputParser
+
+
+class FakeDecisionModel(GenericFakeChatModel):
+    """Fake chat model whose structured output parses streamed JSON replies."""
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        return self | PydanticOutputParser(pydantic_object=schema)
+
+
+class StaticRetrieval:
+    """Retrieval stand-in that returns a fixed set of documents."""
+
+    def __init__(self, documents: Iterable[Document] = ()) -> None:
+        self.documents = list(documents)
+        self.queries: list[str] = []
+
+    def get_context(self, query: str, *, top_k: int = 3) -> list[Document]:
+        self.queries.append(query)
+        return self.documents[:top_k]
+
+    async def aget_context(self, query: str, *, top_k: int = 3) -> list[Document]:
+        return self.get_context(query, top_k=top_k)
+
+    def format_context(self, documents: Iterable[Document], query: str | None = None) -> str:
+        return "\n\n".join(doc.page_content for doc in documents)
+
+
+def decision_json(reply: str, **fields: Any) -> str:
+    return json.dumps({"reply": reply, "next_action": "none", **fields})
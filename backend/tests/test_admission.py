@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.main import app
+from app.models.chat import ChatMessage
+from app.services.admission import AdmissionController, AdmissionRejected, SessionLocks
+from tests.helpers import decision_json
+
+
+@pytest.mark.asyncio
+async def test_controller_queues_then_rejects_when_full() -> None:
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5.0)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with controller.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert controller.stats.as_dict()["waiting"] == 1
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with controller.slot():
+            pass
+    assert rejected.value.retry_after >= 1.0
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert controller.stats.admitted == 2
+    assert controller.stats.rejected == 1
+    assert controller.stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_controller_times_out_queued_callers() -> None:
+    controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=0.01)
+
+    async with controller.slot():
+        with pytest.raises(AdmissionRejected):
+            async with controller.slot():
+                pass
+
+    assert controller.stats.timed_out == 1
+    assert controller.stats.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_session_locks_run_turns_in_arrival_order() -> None:
+    locks = SessionLocks(max_pending=2)
+    order: list[int] = []
+
+    async def turn(number: int) -> None:
+        async with locks.hold("s1"):
+            await asyncio.sleep(0.01 if number == 1 else 0)
+            order.append(number)
+
+    first = asyncio.create_task(turn(1))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(turn(2))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected):
+        locks.check("s1")
+
+    await asyncio.gather(first, second)
+    assert order == [1, 2]
+    assert locks.pending("s1") == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_turns_of_one_session_keep_both_exchanges(make_agent) -> None:
+    agent = make_agent(decision_json("First answer."), decision_json("Second answer."))
+
+    await asyncio.gather(
+        agent.run("s1", [ChatMessage(role="user", content="What do you build?")]),
+        agent.run("s1", [ChatMessage(role="user", content="What does it cost?")]),
+    )
+
+    history = [message.content for message in agent.get_history("s1")]
+    assert history == [
+        "What do you build?",
+        "First answer.",
+        "What does it cost?",
+        "Second answer.",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_chat_returns_429_with_retry_after_when_saturated(
+    make_agent, monkeypatch
+) -> None:
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    agent = make_agent(decision_json("Sure."), admission=controller)
+    monkeypatch.setattr(routes, "get_agent", lambda: agent)
+    payload = {"session_id": "busy", "message": {"role": "user", "content": "Pricing?"}}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with controller.slot():
+            response = await client.post("/api/chat", json=payload)
+            streamed = await client.post("/api/chat/stream", json=payload)
+        admitted = await client.post("/api/chat", json=payload)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert streamed.status_code == 429
+    assert admitted.status_code == 200
+    assert agent.get_history("busy")[-1].content == "Sure."
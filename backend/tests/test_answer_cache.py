@@ -0,0 +1,103 @@
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from app.agents.answer_cache import SemanticAnswerCache, is_cacheable_question
+from app.agents.graph import DecisionPayload
+from app.models.chat import ChatMessage, LeadCapture
+from tests.helpers import decision_json
+
+
+class KeywordEmbeddings(Embeddings):
+    """Bag-of-keywords embeddings so paraphrases land close together."""
+
+    vocabulary = ("services", "offer", "pricing", "cost", "hours")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        lowered = text.lower()
+        return [float(word in lowered) for word in self.vocabulary] + [0.01]
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_question_skips_llm(make_agent) -> None:
+    cache = SemanticAnswerCache(KeywordEmbeddings(), threshold=0.95)
+    agent = make_agent(decision_json("We offer web design and SEO."), answer_cache=cache)
+
+    first = await agent.run("a", [ChatMessage(role="user", content="What services do you offer?")])
+    second = await agent.run("b", [ChatMessage(role="user", content="which services do you offer")])
+
+    assert second.messages[-1].content == first.messages[-1].content
+    assert cache.stats.hits == 1
+    assert agent._retrieval.queries == ["What services do you offer?"]
+
+
+@pytest.mark.asyncio
+async def test_replies_with_lead_data_are_never_cached() -> None:
+    cache = SemanticAnswerCache(KeywordEmbeddings())
+    vector = await cache.embed("pricing")
+    payload = DecisionPayload(
+        reply="Thanks!", next_action="capture_lead", lead=LeadCapture(email="a@b.co")
+    )
+
+    assert cache.store(vector, "pricing", payload) is False
+    assert cache.lookup(vector) is None
+
+
+@pytest.mark.asyncio
+async def test_reingest_invalidates_entries() -> None:
+    version = ["1"]
+    cache = SemanticAnswerCache(KeywordEmbeddings(), index_version=lambda: version[0])
+    vector = await cache.embed("pricing")
+    cache.store(vector, "pricing", DecisionPayload(reply="Plans start at $99."))
+    assert cache.lookup(vector) is not None
+
+    version[0] = "2"
+
+    assert cache.lookup(vector) is None
+    assert cache.stats.invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl(monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr("app.agents.answer_cache.time.monotonic", lambda: clock[0])
+    cache = SemanticAnswerCache(KeywordEmbeddings(), max_entries=2, ttl_seconds=60)
+    vectors = {text: await cache.embed(text) for text in ("services", "pricing", "hours")}
+    for text, vector in vectors.items():
+        cache.store(vector, text, DecisionPayload(reply=text))
+
+    assert cache.lookup(vectors["services"]) is None
+    assert cache.lookup(vectors["hours"]).reply == "hours"
+    clock[0] = 61.0
+    assert cache.lookup(vectors["hours"]) is None
+    assert len(cache) == 0
+
+
+def test_follow_up_questions_are_not_eligible() -> None:
+    history = [
+        {"role": "user", "content": "What services do you offer?"},
+        {"role": "assistant", "content": "Web design and SEO."},
+    ]
+
+    assert is_cacheable_question(history[:1], {})
+    assert not is_cacheable_question(history + [{"role": "user", "content": "How much is it?"}], {})
+    assert is_cacheable_question(history + [{"role": "user", "content": "Pricing?"}], {})
+    assert not is_cacheable_question([{"role": "user", "content": "me@x.io"}], {})
+    assert not is_cacheable_question(history[:1], {"lead_info": {"email": "a@b.co"}})
+
+
+@pytest.mark.asyncio
+async def test_cached_reply_is_streamed_as_single_token(make_agent) -> None:
+    cache = SemanticAnswerCache(KeywordEmbeddings())
+    agent = make_agent(decision_json("Plans start at $99."), answer_cache=cache)
+    await agent.run("a", [ChatMessage(role="user", content="pricing?")])
+
+    events = [
+        event
+        async for event in agent.astream("b", [ChatMessage(role="user", content="Pricing")])
+    ]
+
+    assert events[0] == {"event": "token", "delta": "Plans start at $99."}
+    assert events[-1]["event"] == "final"
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import httpx
+import pytest
+
+from app.services.availability import (
+    AvailabilityEngine,
+    CalendlyBusySource,
+    ICSBusySource,
+    IntervalIndex,
+    parse_ics,
+)
+
+UTC = timezone.utc
+NEW_YORK = ZoneInfo("America/New_York")
+# Friday 2026-10-16 12:00 UTC (08:00 in New York).
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=UTC)
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+SUMMARY:Client workshop
+DTSTART;TZID=America/New_York:20261019T090000
+DTEND;TZID=America/New_York:20261019T120000
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Offsite
+DTSTART;VALUE=DATE:20261020
+DTEND;VALUE=DATE:20261021
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Focus time
+TRANSP:TRANSPARENT
+DTSTART:20261021T130000Z
+DTEND:20261021T200000Z
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Stand
+ up
+DTSTART:20261016T170000Z
+DTEND:20261016T173000Z
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+class CountingSource:
+    def __init__(self, intervals) -> None:
+        self.intervals = intervals
+        self.calls = 0
+
+    async def fetch(self, start, end):
+        self.calls += 1
+        return self.intervals
+
+
+def _engine(source, **kwargs) -> AvailabilityEngine:
+    kwargs.setdefault("timezone_name", "America/New_York")
+    kwargs.setdefault("min_notice_minutes", 60)
+    return AvailabilityEngine({"primary": source}, **kwargs)
+
+
+def test_interval_index_merges_and_detects_overlaps() -> None:
+    def at(hour: int, minute: int = 0) -> datetime:
+        return datetime(2026, 10, 19, hour, minute, tzinfo=UTC)
+
+    index = IntervalIndex([(at(9), at(10)), (at(9, 30), at(11)), (at(14), at(15))])
+
+    assert len(index) == 2
+    assert index.overlaps(at(10, 30), at(11, 30))
+    assert not index.overlaps(at(11), at(14))
+    assert index.overlaps(at(13), at(14, 30))
+
+
+def test_parse_ics_handles_zones_all_day_and_transparency() -> None:
+    intervals = sorted(parse_ics(ICS, NEW_YORK))
+
+    assert intervals == [
+        (datetime(2026, 10, 16, 17, 0, tzinfo=UTC), datetime(2026, 10, 16, 17, 30, tzinfo=UTC)),
+        (datetime(2026, 10, 19, 13, 0, tzinfo=UTC), datetime(2026, 10, 19, 16, 0, tzinfo=UTC)),
+        (datetime(2026, 10, 20, 4, 0, tzinfo=UTC), datetime(2026, 10, 21, 4, 0, tzinfo=UTC)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_suggestions_skip_busy_time_and_weekends_in_visitor_zone(tmp_path) -> None:
+    path = tmp_path / "calendar.ics"
+    path.write_text(ICS, encoding="utf-8")
+    engine = _engine(ICSBusySource(path, NEW_YORK))
+    busy = IntervalIndex(parse_ics(ICS, NEW_YORK))
+
+    slots = await engine.asuggest("Europe/Berlin", count=3, now=NOW)
+
+    starts = [datetime.fromisoformat(slot) for slot in slots]
+    assert len(starts) == 3
+    berlin = ZoneInfo("Europe/Berlin")
+    assert all(start.utcoffset() == start.astimezone(berlin).utcoffset() for start in starts)
+    assert len({start.date() for start in starts}) == 3
+    for start in starts:
+        local = start.astimezone(NEW_YORK)
+        assert local.weekday() < 5 and 9 <= local.hour < 17
+        assert not busy.overlaps(start, start + timedelta(minutes=30))
+        assert start >= NOW + timedelta(hours=1)
+        assert 8 <= start.hour < 20
+
+
+@pytest.mark.asyncio
+async def test_busy_intervals_are_cached_until_ttl_or_forced_refresh() -> None:
+    source = CountingSource([])
+    engine = _engine(source, ttl_seconds=600)
+
+    first = await engine.asuggest(now=NOW)
+    second = engine.suggest(now=NOW)
+    await engine.refresh(now=NOW)
+    assert source.calls == 1
+
+    await engine.refresh(force=True, now=NOW)
+    assert source.calls == 2
+    assert first == second
+    assert engine.stats.as_dict()["candidates"] > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_keeps_previous_intervals_and_booking_hides_slot() -> None:
+    source = CountingSource([])
+    engine = _engine(source)
+    first, *_ = await engine.asuggest("America/New_York", count=1, now=NOW)
+
+    async def broken(start, end):
+        raise httpx.ConnectError("calendar down")
+
+    source.fetch = broken
+    await engine.refresh(force=True, now=NOW)
+    engine.mark_busy(datetime.fromisoformat(first), now=NOW)
+
+    assert engine.stats.refresh_errors == 1
+    assert not engine.is_free(datetime.fromisoformat(first))
+    assert engine.suggest("America/New_York", count=1, now=NOW) != [first]
+
+
+@pytest.mark.asyncio
+async def test_calendly_source_pages_by_week() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "collection": [
+                    {
+                        "type": "calendly",
+                        "start_time": "2026-10-19T14:00:00.000000Z",
+                        "end_time": "2026-10-19T15:00:00.000000Z",
+                    }
+                ]
+            },
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        source = CalendlyBusySource("token", "https://api.calendly.com/users/me", client)
+        intervals = await source.fetch(NOW, NOW + timedelta(days=10))
+
+    assert len(requests) == 2
+    assert requests[0].headers["Authorization"] == "Bearer token"
+    assert requests[0].url.params["user"] == "https://api.calendly.com/users/me"
+    assert intervals[0] == (
+        datetime(2026, 10, 19, 14, 0, tzinfo=UTC),
+        datetime(2026, 10, 19, 15, 0, tzinfo=UTC),
+    )
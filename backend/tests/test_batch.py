@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from app.api import routes
+from app.main import app
+from app.models.chat import ChatMessage, ChatTurn
+from app.retrieval.embedding_cache import CachedEmbeddings
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+from tests.helpers import decision_json
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self) -> None:
+        self._inner = DeterministicFakeEmbedding(size=8)
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return self._inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls.append([text])
+        return self._inner.embed_query(text)
+
+
+def _turn(session_id: str, content: str) -> ChatTurn:
+    return ChatTurn(session_id=session_id, message=ChatMessage(role="user", content=content))
+
+
+@pytest.mark.asyncio
+async def test_run_batch_keeps_session_order_and_reports_errors(make_agent) -> None:
+    agent = make_agent(*(decision_json("Answer.") for _ in range(3)))
+    turns = [
+        _turn("s1", "What do you build?"),
+        _turn("s2", "Do you host sites?"),
+        _turn("s1", "What does it cost?"),
+        _turn("s3", ""),
+    ]
+
+    results = [result async for result in agent.run_batch(turns, concurrency=2)]
+
+    assert sorted(result.index for result in results) == [0, 1, 2, 3]
+    by_index = {result.index: result for result in results}
+    assert by_index[3].error == "Message content required."
+    assert all(by_index[i].response is not None for i in range(3))
+    history = [message.content for message in agent.get_history("s1")]
+    assert history == ["What do you build?", "Answer.", "What does it cost?", "Answer."]
+
+
+@pytest.mark.asyncio
+async def test_prime_embeddings_batches_distinct_queries() -> None:
+    underlying = CountingEmbeddings()
+    service = RetrievalService(
+        VectorStoreProvider(embeddings=CachedEmbeddings(underlying, model="fake"))
+    )
+
+    primed = await service.aprime_embeddings(["pricing", "hosting", "pricing", " "])
+    await service.embeddings().aembed_query("hosting")
+
+    assert primed == 2
+    assert underlying.calls == [["pricing", "hosting"]]
+
+
+def test_batch_endpoint_streams_ndjson(make_agent, monkeypatch) -> None:
+    agent = make_agent(decision_json("One."), decision_json("Two."))
+    monkeypatch.setattr(routes, "get_agent", lambda: agent)
+    payload = {
+        "turns": [
+            {"session_id": "b1", "message": {"role": "user", "content": "What do you build?"}},
+            {"session_id": "b2", "message": {"role": "user", "content": "Do you host sites?"}},
+        ],
+        "concurrency": 2,
+    }
+
+    with TestClient(app) as client:
+        response = client.post("/api/chat/batch", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert {line["response"]["messages"][0]["content"] for line in lines} == {"One.", "Two."}
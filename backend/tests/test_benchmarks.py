@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks.__main__ import compare
+from benchmarks.fakes import FakeEmbeddings
+from benchmarks.load import LoadConfig, run_load
+from benchmarks.micro import bench_format_history
+from benchmarks.vector_index import run_vector_index
+
+
+@pytest.mark.asyncio
+async def test_load_run_reports_throughput_and_node_latencies() -> None:
+    config = LoadConfig(users=3, concurrency=3, llm_latency_ms=0, llm_jitter_ms=0,
+                        embed_latency_ms=0, corpus_size=12)
+
+    result = await run_load(config)
+
+    assert result["requests"] == 3 * config.turns
+    assert result["errors"] == 0
+    assert result["throughput_rps"] > 0
+    assert {"route", "respond", "capture_lead"} <= result["nodes"].keys()
+    assert result["nodes"]["route"]["count"] == result["requests"]
+    assert set(result["latency"]) >= {"p50_ms", "p95_ms", "p99_ms"}
+
+
+def test_fake_embeddings_are_deterministic_and_topical() -> None:
+    embeddings = FakeEmbeddings(size=64)
+    seo, seo_again, hosting = embeddings.embed_documents(
+        ["SEO pricing for clinics", "clinics SEO pricing", "managed hosting"]
+    )
+
+    def cosine(a: list[float], b: list[float]) -> float:
+        return sum(x * y for x, y in zip(a, b))
+
+    assert embeddings.embed_query("SEO pricing for clinics") == seo
+    assert cosine(seo, seo_again) > 0.8 > cosine(seo, hosting)
+
+
+def test_micro_benchmark_and_compare() -> None:
+    baseline = {"micro": {"format_history": bench_format_history(20)}}
+    slower = {
+        "micro": {
+            "format_history": {
+                **baseline["micro"]["format_history"],
+                "p95_us": baseline["micro"]["format_history"]["p95_us"] * 2,
+            }
+        }
+    }
+
+    rows, regressed = compare(baseline, slower, threshold=0.1)
+
+    assert regressed
+    assert [row["metric"] for row in rows if row["regression"]] == ["micro.format_history.p95_us"]
+
+
+def test_vector_index_benchmark_reports_recall_for_each_backend() -> None:
+    result = run_vector_index(documents=300, queries=5, dim=32, k=5)
+
+    assert {"mmap_int8", "mmap_float16", "mmap_none", "chroma"} <= result.keys()
+    assert result["mmap_none"]["recall_at_k"] == 1.0
+    assert all(result[name]["count"] == 5 for name in ("mmap_int8", "chroma"))
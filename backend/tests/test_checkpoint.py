@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.agents.checkpoint import SQLiteCheckpointSaver
+from app.config.settings import get_settings
+from app.models.chat import ChatMessage
+from app.services.lead_tracker import LeadStore
+from tests.helpers import decision_json
+
+
+class FixedSlots:
+    async def suggest_time_slots(self, timezone: str | None = None) -> list[str]:
+        return ["2026-10-19T15:00:00", "2026-10-20T10:00:00"]
+
+
+def _count(saver: SQLiteCheckpointSaver, table: str) -> int:
+    return saver._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+@pytest.mark.asyncio
+async def test_turns_append_to_checkpoint_and_compact(make_agent) -> None:
+    saver = SQLiteCheckpointSaver("", keep=2)
+    agent = make_agent(
+        *(decision_json(f"Answer {turn}.") for turn in range(4)), checkpointer=saver
+    )
+
+    for turn in range(4):
+        await agent.run("s1", [ChatMessage(role="user", content=f"Question {turn}?")])
+
+    history = [message.content for message in agent.get_history("s1")]
+    assert history == [
+        text for turn in range(4) for text in (f"Question {turn}?", f"Answer {turn}.")
+    ]
+    assert agent._session_memory.get_history("s1") == []
+    assert _count(saver, "checkpoints") == 2
+    assert saver.stats.compacted == saver.stats.checkpoints - 2
+    # Channel values only referenced by compacted checkpoints are deleted with them.
+    assert saver.stats.blobs_reclaimed > 0
+    latest = saver.get_tuple({"configurable": {"thread_id": "s1"}})
+    assert latest.checkpoint["channel_values"]["messages"][-1]["content"] == "Answer 3."
+
+
+@pytest.mark.asyncio
+async def test_expired_threads_are_purged_while_writing_off_the_event_loop(
+    make_agent, monkeypatch
+) -> None:
+    clock = [1_000.0]
+    monkeypatch.setattr("app.agents.checkpoint.time.time", lambda: clock[0])
+    saver = SQLiteCheckpointSaver("", ttl_seconds=60, purge_interval_seconds=0)
+    offloaded: list[str] = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args, **kwargs):
+        offloaded.append(getattr(func, "__name__", ""))
+        return await to_thread(func, *args, **kwargs)
+
+    monkeypatch.setattr("app.agents.checkpoint.asyncio.to_thread", recording_to_thread)
+    agent = make_agent(decision_json("Hi."), decision_json("Hello."), checkpointer=saver)
+
+    await agent.run("old", [ChatMessage(role="user", content="Hi?")])
+    clock[0] += 120
+    await agent.run("new", [ChatMessage(role="user", content="Hello?")])
+
+    assert not saver.has_thread("old") and saver.has_thread("new")
+    assert {"get_tuple", "put"} <= set(offloaded)
+
+
+@pytest.mark.asyncio
+async def test_lead_and_meeting_state_survive_restart(make_agent, tmp_path) -> None:
+    path = tmp_path / "checkpoints.sqlite3"
+    agent = make_agent(
+        decision_json(
+            "Happy to set that up, Ada.",
+            lead={"name": "Ada", "company": "Analytical"},
+            next_action="schedule",
+        ),
+        checkpointer=SQLiteCheckpointSaver(path),
+        scheduling=FixedSlots(),
+    )
+    first = await agent.run("s1", [ChatMessage(role="user", content="Can we meet next week?")])
+    assert first.suggested_slots == ["2026-10-19T15:00:00", "2026-10-20T10:00:00"]
+
+    restarted = make_agent(
+        decision_json("Our plans start at $99 per month."),
+        checkpointer=SQLiteCheckpointSaver(path),
+        lead_store=LeadStore(""),
+    )
+    second = await restarted.run(
+        "s1", [ChatMessage(role="user", content="What does hosting cost?")]
+    )
+    state = restarted._graph.get_state({"configurable": {"thread_id": "s1"}}).values
+
+    assert second.suggested_slots == first.suggested_slots
+    assert state["lead_info"] == {"name": "Ada", "company": "Analytical"}
+    assert state["meeting_details"]["proposed_times"] == first.suggested_slots
+    assert len(restarted.get_history("s1")) == 5
+
+
+@pytest.mark.asyncio
+async def test_rolling_summary_is_saved_for_checkpointed_sessions(make_agent, monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "history_token_budget", 1)
+    monkeypatch.setattr(settings, "history_summarize_after", 2)
+    # Turn 1 leaves one aged-out message; turns 2 and 3 each fold two more.
+    agent = make_agent(
+        decision_json("Answer 0."),
+        decision_json("Answer 1."),
+        "Summary 1",
+        decision_json("Answer 2."),
+        "Summary 2",
+        checkpointer=SQLiteCheckpointSaver(""),
+    )
+
+    for turn in range(3):
+        await agent.run("s1", [ChatMessage(role="user", content=f"Question {turn}?")])
+        await agent._history.drain()
+
+    assert agent._session_memory.get_summary("s1").text == "Summary 2"
+    assert (await agent._initial_state("s1", []))["summary"]["text"] == "Summary 2"
+
+
+@pytest.mark.asyncio
+async def test_booked_meeting_keeps_later_replies_and_allows_rescheduling(make_agent) -> None:
+    class RecordingScheduler(FixedSlots):
+        def __init__(self) -> None:
+            self.booked: list[str] = []
+
+        async def schedule_meeting(self, attendee: dict, slot: str) -> str:
+            self.booked.append(slot)
+            return "https://meet.example.com/abc"
+
+    lead = {"name": "Ada", "email": "ada@example.com"}
+    monday = {"confirmed_time": "2026-10-19T15:00:00"}
+    tuesday = {"confirmed_time": "2026-10-20T10:00:00"}
+    scheduler = RecordingScheduler()
+    agent = make_agent(
+        decision_json("Booking it.", lead=lead, meeting=monday, next_action="schedule"),
+        decision_json("Bring your questions!", lead=lead, meeting=monday, next_action="schedule"),
+        decision_json("Moving it.", lead=lead, meeting=tuesday, next_action="schedule"),
+        checkpointer=SQLiteCheckpointSaver(""),
+        scheduling=scheduler,
+    )
+
+    async def turn(text: str):
+        return await agent.run("s1", [ChatMessage(role="user", content=text)])
+
+    booked = await turn("Monday 15:00 works, ada@example.com")
+    follow_up = await turn("Anything I should prepare?")
+    moved = await turn("Actually, can we do Tuesday 10:00?")
+
+    assert booked.meeting_scheduled and "scheduled the meeting" in booked.messages[-1].content
+    assert follow_up.messages[-1].content == "Bring your questions!"
+    assert "2026-10-20T10:00:00" in moved.messages[-1].content
+    assert scheduler.booked == ["2026-10-19T15:00:00", "2026-10-20T10:00:00"]
+
+
+def test_redis_sessions_do_not_use_local_checkpoints(make_agent, monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "session_store_backend", "redis")
+
+    assert make_agent()._checkpointer is None
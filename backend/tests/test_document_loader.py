@@ -0,0 +1,64 @@
+from itertools import pairwise
+
+from app.retrieval.chunking import count_tokens, split_text
+from app.retrieval.document_loader import iter_document_batches, load_file
+from app.retrieval.parsers import parse_html, parse_markdown
+
+
+def test_markdown_and_html_are_reduced_to_text() -> None:
+    markdown = "---\ntitle: x\n---\n# Pricing\n\nSee [plans](https://x.io) for **details**."
+    html = (
+        "<html><head><title>T</title><style>p{}</style></head>"
+        "<body><h1>Pricing</h1><p>Plans &amp; tiers</p><script>x()</script></body></html>"
+    )
+
+    assert parse_markdown(markdown) == "Pricing\n\nSee plans for details."
+    assert parse_html(html) == "Pricing\n\nPlans & tiers"
+
+
+def test_markdown_keeps_underscores_inside_identifiers() -> None:
+    markdown = "Call `send_lead_notification` or _retry_ with __max_tokens__ set."
+
+    assert parse_markdown(markdown) == "Call send_lead_notification or retry with max_tokens set."
+    assert parse_markdown("Set snake_case_name and some_value.") == (
+        "Set snake_case_name and some_value."
+    )
+
+
+def test_chunks_are_token_bounded_and_overlap() -> None:
+    text = " ".join(f"Sentence number {i} talks about our services." for i in range(200))
+
+    chunks = split_text(text, max_tokens=50, overlap_tokens=10)
+
+    assert len(chunks) > 10
+    assert all(chunk.tokens <= 50 for chunk in chunks)
+    assert all(text[chunk.start : chunk.end] == chunk.text for chunk in chunks)
+    for previous, following in pairwise(chunks):
+        assert following.start < previous.end
+        assert following.start > previous.start
+
+
+def test_load_file_records_source_and_offsets(tmp_path) -> None:
+    path = tmp_path / "faq.md"
+    path.write_text("# FAQ\n\n" + "\n\n".join(f"Answer {i}. " * 40 for i in range(5)))
+
+    documents = load_file(path, max_tokens=120, overlap_tokens=0)
+
+    assert len(documents) >= 5
+    assert {doc.metadata["source"] for doc in documents} == {str(path)}
+    assert [doc.metadata["chunk_index"] for doc in documents] == list(range(len(documents)))
+    assert all(count_tokens(doc.page_content) <= 120 for doc in documents)
+    assert documents[0].metadata["format"] == "markdown"
+
+
+def test_batches_stream_from_process_pool(tmp_path) -> None:
+    for i in range(6):
+        (tmp_path / f"doc{i}.html").write_text(f"<p>Document {i} body.</p>")
+    (tmp_path / "blob.bin").write_bytes(b"\x00\x01\x02")
+
+    batches = list(iter_document_batches(tmp_path, batch_size=4, max_workers=2))
+
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert [doc.page_content for batch in batches for doc in batch] == [
+        f"Document {i} body." for i in range(6)
+    ]
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from app.retrieval.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self) -> None:
+        self._inner = DeterministicFakeEmbedding(size=8)
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return self._inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls.append([text])
+        return self._inner.embed_query(text)
+
+
+def test_repeated_queries_hit_memory_tier() -> None:
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, model="fake")
+
+    first = cache.embed_query("What services do you offer?")
+    second = cache.embed_query("  what services   do you offer? ")
+
+    assert first == second
+    assert len(underlying.calls) == 1
+    assert cache.stats.as_dict()["memory_hits"] == 1
+    assert cache.stats.misses == 1
+
+
+def test_documents_only_embed_new_chunks(tmp_path) -> None:
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, model="fake", persist_path=tmp_path / "cache.db")
+
+    cache.embed_documents(["alpha", "beta"])
+    vectors = cache.embed_documents(["alpha", "gamma", "beta"])
+
+    assert underlying.calls == [["alpha", "beta"], ["gamma"]]
+    assert len(vectors) == 3
+
+
+def test_disk_tier_survives_restart(tmp_path) -> None:
+    path = tmp_path / "cache.db"
+    CachedEmbeddings(CountingEmbeddings(), model="fake", persist_path=path).embed_query("pricing?")
+
+    underlying = CountingEmbeddings()
+    restarted = CachedEmbeddings(underlying, model="fake", persist_path=path)
+    vector = restarted.embed_query("Pricing?")
+
+    assert underlying.calls == []
+    assert restarted.stats.disk_hits == 1
+    assert vector == pytest.approx(underlying._inner.embed_query("pricing?"), rel=1e-6)
+
+
+def test_ttl_and_model_are_part_of_the_key(monkeypatch) -> None:
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, model="fake", ttl_seconds=10)
+    other_model = CachedEmbeddings(underlying, model="other")
+
+    clock = [100.0]
+    monkeypatch.setattr("app.retrieval.embedding_cache.time.monotonic", lambda: clock[0])
+    cache.embed_query("hours")
+    other_model.embed_query("hours")
+    clock[0] += 11
+    cache.embed_query("hours")
+
+    assert len(underlying.calls) == 3
+
+
+def test_disk_tier_expires_and_evicts_oldest(tmp_path, monkeypatch) -> None:
+    clock = [1_000.0]
+    monkeypatch.setattr("app.retrieval.embedding_cache.time.time", lambda: clock[0])
+    path = tmp_path / "cache.db"
+    cache = CachedEmbeddings(
+        CountingEmbeddings(),
+        model="fake",
+        persist_path=path,
+        disk_max_entries=3,
+        disk_ttl_seconds=100,
+    )
+    for offset, text in enumerate(["a", "b", "c", "d"]):
+        clock[0] = 1_000.0 + offset
+        cache.embed_query(text)
+    assert len(cache._disk) == 3
+
+    underlying = CountingEmbeddings()
+    restarted = CachedEmbeddings(
+        underlying, model="fake", persist_path=path, disk_ttl_seconds=100
+    )
+    restarted.embed_documents(["a", "b"])
+    assert underlying.calls == [["a"]]
+
+    clock[0] = 1_200.0
+    later = CachedEmbeddings(
+        CountingEmbeddings(), model="fake", persist_path=path, disk_ttl_seconds=100
+    )
+    assert len(later._disk) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_use_the_disk_tier_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "cache.db"
+    CachedEmbeddings(CountingEmbeddings(), model="fake", persist_path=path).embed_query("hours")
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, model="fake", persist_path=path)
+    offloaded: list[str] = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args):
+        offloaded.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr("app.retrieval.embedding_cache.asyncio.to_thread", recording_to_thread)
+    await cache.aembed_query("Hours")
+    await cache.aembed_query("pricing")
+
+    assert underlying.calls == [["pricing"]]
+    assert offloaded == ["_disk_lookup", "_disk_lookup", "put_many"]
+    assert cache.cached(["hours", "unknown"])[1] is None
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.config.settings import get_settings
+from app.retrieval.embeddings import (
+    EmbeddingConfigMismatch,
+    HashingEmbeddings,
+    embedding_config,
+)
+from app.retrieval.ingestion import IncrementalIngestor
+from app.retrieval.vector_store import VectorStoreProvider
+
+
+def test_hashing_embeddings_are_batched_normalized_and_topical() -> None:
+    embeddings = HashingEmbeddings(features=2048, dimensions=128)
+    texts = ["SEO audits for dental clinics", "dental clinic SEO audit", "managed web hosting"]
+
+    batch = np.asarray(embeddings.embed_documents(texts))
+
+    assert batch.shape == (3, 128)
+    assert np.allclose(np.linalg.norm(batch, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(batch[1], embeddings.embed_query(texts[1]), atol=1e-6)
+    fresh = HashingEmbeddings(features=2048, dimensions=128)
+    assert np.allclose(batch[0], fresh.embed_query(texts[0]))
+    assert batch[0] @ batch[1] > 0.5 > batch[0] @ batch[2]
+
+
+@pytest.mark.asyncio
+async def test_settings_select_local_backend_without_cache(monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "embedding_backend", "hashing")
+    monkeypatch.setattr(settings, "embedding_dimensions", 64)
+
+    embeddings = VectorStoreProvider().embeddings()
+
+    assert isinstance(embeddings, HashingEmbeddings)
+    assert len(await embeddings.aembed_query("pricing")) == 64
+    assert embedding_config(settings) == {
+        "backend": "hashing",
+        "model": "hashing-ngram-v1",
+        "features": settings.embedding_hash_features,
+        "dimensions": 64,
+    }
+    monkeypatch.setattr(settings, "embedding_backend", "word2vec")
+    with pytest.raises(ValueError, match="hashing, openai"):
+        VectorStoreProvider().embeddings()
+
+
+@pytest.mark.asyncio
+async def test_index_built_with_other_embedding_config_is_rejected(tmp_path, monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "index"))
+    monkeypatch.setattr(settings, "vector_store_backend", "mmap")
+    monkeypatch.setattr(settings, "embedding_backend", "hashing")
+    monkeypatch.setattr(settings, "embedding_dimensions", 64)
+    data_dir = tmp_path / "docs"
+    data_dir.mkdir()
+    (data_dir / "hosting.md").write_text("Managed hosting with daily backups and a CDN.")
+    await IncrementalIngestor(VectorStoreProvider(), max_workers=0).run(data_dir)
+    assert len(VectorStoreProvider().retriever()) == 1
+
+    monkeypatch.setattr(settings, "embedding_dimensions", 128)
+    provider = VectorStoreProvider()
+
+    with pytest.raises(EmbeddingConfigMismatch, match="'dimensions': 64"):
+        provider.retriever()
@@ -1,7 +1,18 @@
+import asyncio
+import sqlite3
+
 import pytest
 from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
 
+from app.api import routes
+from app.config.settings import get_settings
 from app.main import app
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+from app.services.warmup import ReadinessState, build_agent
 
 
 @pytest.fixture()
@@ -14,3 +25,82 @@ def test_health_endpoint(client: TestClient) -> None:
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
+
+
+def test_liveness_and_readiness_without_warmup(client: TestClient) -> None:
+    with client:
+        live = client.get("/api/health/live")
+        ready = client.get("/api/health/ready")
+
+    assert live.json() == {"status": "ok"}
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+
+
+def test_blocking_warmup_builds_agent_before_ready(make_agent, monkeypatch) -> None:
+    agent = make_agent()
+    monkeypatch.setattr(routes, "get_agent", lambda: agent)
+    monkeypatch.setattr(get_settings(), "startup_warmup_enabled", True)
+    monkeypatch.setattr(get_settings(), "startup_warmup_blocking", True)
+
+    with TestClient(app) as client:
+        response = client.get("/api/health/ready")
+
+    body = response.json()
+    assert response.status_code == 200
+    assert {"build_agent", "tokenizer", "total"} <= body["steps"].keys()
+
+
+def test_agent_is_built_once_before_serving_and_closed_on_shutdown(
+    make_agent, monkeypatch
+) -> None:
+    agent = make_agent()
+    built: list[asyncio.AbstractEventLoop] = []
+    closed: list[str] = []
+    aclose = agent.aclose
+
+    def factory():
+        # On the event loop thread, not in a worker thread racing the first request.
+        built.append(asyncio.get_running_loop())
+        return agent
+
+    async def recording_aclose() -> None:
+        closed.append("agent")
+        await aclose()
+
+    monkeypatch.setattr(agent, "aclose", recording_aclose)
+    monkeypatch.setattr(routes, "get_agent", factory)
+    monkeypatch.setattr(get_settings(), "startup_warmup_enabled", True)
+    monkeypatch.setattr(get_settings(), "startup_warmup_blocking", False)
+
+    with TestClient(app) as client:
+        assert built and client.get("/api/health/live").status_code == 200
+
+    assert len(built) == 1
+    assert closed == ["agent"]
+    with pytest.raises(sqlite3.ProgrammingError):
+        agent._leads.find(session_id="s1")
+
+
+def test_failed_agent_build_reports_not_ready() -> None:
+    def broken_factory():
+        raise RuntimeError("OPENAI_API_KEY must be configured.")
+
+    state = ReadinessState()
+
+    assert build_agent(broken_factory, state) is None
+    assert not state.ready
+    assert state.as_dict()["status"] == "failed"
+    assert "OPENAI_API_KEY" in state.error
+
+
+@pytest.mark.asyncio
+async def test_retrieval_warmup_opens_store_and_searches() -> None:
+    embeddings = DeterministicFakeEmbedding(size=8)
+    store = InMemoryVectorStore(embedding=embeddings)
+    store.add_documents([Document(page_content="We build websites.")])
+    service = RetrievalService(VectorStoreProvider(embeddings=embeddings, vector_store=store))
+
+    steps = await service.awarm_up()
+
+    assert {"lexical_index", "vector_store", "similarity_search"} <= steps.keys()
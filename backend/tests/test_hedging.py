@@ -0,0 +1,133 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.agents.graph import BUDGET_EXHAUSTED_REPLY, LLM_ERROR_REPLY, AgentOrchestrator
+from app.agents.hedging import HedgedInvoker, LatencyTracker
+from app.config.settings import get_settings
+from app.models.chat import ChatMessage
+from app.services.admission import AdmissionController
+from app.services.session_memory import SessionMemory
+from tests.helpers import FakeDecisionModel, StaticRetrieval, decision_json
+
+
+class SlowDecisionModel(FakeDecisionModel):
+    """Fake model that waits ``delay`` seconds before answering, or fails."""
+
+    delay: float = 0.0
+    fail: bool = False
+
+    async def _wait(self) -> None:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider unavailable")
+
+    async def _agenerate(self, *args: Any, **kwargs: Any):
+        await self._wait()
+        return self._generate(*args, **kwargs)
+
+    async def _astream(self, *args: Any, **kwargs: Any):
+        await self._wait()
+        for chunk in self._stream(*args, **kwargs):
+            yield chunk
+
+
+def _model(reply: str, **kwargs: Any) -> SlowDecisionModel:
+    return SlowDecisionModel(messages=iter([decision_json(reply)]), **kwargs)
+
+
+def test_tracker_reports_nearest_rank_percentile_once_warm() -> None:
+    tracker = LatencyTracker(window=10, min_samples=5)
+    for seconds in (0.4, 0.1, 0.3):
+        tracker.record(seconds)
+    assert tracker.percentile(95) is None
+
+    for seconds in (0.2, 0.5, 1.0):
+        tracker.record(seconds)
+    assert tracker.percentile(50) == 0.3
+    assert tracker.percentile(95) == 1.0
+    assert HedgedInvoker(_model("x"), tracker=tracker, min_delay=2.0).hedge_delay() == 2.0
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_when_primary_is_slow() -> None:
+    invoker = HedgedInvoker(
+        _model("slow", delay=5.0), _model("fast"), min_delay=0.05, initial_delay=0.05
+    )
+
+    result = await asyncio.wait_for(invoker.ainvoke("hi"), timeout=2.0)
+
+    assert result.outcome == "hedge"
+    assert "fast" in result.value.content
+    # The cancelled primary is not a latency sample.
+    assert len(invoker.tracker) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("max_concurrency", "outcome"), [(2, "hedge"), (1, "primary")])
+async def test_hedge_needs_its_own_admission_slot(max_concurrency: int, outcome: str) -> None:
+    admission = AdmissionController(max_concurrency=max_concurrency)
+    invoker = HedgedInvoker(
+        _model("slow", delay=0.3),
+        _model("fast"),
+        min_delay=0.05,
+        initial_delay=0.05,
+        admission=admission,
+    )
+
+    async with admission.slot():
+        result = await asyncio.wait_for(invoker.ainvoke("hi"), timeout=2.0)
+
+    assert result.outcome == outcome
+    assert len(invoker.tracker) == (0 if outcome == "hedge" else 1)
+    assert admission.stats.admitted == (2 if outcome == "hedge" else 1)
+    assert admission.stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_fallback_runs_immediately_when_primary_fails() -> None:
+    invoker = HedgedInvoker(_model("broken", fail=True), _model("backup"), initial_delay=30.0)
+
+    result = await asyncio.wait_for(invoker.ainvoke("hi"), timeout=2.0)
+
+    assert result.outcome == "fallback"
+    assert "backup" in result.value.content
+    assert len(invoker.tracker) == 0
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_returns_canned_reply(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "turn_latency_budget_seconds", 0.1)
+    monkeypatch.setattr(get_settings(), "llm_hedge_enabled", True)
+    agent = AgentOrchestrator(
+        retrieval=StaticRetrieval(),
+        session_memory=SessionMemory(),
+        llm=_model("too late", delay=5.0),
+        fallback_llm=_model("also too late", delay=5.0),
+    )
+    messages = [ChatMessage(role="user", content="Which industries do you work with?")]
+
+    response = await asyncio.wait_for(agent.run("budget", messages), timeout=3.0)
+    events = [event async for event in agent.astream("budget-stream", messages)]
+
+    assert response.messages[-1].content == BUDGET_EXHAUSTED_REPLY
+    tokens = "".join(event["delta"] for event in events if event["event"] == "token")
+    assert tokens == BUDGET_EXHAUSTED_REPLY
+    assert events[-1]["data"].messages[-1].content == BUDGET_EXHAUSTED_REPLY
+
+
+@pytest.mark.asyncio
+async def test_failed_attempts_get_an_error_reply(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "llm_hedge_enabled", True)
+    agent = AgentOrchestrator(
+        retrieval=StaticRetrieval(),
+        session_memory=SessionMemory(),
+        llm=_model("broken", fail=True),
+        fallback_llm=_model("also broken", fail=True),
+    )
+    messages = [ChatMessage(role="user", content="Which industries do you work with?")]
+
+    response = await asyncio.wait_for(agent.run("errors", messages), timeout=3.0)
+
+    assert response.messages[-1].content == LLM_ERROR_REPLY
@@ -0,0 +1,118 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from pydantic import Field
+
+from app.agents.history import ConversationHistory, fingerprint
+from app.models.chat import ChatMessage, ConversationSummary
+from app.retrieval.chunking import count_tokens
+from app.services.admission import AdmissionController
+from app.services.session_memory import SessionMemory
+
+
+class RecordingModel(GenericFakeChatModel):
+    prompts: list[str] = Field(default_factory=list)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(messages[-1].content)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def _turn(store: SessionMemory, session_id: str, i: int) -> None:
+    store.append_messages(
+        session_id,
+        [
+            ChatMessage(role="user", content=f"Question {i} about our web design services?"),
+            ChatMessage(role="assistant", content=f"Answer {i}: we build fast websites."),
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_prompt_size_stays_flat_as_conversation_grows() -> None:
+    store = SessionMemory()
+    llm = RecordingModel(messages=iter(f"Summary v{i}" for i in range(100)), prompts=[])
+    history = ConversationHistory(llm, store, token_budget=60, summarize_after=4)
+
+    sizes = []
+    for i in range(20):
+        _turn(store, "s", i)
+        history.schedule_refresh("s")
+        await history.drain()
+        messages = [m.model_dump() for m in store.get_history("s")]
+        summary = store.get_summary("s")
+        sizes.append(count_tokens(history.render(messages, summary)))
+
+    # Up to ``summarize_after - 1`` aged-out messages wait verbatim for the next refresh.
+    assert max(sizes[5:]) - min(sizes[5:]) < 40
+    assert max(sizes) < 60 + 40
+    assert store.get_summary("s").text.startswith("Summary v")
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_folds_new_messages() -> None:
+    store = SessionMemory()
+    llm = RecordingModel(messages=iter(["first summary", "second summary"]), prompts=[])
+    history = ConversationHistory(llm, store, token_budget=30, summarize_after=2)
+    for i in range(4):
+        _turn(store, "s", i)
+    await history.refresh("s")
+
+    for i in range(4, 6):
+        _turn(store, "s", i)
+    summary = await history.refresh("s")
+
+    assert summary.text == "second summary"
+    assert "first summary" in llm.prompts[1]
+    assert "Question 0" not in llm.prompts[1]
+    assert "Question 3" in llm.prompts[1]
+
+
+@pytest.mark.asyncio
+async def test_aged_out_messages_stay_in_the_prompt_until_summarized() -> None:
+    store = SessionMemory()
+    llm = RecordingModel(messages=iter(["Visitor asked about 0."]), prompts=[])
+    history = ConversationHistory(llm, store, token_budget=30, summarize_after=2)
+    for i in range(2):
+        _turn(store, "s", i)
+    summary = await history.refresh("s")
+
+    _turn(store, "s", 2)
+    messages = [m.model_dump() for m in store.get_history("s")]
+    between = history.render(messages, summary)
+
+    older, _ = history.split(messages)
+    assert [m["content"].split(" ")[1] for m in older] == ["0", "0:", "1", "1:"]
+    assert between.startswith("Summary of earlier conversation: Visitor asked about 0.")
+    assert "Question 0" not in between
+    assert "Question 1" in between and "Answer 1" in between
+
+
+def test_recent_messages_fit_budget_and_last_is_always_kept() -> None:
+    llm = GenericFakeChatModel(messages=iter([]))
+    history = ConversationHistory(llm, SessionMemory(), token_budget=5)
+    messages = [{"role": "user", "content": "word " * 50}]
+
+    older, recent = history.split(messages)
+
+    assert older == [] and recent == messages
+    folded = ConversationSummary(text="earlier", through=fingerprint(messages))
+    assert history.render(messages + messages, folded).startswith("Summary of earlier")
+
+
+@pytest.mark.asyncio
+async def test_refresh_waits_for_a_free_admission_slot() -> None:
+    store = SessionMemory()
+    admission = AdmissionController(max_concurrency=1)
+    llm = RecordingModel(messages=iter(["summary"]), prompts=[])
+    history = ConversationHistory(
+        llm, store, token_budget=30, summarize_after=2, admission=admission
+    )
+    for i in range(4):
+        _turn(store, "s", i)
+
+    async with admission.slot():
+        assert await history.refresh("s") is None
+    summary = await history.refresh("s")
+
+    assert len(llm.prompts) == 1 and summary.text == "summary"
+    assert admission.stats.admitted == 2
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.config.settings import get_settings
+from app.services.discord import DiscordNotifier
+from app.services.http_client import request_with_retries, retry_after_seconds
+
+
+class StubServer(ThreadingHTTPServer):
+    """Local HTTP server that replays scripted ``(status, headers, body)`` responses."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.script: list[tuple[int, dict[str, str], dict]] = []
+        self.requests: list[tuple[str, dict]] = []
+        self.client_ports: list[int] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubServer
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests.append((self.path, body))
+        self.server.client_ports.append(self.client_address[1])
+        status, headers, payload = (
+            self.server.script.pop(0) if self.server.script else (204, {}, {})
+        )
+        data = json.dumps(payload).encode("utf-8") if payload else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubServer]:
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "http_retry_backoff_seconds", 0.01)
+    monkeypatch.setattr(settings, "http_retry_backoff_max_seconds", 0.02)
+    monkeypatch.setattr(settings, "http_retry_after_max_seconds", 0.05)
+
+
+def test_retry_after_header_and_discord_body() -> None:
+    request = httpx.Request("POST", "http://example.test")
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "2"}, request=request)) == 2.0
+    assert retry_after_seconds(httpx.Response(429, json={"retry_after": 0.25}, request=request)) == 0.25
+    assert retry_after_seconds(httpx.Response(503, request=request)) is None
+
+
+@pytest.mark.asyncio
+async def test_retries_429_then_succeeds_on_one_connection(stub_server: StubServer) -> None:
+    stub_server.script = [
+        (429, {"Retry-After": "0.01"}, {"message": "rate limited"}),
+        (429, {}, {"retry_after": 0.01, "global": False}),
+        (200, {}, {"ok": True}),
+    ]
+    async with httpx.AsyncClient() as client:
+        response = await request_with_retries(
+            "POST", f"{stub_server.url}/hook", client=client, json={"n": 1}
+        )
+
+    assert response.status_code == 200
+    assert len(stub_server.requests) == 3
+    assert len(set(stub_server.client_ports)) == 1
+
+
+@pytest.mark.asyncio
+async def test_returns_last_response_when_retries_exhausted(stub_server: StubServer) -> None:
+    stub_server.script = [(503, {}, {}), (503, {}, {})]
+    async with httpx.AsyncClient() as client:
+        response = await request_with_retries(
+            "GET", f"{stub_server.url}/hook", client=client, attempts=2
+        )
+
+    assert response.status_code == 503
+    assert len(stub_server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_once_the_request_was_sent(stub_server: StubServer) -> None:
+    stub_server.script = [(503, {}, {}), (200, {}, {"ok": True})]
+    attempts: list[str] = []
+
+    def timing_out(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.method)
+        if request.method == "POST":
+            raise httpx.ReadTimeout("no response", request=request)
+        raise httpx.ConnectError("refused", request=request)
+
+    async with httpx.AsyncClient() as client:
+        response = await request_with_retries("POST", f"{stub_server.url}/hook", client=client)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(timing_out)) as client:
+        with pytest.raises(httpx.ReadTimeout):
+            await request_with_retries("POST", "http://calendly.test/events", client=client)
+        with pytest.raises(httpx.ConnectError):
+            await request_with_retries("PUT", "http://calendly.test/events", client=client)
+
+    assert response.status_code == 503
+    assert len(stub_server.requests) == 1
+    assert attempts == ["POST"] + ["PUT"] * get_settings().http_retry_attempts
+
+
+@pytest.mark.asyncio
+async def test_discord_notifier_reuses_pooled_connection(
+    stub_server: StubServer, monkeypatch
+) -> None:
+    monkeypatch.setattr(get_settings(), "discord_webhook_url", f"{stub_server.url}/webhook")
+    async with httpx.AsyncClient() as client:
+        notifier = DiscordNotifier(client=client)
+        await notifier.send_embed("Lead", "first", {"Name": "Ada"})
+        await notifier.send_embed("Lead", "second", {"Name": "Grace"})
+
+    assert [path for path, _ in stub_server.requests] == ["/webhook", "/webhook"]
+    assert stub_server.requests[1][1]["embeds"][0]["description"] == "second"
+    assert len(set(stub_server.client_ports)) == 1
@@ -0,0 +1,127 @@
+import asyncio
+import os
+
+import pytest
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+from pydantic import Field
+
+from app.retrieval import document_loader
+from app.retrieval.ingestion import IncrementalIngestor
+from app.retrieval.vector_store import VectorStoreProvider
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    embedded: list[str] = Field(default_factory=list)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        await asyncio.sleep(0)
+        return self.embed_documents(texts)
+
+
+@pytest.fixture(params=["memory", "chroma"])
+def setup(request, tmp_path):
+    data_dir = tmp_path / "docs"
+    data_dir.mkdir()
+    embeddings = CountingEmbeddings(size=8, embedded=[])
+    if request.param == "chroma":
+        store = Chroma(collection_name=f"test_{tmp_path.name}", embedding_function=embeddings)
+    else:
+        store = InMemoryVectorStore(embedding=embeddings)
+    provider = VectorStoreProvider(embeddings=embeddings, vector_store=store)
+
+    def ingestor() -> IncrementalIngestor:
+        return IncrementalIngestor(
+            provider, manifest_path=tmp_path / "manifest.json", max_workers=0
+        )
+
+    return data_dir, embeddings, store, provider, ingestor
+
+
+@pytest.mark.asyncio
+async def test_reingest_only_embeds_changes(setup) -> None:
+    data_dir, embeddings, store, provider, ingestor = setup
+    (data_dir / "pricing.md").write_text("Plans start at $99.")
+    (data_dir / "about.md").write_text("We build websites.")
+    (data_dir / "old.md").write_text("Legacy offer.")
+
+    first = await ingestor().run(data_dir)
+    assert first.as_dict() == {
+        "added": 3, "updated": 0, "deleted": 0, "skipped": 0,
+        "chunks_embedded": 3, "chunks_deleted": 0, "failed": 0,
+    }
+    version = provider.index_version()
+
+    (data_dir / "pricing.md").write_text("Plans start at $149.")
+    (data_dir / "old.md").unlink()
+    (data_dir / "faq.md").write_text("We reply within a day.")
+    touched = data_dir / "about.md"
+    os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns + 10_000))
+    embeddings.embedded.clear()
+
+    second = await ingestor().run(data_dir)
+
+    assert (second.added, second.updated, second.deleted, second.skipped) == (1, 1, 1, 1)
+    assert sorted(embeddings.embedded) == ["Plans start at $149.", "We reply within a day."]
+    contents = sorted(doc.page_content for doc in store.similarity_search("plans", k=10))
+    assert contents == ["Plans start at $149.", "We build websites.", "We reply within a day."]
+    assert provider.index_version() != version
+
+
+@pytest.mark.asyncio
+async def test_unchanged_tree_is_a_no_op(setup) -> None:
+    data_dir, embeddings, store, provider, ingestor = setup
+    (data_dir / "about.md").write_text("We build websites.")
+    await ingestor().run(data_dir)
+    embeddings.embedded.clear()
+    version = provider.index_version()
+
+    report = await ingestor().run(data_dir)
+
+    assert report.skipped == 1 and not report.changed
+    assert embeddings.embedded == []
+    assert provider.index_version() == version
+    assert len(store.similarity_search("websites", k=10)) == 1
+
+
+@pytest.mark.asyncio
+async def test_dry_run_writes_nothing(setup, tmp_path) -> None:
+    data_dir, embeddings, store, _, ingestor = setup
+    (data_dir / "about.md").write_text("We build websites.")
+
+    report = await ingestor().run(data_dir, dry_run=True)
+
+    assert report.added == 1
+    assert embeddings.embedded == []
+    assert store.similarity_search("websites") == []
+    assert not (tmp_path / "manifest.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_parse_keeps_previous_chunks_and_retries(setup, monkeypatch) -> None:
+    data_dir, _, store, _, ingestor = setup
+    (data_dir / "about.md").write_text("We build websites.")
+    await ingestor().run(data_dir)
+    (data_dir / "about.md").write_text("We build fast websites.")
+    extract_text = document_loader.extract_text
+
+    def broken(path):
+        raise ValueError(f"cannot parse {path.name}")
+
+    monkeypatch.setattr(document_loader, "extract_text", broken)
+    report = await ingestor().run(data_dir)
+
+    assert (report.failed, report.updated, report.chunks_deleted) == (1, 0, 0)
+    assert [doc.page_content for doc in store.similarity_search("websites", k=10)] == [
+        "We build websites."
+    ]
+
+    monkeypatch.setattr(document_loader, "extract_text", extract_text)
+    retried = await ingestor().run(data_dir)
+
+    assert (retried.failed, retried.updated, retried.chunks_deleted) == (0, 1, 1)
+    assert [doc.page_content for doc in store.similarity_search("websites", k=10)] == [
+        "We build fast websites."
+    ]
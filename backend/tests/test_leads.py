@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any
+
+import pytest
+
+from app.models.chat import ChatMessage
+from app.services.lead_tracker import LeadStore
+from tests.helpers import decision_json
+
+
+class RecordingNotifier:
+    def __init__(self) -> None:
+        self.sent: list[dict[str, Any]] = []
+
+    async def send_embed(self, title: str, description: str, fields: dict[str, Any]) -> None:
+        self.sent.append({"title": title, **fields})
+
+
+class RecordingScheduler:
+    def __init__(self) -> None:
+        self.booked: list[tuple[str, str]] = []
+
+    async def schedule_meeting(self, attendee: dict[str, Any], slot: str) -> str:
+        self.booked.append((attendee["email"], slot))
+        return "https://meet.example.com/abc"
+
+
+def test_partial_fields_merge_and_notification_is_claimed_once() -> None:
+    store = LeadStore("")
+
+    first = store.upsert("s1", {"name": "Ada", "company": ""})
+    second = store.upsert("s1", {"email": "Ada@Example.com", "company": "Analytical"})
+    repeat = store.upsert("s2", {"email": "ada@example.com", "phone": "+1 (555) 010-9999"})
+
+    assert (first.created, first.notify) == (True, False)
+    assert second.notify and not repeat.notify
+    assert repeat.lead.lead_id == first.lead.lead_id
+    assert repeat.lead.fields == {
+        "name": "Ada",
+        "email": "ada@example.com",
+        "company": "Analytical",
+        "phone": "+1 (555) 010-9999",
+    }
+    assert store.find(session_id="s2").lead_id == first.lead.lead_id
+    assert store.find(phone="+15550109999").lead_id == first.lead.lead_id
+    assert store.stats.as_dict()["notifications"] == 1
+
+
+def test_store_survives_restart_and_exports(tmp_path) -> None:
+    path = tmp_path / "leads.sqlite3"
+    store = LeadStore(path)
+    store.upsert("s1", {"name": "Ada", "email": "ada@example.com"})
+    store.upsert("s2", {"name": "Grace", "phone": "555 0100 200"})
+    store.close()
+
+    reopened = LeadStore(path)
+    assert not reopened.upsert("s9", {"email": "ada@example.com"}).notify
+    rows = list(csv.DictReader(io.StringIO("".join(reopened.iter_export("csv")))))
+    lines = [json.loads(line) for line in reopened.iter_export("ndjson")]
+
+    assert [row["name"] for row in rows] == ["Ada", "Grace"]
+    assert rows[0]["sessions"].split() == ["s1", "s9"]
+    assert rows[0]["notified_at"] and not rows[1]["notified_at"]
+    assert lines[1]["phone"] == "555 0100 200"
+
+
+@pytest.mark.asyncio
+async def test_repeated_capture_and_booking_notify_once(make_agent) -> None:
+    notifier = RecordingNotifier()
+    scheduler = RecordingScheduler()
+    lead = {"name": "Ada", "email": "ada@example.com"}
+    meeting = {"confirmed_time": "2026-10-19T15:00:00"}
+    agent = make_agent(
+        decision_json("Thanks Ada!", lead=lead, next_action="capture_lead"),
+        decision_json("Noted again.", lead=lead, next_action="capture_lead"),
+        decision_json("Booked.", lead=lead, meeting=meeting, next_action="schedule"),
+        decision_json("See you then.", lead=lead, meeting=meeting, next_action="schedule"),
+        decision_json("Booked.", lead=lead, meeting=meeting, next_action="schedule"),
+        notifier=notifier,
+        scheduling=scheduler,
+    )
+
+    async def turn(session_id: str, text: str):
+        return await agent.run(session_id, [ChatMessage(role="user", content=text)])
+
+    await turn("s1", "I'm Ada, ada@example.com, tell me about pricing")
+    again = await turn("s1", "As I said, ada@example.com, what about hosting")
+    await turn("s2", "Book me for Monday 15:00, ada@example.com")
+    repeat = await turn("s2", "So we're set for Monday 15:00?")
+    duplicate = await turn("s3", "Please book Monday 15:00 for ada@example.com")
+
+    assert again.lead_captured is True
+    assert [sent["title"] for sent in notifier.sent] == ["New Website Lead", "Meeting Scheduled"]
+    assert scheduler.booked == [("ada@example.com", "2026-10-19T15:00:00")]
+    assert repeat.messages[-1].content == "See you then." and repeat.meeting_scheduled
+    assert "already booked" in duplicate.messages[-1].content
+    assert agent._leads.stats.as_dict()["leads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_merged_lead_details_are_not_shown_to_another_session(make_agent) -> None:
+    alice = {"name": "Alice", "email": "alice@example.com", "phone": "+1 555 123 4567"}
+    agent = make_agent(
+        decision_json("Thanks Alice!", lead=alice, next_action="capture_lead"),
+        decision_json("Thanks!", lead={"email": "alice@example.com"}, next_action="capture_lead"),
+        decision_json("Anything else?"),
+        notifier=RecordingNotifier(),
+    )
+    await agent.run("a", [ChatMessage(role="user", content="I'm Alice, alice@example.com")])
+
+    events = [
+        event
+        async for event in agent.astream(
+            "b", [ChatMessage(role="user", content="Reach me at alice@example.com")]
+        )
+    ]
+    await agent.run("b", [ChatMessage(role="user", content="What do you offer?")])
+
+    final = events[-1]["data"]
+    assert final.lead.email == "alice@example.com"
+    assert final.lead.name is None and final.lead.phone is None
+    assert agent._leads.session_fields("b") == {"email": "alice@example.com"}
+    assert agent._leads.find(session_id="b").fields["phone"] == "+1 555 123 4567"
+    assert "Alice" not in str(agent._graph.get_state({"configurable": {"thread_id": "b"}}).values)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from app.config.settings import get_settings
+from app.retrieval.fusion import reciprocal_rank_fusion
+from app.retrieval.ingestion import IncrementalIngestor
+from app.retrieval.lexical import BM25Index, tokenize
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+
+CORPUS = {
+    "growth": "The Growth plan includes SEO audits and monthly reporting.",
+    "starter": "The Starter plan covers a five page website.",
+    "sku": "Hosting add-on SKU HX-4410 adds a CDN and daily backups.",
+    "about": "We are a small studio building websites for local businesses.",
+}
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    queries: int = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.queries += 1
+        return self.embed_query(text)
+
+
+def _index() -> BM25Index:
+    index = BM25Index()
+    index.upsert(
+        CORPUS,
+        [Document(page_content=text, metadata={"chunk_id": key}) for key, text in CORPUS.items()],
+    )
+    return index
+
+
+def test_tokenize_drops_stopwords_and_splits_skus() -> None:
+    assert tokenize("What is SKU HX-4410?") == ["sku", "hx", "4410"]
+
+
+def test_bm25_ranks_exact_terms_and_tracks_deletes() -> None:
+    index = _index()
+
+    hits = index.search("hx-4410 backups", k=2)
+    assert hits[0][0].metadata["chunk_id"] == "sku"
+    assert hits[0][1] > 0.8
+    assert [doc.metadata["chunk_id"] for doc, _ in index.search("plan", k=5)] == [
+        "starter",
+        "growth",
+    ]
+
+    index.delete(["sku"])
+    assert index.search("hx-4410") == []
+    assert len(index) == 3
+
+
+def test_saved_index_is_memory_mapped(tmp_path) -> None:
+    index = _index()
+    index.save(tmp_path / "lexical")
+
+    loaded = BM25Index.load(tmp_path / "lexical")
+
+    assert isinstance(loaded._snapshot().post_docs, np.memmap)
+    assert [(d.page_content, round(s, 5)) for d, s in loaded.search("growth seo")] == [
+        (d.page_content, round(s, 5)) for d, s in index.search("growth seo")
+    ]
+    loaded.upsert(["new"], [Document(page_content="Growth retainer pricing.")])
+    assert len(loaded) == 5
+    assert BM25Index.load(tmp_path / "lexical").search("retainer") == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    a, b, c = (Document(page_content=t, metadata={"chunk_id": t}) for t in "abc")
+
+    fused = reciprocal_rank_fusion([[a, b, c], [b, c]], top_k=2)
+
+    assert [doc.page_content for doc in fused] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_ingestion_keeps_lexical_index_in_sync(tmp_path) -> None:
+    data_dir = tmp_path / "docs"
+    data_dir.mkdir()
+    embeddings = DeterministicFakeEmbedding(size=8)
+    provider = VectorStoreProvider(
+        embeddings=embeddings, vector_store=InMemoryVectorStore(embedding=embeddings)
+    )
+    ingestor = IncrementalIngestor(provider, manifest_path=tmp_path / "m.json", max_workers=0)
+    (data_dir / "sku.md").write_text(CORPUS["sku"])
+    (data_dir / "about.md").write_text(CORPUS["about"])
+    await ingestor.run(data_dir)
+    assert len(provider.lexical_index()) == 2
+
+    (data_dir / "sku.md").unlink()
+    await ingestor.run(data_dir)
+
+    assert provider.lexical_index().search("hx-4410") == []
+    assert len(provider.lexical_index()) == 1
+
+
+@pytest.mark.asyncio
+async def test_confident_lexical_match_skips_embedding(monkeypatch) -> None:
+    embeddings = CountingEmbeddings(size=8)
+    store = InMemoryVectorStore(embedding=embeddings)
+    provider = VectorStoreProvider(embeddings=embeddings, vector_store=store)
+    docs = [Document(page_content=text, metadata={"chunk_id": key}) for key, text in CORPUS.items()]
+    provider.upsert_embedded(list(CORPUS), docs, embeddings.embed_documents(list(CORPUS.values())))
+    retrieval = RetrievalService(provider)
+
+    exact = await retrieval.aget_context("HX-4410 hosting add-on", top_k=2)
+    assert exact[0].metadata["chunk_id"] == "sku"
+    assert embeddings.queries == 0
+
+    fuzzy = await retrieval.aget_context("Do you make sites for bakeries?", top_k=2)
+    assert embeddings.queries == 1
+    assert len(fuzzy) == 2
+
+    monkeypatch.setattr(get_settings(), "retrieval_mode", "dense")
+    await retrieval.aget_context("HX-4410 hosting add-on", top_k=2)
+    assert embeddings.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_full_term_coverage_alone_does_not_skip_embedding() -> None:
+    embeddings = CountingEmbeddings(size=8)
+    store = InMemoryVectorStore(embedding=embeddings)
+    provider = VectorStoreProvider(embeddings=embeddings, vector_store=store)
+    docs = [Document(page_content=text, metadata={"chunk_id": key}) for key, text in CORPUS.items()]
+    provider.upsert_embedded(list(CORPUS), docs, embeddings.embed_documents(list(CORPUS.values())))
+    retrieval = RetrievalService(provider)
+
+    hits = provider.lexical_index().search("growth plan")
+    assert hits[0][0].metadata["chunk_id"] == "growth" and hits[0][1] > 0.85
+
+    await retrieval.aget_context("growth plan", top_k=2)
+    assert embeddings.queries == 1
@@ -0,0 +1,58 @@
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.api import routes
+from app.main import app
+from app.models.chat import ChatMessage
+from app.services.metrics import REGISTRY
+from tests.helpers import decision_json
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_turn_records_node_latency_and_token_usage(make_agent) -> None:
+    reply = AIMessage(
+        content=decision_json("We build websites."),
+        usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150},
+    )
+    agent = make_agent(reply)
+    respond_before = _sample("chatbot_node_latency_seconds_count", node="respond")
+    tokens_before = _sample("chatbot_llm_tokens_total", type="input")
+    turn_tokens_before = _sample("chatbot_turn_tokens_sum")
+    greetings_before = _sample("chatbot_intent_router_decisions_total", intent="greeting")
+
+    await agent.run("m1", [ChatMessage(role="user", content="What do you build?")])
+    await agent.run("m2", [ChatMessage(role="user", content="hello")])
+
+    assert _sample("chatbot_node_latency_seconds_count", node="respond") == respond_before + 1
+    assert _sample("chatbot_llm_tokens_total", type="input") == tokens_before + 120
+    assert _sample("chatbot_turn_tokens_sum") == turn_tokens_before + 150
+    assert (
+        _sample("chatbot_intent_router_decisions_total", intent="greeting")
+        == greetings_before + 1
+    )
+    assert _sample("chatbot_llm_latency_seconds_count", call="decision") >= 1
+    assert _sample("chatbot_turns_in_flight") == 0
+
+
+def test_metrics_endpoint_serves_prometheus_text(make_agent, monkeypatch) -> None:
+    agent = make_agent(decision_json("Sure."))
+    monkeypatch.setattr(routes, "get_agent", lambda: agent)
+
+    with TestClient(app) as client:
+        client.post(
+            "/api/chat",
+            json={"session_id": "m3", "message": {"role": "user", "content": "Pricing?"}},
+        )
+        response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'chatbot_node_latency_seconds_bucket{le="0.005",node="route"}' in body
+    assert 'chatbot_turn_latency_seconds_count{mode="run"}' in body
+    assert "chatbot_outbox_depth" in body
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.config.settings import get_settings
+from app.retrieval.ingestion import IncrementalIngestor
+from app.retrieval.mmap_store import MmapVectorStore
+from app.retrieval.vector_store import VectorStoreProvider
+
+
+def _random_store(quantization: str, rows: int = 2000, dim: int = 64):
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    store = MmapVectorStore(DeterministicFakeEmbedding(size=dim), quantization=quantization)
+    store.add_vectors(
+        [f"c{i}" for i in range(rows)],
+        [Document(page_content=f"chunk {i}", metadata={"chunk_id": f"c{i}"}) for i in range(rows)],
+        vectors,
+    )
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return store, unit, rng.standard_normal((20, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("quantization", ["int8", "float16"])
+def test_quantized_batch_search_matches_exact_ranking(quantization) -> None:
+    store, unit, queries = _random_store(quantization)
+
+    results = store.search_by_vectors(queries, k=10)
+
+    hits = total = 0
+    for query, ranked in zip(queries, results):
+        exact = unit @ (query / np.linalg.norm(query))
+        expected = {f"c{i}" for i in np.argsort(-exact)[:10]}
+        hits += len(expected & {doc.metadata["chunk_id"] for doc, _ in ranked})
+        total += len(expected)
+        doc, score = ranked[0]
+        assert score == pytest.approx(exact[int(doc.metadata["chunk_id"][1:])], abs=1e-5)
+        assert [s for _, s in ranked] == sorted((s for _, s in ranked), reverse=True)
+    assert hits / total >= 0.98
+
+
+def test_saved_index_is_memory_mapped_and_reloads_edits(tmp_path) -> None:
+    store, _, queries = _random_store("int8", rows=50, dim=16)
+    store.save(tmp_path / "vectors")
+
+    loaded = MmapVectorStore.load(tmp_path / "vectors", store.embeddings)
+
+    assert isinstance(loaded._snapshot().codes, np.memmap)
+    assert loaded._snapshot().codes.dtype == np.int8
+    assert [d.id for d in loaded.similarity_search_by_vector(queries[0].tolist(), k=3)] == [
+        d.id for d in store.similarity_search_by_vector(queries[0].tolist(), k=3)
+    ]
+    loaded.delete(["c0", "c1"])
+    loaded.add_texts(["Growth retainer pricing."], ids=["new"])
+    assert len(loaded) == 49
+    assert len(MmapVectorStore.load(tmp_path / "vectors", store.embeddings)) == 50
+    with pytest.raises(ValueError):
+        loaded.add_vectors(["bad"], [Document(page_content="x")], [[1.0, 2.0]])
+
+
+@pytest.mark.asyncio
+async def test_mmap_backend_is_shared_through_persist_directory(tmp_path, monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "index"))
+    monkeypatch.setattr(settings, "vector_store_backend", "mmap")
+    data_dir = tmp_path / "docs"
+    data_dir.mkdir()
+    (data_dir / "hosting.md").write_text("Managed hosting with daily backups and a CDN.")
+    (data_dir / "seo.md").write_text("Monthly SEO audits for local clinics.")
+    embeddings = DeterministicFakeEmbedding(size=16)
+
+    writer = VectorStoreProvider(embeddings=embeddings)
+    await IncrementalIngestor(writer, max_workers=0).run(data_dir)
+    reader = VectorStoreProvider(embeddings=embeddings)
+    store = reader.retriever()
+
+    assert isinstance(store, MmapVectorStore)
+    assert len(store) == 2
+    found = await reader.asimilarity_search("Monthly SEO audits for local clinics.", k=1)
+    assert "SEO" in found[0].page_content
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import httpx
+import pytest
+
+from app.models.chat import ChatMessage
+from app.services.outbox import (
+    DISCORD_EMBED,
+    OutboxNotifier,
+    OutboxWorker,
+    SQLiteOutbox,
+)
+from tests.helpers import decision_json
+
+
+class FlakyHandler:
+    def __init__(self, failures: int = 0, error: Exception | None = None) -> None:
+        self.failures = failures
+        self.error = error or httpx.ConnectError("webhook unreachable")
+        self.delivered: list[dict[str, Any]] = []
+
+    async def __call__(self, payload: dict[str, Any]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        self.delivered.append(payload)
+
+
+def _worker(outbox: SQLiteOutbox, handler: FlakyHandler, **kwargs: Any) -> OutboxWorker:
+    kwargs.setdefault("backoff_seconds", 0.0)
+    return OutboxWorker(outbox, {DISCORD_EMBED: handler}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_lead_capture_does_not_wait_for_webhook(make_agent) -> None:
+    handler = FlakyHandler(failures=100)
+    worker = _worker(SQLiteOutbox(""), handler)
+    agent = make_agent(
+        decision_json(
+            "Thanks Ada, we'll be in touch.",
+            next_action="capture_lead",
+            lead={"name": "Ada", "email": "ada@example.com"},
+        ),
+        notifier=OutboxNotifier(worker),
+    )
+
+    response = await agent.run("s1", [ChatMessage(role="user", content="I'm ada@example.com")])
+
+    assert response.lead_captured is True
+    assert handler.delivered == []
+    stats = worker.stats()
+    assert stats.depth == 1
+    assert stats.delivered == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_then_delivers_in_batches() -> None:
+    handler = FlakyHandler(failures=1)
+    worker = _worker(SQLiteOutbox(""), handler, batch_size=2)
+    for i in range(3):
+        worker.enqueue(DISCORD_EMBED, {"title": f"Lead {i}"})
+
+    assert await worker.run_once() == 2
+    await worker.drain()
+
+    assert sorted(item["title"] for item in handler.delivered) == ["Lead 0", "Lead 1", "Lead 2"]
+    stats = worker.stats()
+    assert stats.depth == 0
+    assert stats.delivered == 3
+    assert stats.retried == 1
+    assert stats.last_delivery_lag_seconds >= 0.0
+
+
+@pytest.mark.asyncio
+async def test_outbox_writes_run_off_the_event_loop(monkeypatch) -> None:
+    loop_thread = threading.get_ident()
+    writers: list[int] = []
+    outbox = SQLiteOutbox("")
+    for name in ("enqueue", "claim", "ack"):
+        method = getattr(outbox, name)
+
+        def recording(*args: Any, _method=method) -> Any:
+            writers.append(threading.get_ident())
+            return _method(*args)
+
+        monkeypatch.setattr(outbox, name, recording)
+    handler = FlakyHandler()
+    worker = _worker(outbox, handler)
+
+    await OutboxNotifier(worker).send_embed("Lead", "queued", {"Name": "Ada"})
+    await worker.drain()
+
+    assert [item["title"] for item in handler.delivered] == ["Lead"]
+    assert len(writers) >= 3 and loop_thread not in writers
+
+
+@pytest.mark.asyncio
+async def test_exhausted_and_rejected_messages_are_dead_lettered() -> None:
+    outbox = SQLiteOutbox("")
+    worker = _worker(outbox, FlakyHandler(failures=100), max_attempts=3)
+    worker.enqueue(DISCORD_EMBED, {"title": "unreachable"})
+    await worker.drain()
+
+    rejected = httpx.Response(400, request=httpx.Request("POST", "http://discord.test"))
+    bad_request = FlakyHandler(
+        failures=1, error=httpx.HTTPStatusError("bad", request=rejected.request, response=rejected)
+    )
+    worker = _worker(outbox, bad_request)
+    worker.enqueue(DISCORD_EMBED, {"title": "malformed"})
+    await worker.drain()
+
+    dead = outbox.dead_messages()
+    assert [(message.payload["title"], message.attempts) for message, _ in dead] == [
+        ("unreachable", 3),
+        ("malformed", 1),
+    ]
+    assert worker.stats().dead_letters == 2
+    assert outbox.requeue_dead() == 2
+    await worker.drain()
+    assert [item["title"] for item in bad_request.delivered] == ["unreachable", "malformed"]
+
+
+@pytest.mark.asyncio
+async def test_queue_survives_restart_and_background_worker_drains(tmp_path) -> None:
+    path = tmp_path / "outbox.sqlite3"
+    first = SQLiteOutbox(path)
+    first.enqueue(DISCORD_EMBED, {"title": "before restart"})
+    first.close()
+
+    handler = FlakyHandler()
+    worker = _worker(SQLiteOutbox(path), handler, poll_interval=0.01)
+    worker.start()
+    try:
+        worker.enqueue(DISCORD_EMBED, {"title": "after restart"})
+        for _ in range(100):
+            if len(handler.delivered) == 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await worker.stop()
+
+    assert [item["title"] for item in handler.delivered] == ["before restart", "after restart"]
+    assert worker.stats().depth == 0
+
+
+def test_workers_sharing_a_file_never_claim_the_same_message(tmp_path) -> None:
+    path = tmp_path / "outbox.sqlite3"
+    outboxes = [SQLiteOutbox(path) for _ in range(4)]
+    for index in range(200):
+        outboxes[0].enqueue(DISCORD_EMBED, {"title": str(index)})
+    barrier = threading.Barrier(len(outboxes))
+
+    def drain(outbox: SQLiteOutbox) -> list[int]:
+        barrier.wait()
+        claimed: list[int] = []
+        while batch := outbox.claim(3):
+            claimed.extend(message.id for message in batch)
+        return claimed
+
+    with ThreadPoolExecutor(len(outboxes)) as pool:
+        claims = [id_ for ids in pool.map(drain, outboxes) for id_ in ids]
+
+    assert sorted(claims) == list(range(1, 201))
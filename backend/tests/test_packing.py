@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.config.settings import get_settings
+from app.retrieval.chunking import count_tokens
+from app.retrieval.packing import pack_context
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+
+FILLER = " ".join(f"Our studio was founded in year {year} by two designers." for year in range(40))
+
+
+def _docs() -> list[Document]:
+    return [
+        Document(
+            page_content=f"{FILLER} Managed hosting includes daily backups and a CDN. {FILLER}",
+            metadata={"source": "hosting.md"},
+        ),
+        Document(
+            page_content=f"{FILLER}\nSEO audits review page speed and metadata.",
+            metadata={"source": "seo.md"},
+        ),
+    ]
+
+
+def test_long_context_is_packed_to_relevant_sentences() -> None:
+    docs = _docs()
+
+    packed = pack_context(docs, "Does hosting include backups?", token_budget=60)
+
+    assert packed.tokens_before > 1000
+    assert packed.tokens_after == count_tokens(packed.text) <= 60
+    assert packed.text.startswith("[hosting.md] ")
+    assert "Managed hosting includes daily backups and a CDN." in packed.text
+    assert packed.kept < packed.sentences
+    short = pack_context(docs[:1], "hosting", token_budget=0)
+    assert short.text == f"[hosting.md] {docs[0].page_content}" and not short.compressed
+
+
+def test_cached_vectors_rank_sentences_without_shared_terms() -> None:
+    docs = [
+        Document(
+            page_content="We answer within a day. Invoices are sent monthly.",
+            metadata={"source": "support.md"},
+        )
+    ]
+    vectors = {
+        "How fast is your support?": [1.0, 0.0],
+        "We answer within a day.": [0.9, 0.1],
+        "Invoices are sent monthly.": [0.0, 1.0],
+    }
+
+    packed = pack_context(
+        docs,
+        "How fast is your support?",
+        token_budget=15,
+        lookup=lambda texts: [vectors.get(text) for text in texts],
+    )
+
+    assert packed.text == "[support.md] We answer within a day."
+
+
+def test_service_packs_context_for_the_prompt(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "context_token_budget", 80)
+    service = RetrievalService(
+        VectorStoreProvider(embeddings=DeterministicFakeEmbedding(size=8))
+    )
+
+    text = service.format_context(_docs(), query="What do SEO audits review?")
+
+    assert count_tokens(text) <= 80
+    assert "[seo.md] SEO audits review page speed and metadata." in text
+    assert service.format_context(_docs()[:1]).endswith("two designers.")
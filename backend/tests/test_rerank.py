@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from app.config.settings import get_settings
+from app.retrieval.ingestion import IncrementalIngestor
+from app.retrieval.rerank import mmr_rerank
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+
+
+def _doc(text: str, source: str) -> Document:
+    return Document(page_content=text, metadata={"source": source})
+
+
+def test_mmr_skips_near_duplicates_and_caps_sources() -> None:
+    docs = [
+        _doc("Managed hosting with daily backups.", "hosting.md"),
+        _doc("Managed hosting with daily backups and a CDN.", "hosting-copy.md"),
+        _doc("Our SEO audits cover page speed.", "seo.md"),
+        _doc("Hosting plans are billed monthly.", "hosting.md"),
+        _doc("Hosting includes SSL certificates.", "hosting.md"),
+    ]
+    vectors = np.array(
+        [[1.0, 0.0, 0.0], [0.99, 0.05, 0.0], [0.5, 0.0, 0.8], [0.9, 0.4, 0.0], [0.9, 0.0, 0.4]]
+    )
+
+    picked = mmr_rerank(docs, 4, query_vector=[1.0, 0.0, 0.0], vectors=vectors, max_per_source=2)
+
+    assert picked == [docs[0], docs[3], docs[2]]
+
+
+def test_shingle_duplicates_are_dropped_without_vectors() -> None:
+    docs = [
+        _doc("The Growth plan includes SEO audits and monthly reporting.", "a.md"),
+        _doc("the growth plan includes SEO audits, and monthly reporting", "b.md"),
+        _doc("The Starter plan covers a five page website.", "c.md"),
+    ]
+
+    assert mmr_rerank(docs, 3) == [docs[0], docs[2]]
+
+
+@pytest.mark.asyncio
+async def test_service_over_fetches_and_returns_distinct_context(tmp_path, monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "index"))
+    monkeypatch.setattr(settings, "vector_store_backend", "mmap")
+    monkeypatch.setattr(settings, "embedding_backend", "hashing")
+    monkeypatch.setattr(settings, "embedding_dimensions", 256)
+    monkeypatch.setattr(settings, "retrieval_lexical_fast_path", False)
+    data_dir = tmp_path / "docs"
+    data_dir.mkdir()
+    backup = "Managed hosting includes daily backups, a CDN and uptime monitoring."
+    for name in ("hosting.md", "hosting-2024.md", "hosting-faq.md"):
+        (data_dir / name).write_text(backup)
+    (data_dir / "support.md").write_text("Hosting support answers tickets within one day.")
+    (data_dir / "seo.md").write_text("SEO audits review page speed and metadata.")
+    await IncrementalIngestor(VectorStoreProvider(), max_workers=0).run(data_dir)
+    service = RetrievalService(VectorStoreProvider())
+
+    docs = await service.aget_context("hosting backups and support")
+    texts = [doc.page_content for doc in docs]
+
+    assert len(docs) == 3
+    assert texts.count(backup) == 1
+    assert "Hosting support answers tickets within one day." in texts
+    assert [doc.page_content for doc in service.get_context("hosting backups and support")] == (
+        texts
+    )
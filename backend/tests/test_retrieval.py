@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from app.agents.graph import AgentOrchestrator
+from app.config.settings import get_settings
+from app.models.chat import ChatMessage
+from app.retrieval.service import RetrievalService
+from app.retrieval.vector_store import VectorStoreProvider
+from tests.helpers import FakeDecisionModel, decision_json
+
+SEARCH_DELAY = 0.2
+
+
+class SlowEmbeddings(DeterministicFakeEmbedding):
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(0.05)
+        return self.embed_query(text)
+
+
+class BlockingVectorStore(InMemoryVectorStore):
+    """Mimics Chroma: the search itself is synchronous and blocks its thread."""
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, **kwargs):
+        time.sleep(SEARCH_DELAY)
+        return super().similarity_search_by_vector(embedding, k=k, **kwargs)
+
+
+def _provider() -> VectorStoreProvider:
+    embeddings = SlowEmbeddings(size=16)
+    store = BlockingVectorStore(embedding=embeddings)
+    store.add_documents([Document(page_content="We build websites.", metadata={"source": "faq"})])
+    return VectorStoreProvider(embeddings=embeddings, vector_store=store)
+
+
+@pytest.mark.asyncio
+async def test_parallel_turns_do_not_serialize_on_retrieval() -> None:
+    turns = 4
+    retrieval = RetrievalService(_provider())
+    agent = AgentOrchestrator(
+        retrieval=retrieval,
+        llm=FakeDecisionModel(messages=iter([decision_json("Sure!")] * turns)),
+    )
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(
+        *(
+            agent.run(f"session-{i}", [ChatMessage(role="user", content="What do you build?")])
+            for i in range(turns)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    assert all(response.messages[-1].content == "Sure!" for response in responses)
+    assert elapsed < turns * SEARCH_DELAY * 0.75
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_search() -> None:
+    retrieval = RetrievalService(_provider())
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    docs = await retrieval.aget_context("websites")
+    task.cancel()
+
+    assert docs[0].metadata["source"] == "faq"
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_timeout_degrades_to_empty_context() -> None:
+    retrieval = RetrievalService(_provider())
+
+    assert await retrieval.aget_context("websites", timeout=0.01) == []
+
+
+
+class SlowDocumentEmbeddings(DeterministicFakeEmbedding):
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(1.0)
+        return self.embed_documents(texts)
+
+
+@pytest.mark.asyncio
+async def test_candidate_embedding_shares_the_retrieval_timeout(monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "retrieval_rerank_enabled", True)
+    monkeypatch.setattr(settings, "retrieval_rerank_fetch_k", 2)
+    monkeypatch.setattr(settings, "retrieval_candidates", 1)
+    monkeypatch.setattr(settings, "retrieval_lexical_fast_path", False)
+    embeddings = SlowDocumentEmbeddings(size=16)
+    store = InMemoryVectorStore(embedding=embeddings)
+    sku = "Hosting add-on SKU HX-4410 adds daily backups."
+    docs = [
+        Document(page_content=text)
+        for text in ("We build websites.", sku, "SEO audits review page speed.")
+    ]
+    store.add_documents(docs)
+    provider = VectorStoreProvider(embeddings=embeddings, vector_store=store)
+    provider.lexical_index().upsert(["site", "sku", "seo"], docs)
+    retrieval = RetrievalService(provider)
+
+    # The dense hit differs from the SKU chunk BM25 finds, so MMR needs its vector.
+    started = time.perf_counter()
+    context = await retrieval.aget_context("hosting backups", top_k=1, timeout=0.2)
+
+    assert time.perf_counter() - started < 0.5
+    assert [doc.page_content for doc in context] == ["SEO audits review page speed."]
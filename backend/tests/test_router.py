@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from app.agents.router import SLOT_INTRO, IntentRouter, match_slot
+from app.models.chat import ChatMessage
+from tests.helpers import decision_json
+
+SLOTS = ["2026-10-19T15:00:00", "2026-10-20T15:00:00", "2026-10-21T15:00:00"]
+
+
+class RecordingNotifier:
+    def __init__(self) -> None:
+        self.sent: list[dict[str, Any]] = []
+
+    async def send_embed(self, title: str, description: str, fields: dict[str, Any]) -> None:
+        self.sent.append({"title": title, **fields})
+
+
+class RecordingScheduler:
+    def __init__(self) -> None:
+        self.booked: list[tuple[str, str]] = []
+
+    async def suggest_time_slots(self, timezone: str | None = None) -> list[str]:
+        return SLOTS
+
+    async def schedule_meeting(self, attendee: dict[str, Any], slot: str) -> str:
+        self.booked.append((attendee["email"], slot))
+        return "https://meet.example.com/abc"
+
+
+@pytest.mark.asyncio
+async def test_greeting_is_answered_without_retrieval_or_llm(make_agent) -> None:
+    agent = make_agent()
+
+    response = await agent.run("s1", [ChatMessage(role="user", content="Hello!")])
+
+    assert response.messages[-1].content == "Hi there! How can I help you today?"
+    assert agent._retrieval.queries == []
+    assert agent._router.stats.as_dict() == {"greeting": 1}
+
+
+@pytest.mark.asyncio
+async def test_questions_still_use_the_llm(make_agent) -> None:
+    agent = make_agent(decision_json("We build websites."))
+
+    events = [
+        event
+        async for event in agent.astream(
+            "s1", [ChatMessage(role="user", content="hi, what do you build?")]
+        )
+    ]
+
+    assert events[-1]["data"].messages[-1].content == "We build websites."
+    assert agent._router.stats.as_dict() == {"llm": 1}
+
+
+@pytest.mark.asyncio
+async def test_contact_only_message_fills_lead_info(make_agent) -> None:
+    notifier = RecordingNotifier()
+    agent = make_agent(notifier=notifier)
+
+    events = [
+        event
+        async for event in agent.astream(
+            "s1", [ChatMessage(role="user", content="my email is ada@example.com")]
+        )
+    ]
+
+    final = events[-1]["data"]
+    assert final.lead.email == "ada@example.com"
+    assert final.lead_captured is True
+    assert "".join(e["delta"] for e in events if e["event"] == "token").startswith("Thanks!")
+    assert notifier.sent[0]["email"] == "ada@example.com"
+
+
+@pytest.mark.asyncio
+async def test_slot_pick_books_offered_time_without_llm(make_agent) -> None:
+    scheduler = RecordingScheduler()
+    agent = make_agent(notifier=RecordingNotifier(), scheduling=scheduler)
+    agent._session_memory.set_history(
+        "s1",
+        [
+            ChatMessage(role="user", content="Can we meet? I'm ada@example.com"),
+            ChatMessage(
+                role="assistant",
+                content=f"{SLOT_INTRO}\n" + "\n".join(f"- {slot}" for slot in SLOTS),
+            ),
+        ],
+    )
+
+    response = await agent.run(
+        "s1", [ChatMessage(role="user", content="yes the second slot works")]
+    )
+
+    assert response.meeting_scheduled is True
+    assert scheduler.booked == [("ada@example.com", SLOTS[1])]
+    assert agent._router.stats.as_dict() == {"slot_selection": 1}
+
+
+def test_slot_matching() -> None:
+    assert match_slot("Tuesday is good", SLOTS) == SLOTS[1]
+    assert match_slot("the last one", SLOTS) == SLOTS[2]
+    assert match_slot(f"{SLOTS[0]} please", SLOTS) == SLOTS[0]
+    assert match_slot("first or second?", SLOTS) is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Sorry, I cannot make the first one",
+        "None of those work for me, not Tuesday",
+        "no, the second week of november would be better",
+        "the last thing I want is a call",
+    ],
+)
+def test_declined_or_unrelated_slot_mentions_are_not_booked(text: str) -> None:
+    assert match_slot(text, SLOTS) is None
+
+
+def test_slot_pick_without_known_email_goes_to_llm() -> None:
+    router = IntentRouter()
+    history = [
+        {"role": "assistant", "content": f"{SLOT_INTRO}\n- {SLOTS[0]}"},
+        {"role": "user", "content": "first one"},
+    ]
+
+    assert router.route(history).intent == "llm"
+
+
+def test_slot_pick_uses_contact_captured_on_earlier_turns() -> None:
+    router = IntentRouter()
+    history = [
+        {"role": "assistant", "content": f"{SLOT_INTRO}\n- {SLOTS[0]}"},
+        {"role": "user", "content": "first one works"},
+    ]
+
+    decision = router.route(history, {"name": "Ada", "email": "ada@example.com"})
+
+    assert decision.intent == "slot_selection"
+    assert decision.lead_info["email"] == "ada@example.com"
+    assert decision.meeting_details["confirmed_time"] == SLOTS[0]
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from app.config.settings import Settings
+from app.models.chat import ChatMessage, ConversationSummary
+from app.services.session_memory import (
+    RedisSessionStore,
+    SessionMemory,
+    SQLiteSessionStore,
+    create_session_store,
+)
+
+
+def _messages(*contents: str) -> list[ChatMessage]:
+    return [ChatMessage(role="user", content=content) for content in contents]
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield SessionMemory(max_messages=3)
+    elif request.param == "sqlite":
+        sqlite_store = SQLiteSessionStore(tmp_path / "sessions.db", max_messages=3)
+        yield sqlite_store
+        sqlite_store.close()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        yield RedisSessionStore(client=fakeredis.FakeRedis(), max_messages=3)
+
+
+def test_store_contract(store) -> None:
+    assert store.get_history("s") == []
+
+    store.append_messages("s", _messages("a", "b"))
+    store.append_messages("s", _messages("c", "d"))
+    assert [m.content for m in store.get_history("s")] == ["b", "c", "d"]
+
+    store.set_history("s", _messages("x", "y", "z", "w"))
+    assert [m.content for m in store.get_history("s")] == ["y", "z", "w"]
+
+    store.clear("s")
+    assert store.get_history("s") == []
+
+    # Checkpointed sessions store only their summary here.
+    store.set_summary("t", ConversationSummary(text="Earlier turns.", through="abc"))
+    assert store.get_summary("t").text == "Earlier turns."
+    assert store.get_history("t") == []
+
+
+def test_memory_store_evicts_least_recently_used_sessions() -> None:
+    memory = SessionMemory(max_sessions=2)
+    memory.set_history("a", _messages("1"))
+    memory.set_history("b", _messages("2"))
+    memory.get_history("a")
+    memory.set_history("c", _messages("3"))
+
+    assert memory.get_history("b") == []
+    assert len(memory) == 2
+
+
+def test_memory_store_tracks_bytes_and_enforces_budget() -> None:
+    memory = SessionMemory(max_bytes=1_000)
+    memory.set_history("a", _messages("x" * 300))
+    memory.set_history("b", _messages("y" * 300))
+    assert memory.total_bytes == 2 * (300 + 120)
+
+    memory.append_messages("c", _messages("z" * 300))
+
+    assert memory.get_history("a") == []
+    assert memory.total_bytes <= 1_000
+    memory.clear("b")
+    memory.clear("c")
+    assert memory.total_bytes == 0
+
+
+def test_memory_store_expires_idle_sessions(monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr("app.services.session_memory.time.monotonic", lambda: clock[0])
+    memory = SessionMemory(ttl_seconds=60)
+    memory.set_history("a", _messages("hi"))
+
+    clock[0] = 61.0
+    memory.set_history("b", _messages("hey"))
+
+    assert len(memory) == 1
+    assert memory.get_history("a") == []
+
+
+@pytest.mark.asyncio
+async def test_async_methods_keep_store_io_off_the_event_loop(store, monkeypatch) -> None:
+    offloaded: list[str] = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args):
+        offloaded.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr("app.services.session_memory.asyncio.to_thread", recording_to_thread)
+    await store.aset_history("s", _messages("a", "b"))
+    await store.aset_summary("s", ConversationSummary(text="Asked about a.", through="x"))
+
+    assert [m.content for m in await store.aget_history("s")] == ["a", "b"]
+    assert (await store.aget_summary("s")).text == "Asked about a."
+    expected = ["set_history", "set_summary", "get_history", "get_summary"]
+    assert offloaded == ([] if isinstance(store, SessionMemory) else expected)
+
+
+def test_sqlite_store_survives_reopen(tmp_path) -> None:
+    path = tmp_path / "sessions.db"
+    first = SQLiteSessionStore(path)
+    first.set_history("s", _messages("persisted"))
+    first.close()
+
+    reopened = SQLiteSessionStore(path)
+    assert [m.content for m in reopened.get_history("s")] == ["persisted"]
+    reopened.close()
+
+
+def test_factory_selects_backend(tmp_path) -> None:
+    settings = Settings(session_store_backend="sqlite", session_sqlite_path=str(tmp_path / "s.db"))
+    assert isinstance(create_session_store(settings), SQLiteSessionStore)
+    assert isinstance(create_session_store(Settings()), SessionMemory)
+    with pytest.raises(ValueError):
+        create_session_store(Settings(session_store_backend="nope"))
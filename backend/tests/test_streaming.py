@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.main import app
+from app.models.chat import ChatMessage
+from tests.helpers import decision_json
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_astream_yields_tokens_then_final(make_agent) -> None:
+    agent = make_agent(decision_json("Hello there, how can I help today?"))
+
+    events = [
+        event
+        async for event in agent.astream(
+            "s1", [ChatMessage(role="user", content="What do you build?")]
+        )
+    ]
+
+    tokens = [event["delta"] for event in events if event["event"] == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Hello there, how can I help today?"
+    assert events[-1]["event"] == "final"
+    assert events[-1]["data"].next_action == "none"
+    history = agent.get_history("s1")
+    assert [message.role for message in history] == ["user", "assistant"]
+
+
+def test_chat_stream_endpoint_emits_sse(make_agent, monkeypatch) -> None:
+    agent = make_agent(
+        decision_json(
+            "Thanks Ada, noted.",
+            next_action="none",
+            lead={"name": "Ada", "email": "ada@example.com"},
+        )
+    )
+    monkeypatch.setattr(routes, "get_agent", lambda: agent)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/chat/stream",
+            json={"session_id": "s2", "message": {"role": "user", "content": "I'm Ada"}},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert "".join(data["delta"] for name, data in events if name == "token") == (
+        "Thanks Ada, noted."
+    )
+    name, final = events[-1]
+    assert name == "final"
+    assert final["lead"]["email"] == "ada@example.com"
+    assert final["messages"][-1]["content"] == "Thanks Ada, noted."
+
+
+def test_chat_websocket_streams_turns(make_agent, monkeypatch) -> None:
+    agent = make_agent(decision_json("First reply."), decision_json("Second reply."))
+    monkeypatch.setattr(routes, "get_agent", lambda: agent)
+
+    with TestClient(app) as client, client.websocket_connect("/api/chat/ws") as ws:
+        for expected in ("First reply.", "Second reply."):
+            ws.send_json({"session_id": "s3", "message": {"role": "user", "content": "Tell me more"}})
+            deltas = []
+            while True:
+                event = ws.receive_json()
+                if event["event"] == "final":
+                    break
+                deltas.append(event["data"]["delta"])
+            assert "".join(deltas) == expected
+
+    assert len(agent.get_history("s3")) == 4